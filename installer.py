@@ -1,9 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import ntpath
 import json
 import zipfile
+import tarfile
+import copy
 import urllib.request
+import urllib.parse
+import urllib.error
 import shutil
 import threading
 import sys
@@ -12,9 +17,23 @@ import time
 import random
 import base64
 import ssl
-from io import BytesIO
+from io import BytesIO, RawIOBase
 import traceback
 import argparse
+import asyncio
+import tempfile
+import queue
+import subprocess
+import collections
+import hashlib
+import socket
+import mimetypes
+import http.server
+from concurrent.futures import ThreadPoolExecutor
+import mmap
+import struct
+import zlib
+import re
 
 # Pillow (icons + resizing)
 try:
@@ -23,6 +42,18 @@ try:
 except Exception:
     HAS_PILLOW = False
 
+# zstandard (optional .tar.zst packs); Python 3.14+ ships compression.zstd
+try:
+    import zstandard
+    HAS_ZSTD = True
+except Exception:
+    try:
+        from compression import zstd as stdlib_zstd
+        zstandard = None
+        HAS_ZSTD = True
+    except Exception:
+        HAS_ZSTD = False
+
 # certifi (reliable CA bundle for frozen apps on macOS)
 try:
     import certifi
@@ -33,6 +64,72 @@ except Exception:
 # CONFIG
 MODPACKS_URL = "https://raw.githubusercontent.com/KevinAwesomeCoding/mods-folder/main/modpacks.json"
 LOG_PATH = os.path.join(os.getcwd(), "installer_debug.log")
+EVENT_LOG_PATH = os.path.join(os.getcwd(), "installer_events.jsonl")
+
+# LAN cache server (--serve-cache / --cache-server)
+CACHE_SERVER_PORT = 47625
+CACHE_DISCOVERY_PORT = 47626
+CACHE_DISCOVERY_MAGIC = b"MODS_CACHE_DISCOVER"
+CATALOG_CACHE_TTL = 300  # seconds before the serving instance re-fetches modpacks.json
+ASSET_REVALIDATE_TTL = 60  # seconds before a cached asset is re-checked upstream
+CACHE_SERVER_URL = None  # set at startup from --cache-server, MODS_CACHE_SERVER or discovery
+MC_DIR_OVERRIDE = None  # --mc-dir
+
+# Icons are tiny; refuse anything bigger rather than buffering it
+MAX_ICON_BYTES = 4 * 1024 * 1024
+ICON_WORKERS = 8  # parallel icon fetch/resize in bulk profile refreshes
+
+# Async network layer
+HEAD_CONCURRENCY = 64  # simultaneous HEAD requests in update sweeps
+DOWNLOAD_SEGMENTS = 4  # parallel Range requests for large downloads
+SEGMENTED_MIN_BYTES = 16 * 1024 * 1024
+
+# Preflight disk check: headroom kept free on top of the estimate
+DISK_SPACE_MARGIN = 64 * 1024 * 1024
+INODE_MARGIN = 256
+RANGE_TAIL_BYTES = 64 * 1024  # zip end-of-archive block read up front
+PREFLIGHT_WORKERS = 8
+
+# Extraction reads the archive through mmap
+INFLATE_CHUNK = 1024 * 1024  # compressed bytes handed to zlib at a time
+ZERO_COPY_MIN_BYTES = 1024 * 1024  # stored members copied by the kernel
+COPY_WORKERS = 8  # parallel file copies when merging loader trees
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000  # Windows: background trash deletion
+
+# Generated javaArgs: heap sized from the pack and the machine's RAM
+DEFAULT_JVM_ARGS = (
+    "-Xmx4096m -Xms256m "
+    "-Dfml.ignorePatchDiscrepancies=true "
+    "-Dfml.ignoreInvalidMinecraftCertificates=true "
+    "-Duser.language=en -Duser.country=US"
+)
+# Default bounds; a pack's own -Xmx is its default maximum, and
+# heap_min_mb/heap_max_mb in the catalog override both
+HEAP_MIN_MB = 2048
+HEAP_MAX_MB = 10240
+HEAP_BASE_MB = 1536  # vanilla game plus loader
+HEAP_PER_MOD_MB = 24
+HEAP_PER_JAR_MB = 3  # per MB of mod jars on disk (assets, decompressed classes)
+HEAP_FLOOR_MB = 1024
+OS_RESERVE_MB = 2048  # always left to the OS and launcher
+JVM_OFFHEAP_MB = 1024  # metaspace, code cache, GC and native memory beside the heap
+SMALL_MACHINE_MB = 12 * 1024  # at or below this, the heap gets at most half of RAM
+
+# Disk usage scan
+SCAN_WORKERS = 8
+ORPHAN_MIN_AGE = 3600  # seconds; younger temp artifacts may belong to a running install
+# Leftovers from interrupted runs (older installers used the fixed names)
+ORPHAN_NAMES = ("temp.zip", "temp_update.zip", "temp_extract", "temp_loader_extract")
+ORPHAN_PREFIXES = ("temp_loader_", "temp_shared_", "temp_selftest_")
+COPY_SUFFIX = ".copying"  # copy_file_fast's temp files, next to their target
+COPY_DIRS = ("versions", "libraries")  # where copy_tree merges into
+
+# --selftest diagnostics
+PROBE_TIMEOUT = 10
+THROUGHPUT_SAMPLE_BYTES = 8 * 1024 * 1024
+DISK_SAMPLE_BYTES = 32 * 1024 * 1024
+EXTRACT_SAMPLE_FILES = 64
+EXTRACT_SAMPLE_FILE_BYTES = 256 * 1024
 
 # --- DARK THEME COLORS ---
 BG_COLOR = "#2E2E2E"
@@ -54,6 +151,18 @@ def log(msg: str):
         pass
 
 
+def log_event(event: str, **fields):
+    """One JSON line per event in EVENT_LOG_PATH, for unattended runs."""
+    record = {"ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "event": event}
+    record.update(fields)
+    try:
+        with open(EVENT_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except Exception:
+        pass
+    log(f"EVENT {event}: {fields}")
+
+
 def get_ssl_context():
     try:
         if HAS_CERTIFI:
@@ -68,7 +177,48 @@ def get_ssl_context():
 SSL_CTX = get_ssl_context()
 
 
-def http_get_bytes(url: str, timeout=15) -> bytes:
+def get_mc_dir():
+    if MC_DIR_OVERRIDE:
+        return MC_DIR_OVERRIDE
+    system = platform.system()
+    if system == "Windows":
+        return os.path.join(os.getenv("APPDATA"), ".minecraft")
+    if system == "Darwin":
+        return os.path.join(
+            os.path.expanduser("~"),
+            "Library",
+            "Application Support",
+            "minecraft",
+        )
+    return os.path.join(os.path.expanduser("~"), ".minecraft")
+
+
+def get_cache_dir(mc_dir=None):
+    return os.path.join(mc_dir or get_mc_dir(), "installer_cache")
+
+
+def cache_name_for_url(url: str) -> str:
+    # Stable, filesystem-safe name that still shows which asset it is
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    base = os.path.basename(urllib.parse.urlparse(url).path) or "asset"
+    base = "".join(c if c.isalnum() or c in "._-" else "_" for c in base)
+    return f"{digest}_{base}"
+
+
+def mirror_candidates(url: str):
+    """Sources to try for url, the LAN cache server first when one is known."""
+    if CACHE_SERVER_URL:
+        quoted = urllib.parse.quote(url, safe="")
+        return [f"{CACHE_SERVER_URL}/asset?url={quoted}", url]
+    return [url]
+
+
+def _fresh_url(url: str) -> str:
+    sep = "&" if "?" in url else "?"
+    return f"{url}{sep}t={int(time.time())}-{random.randint(1, 999999)}"
+
+
+def _http_get_bytes(url: str, timeout=15, max_bytes=None) -> bytes:
     req = urllib.request.Request(
         url,
         headers={
@@ -78,15 +228,60 @@ def http_get_bytes(url: str, timeout=15) -> bytes:
         },
     )
     with urllib.request.urlopen(req, context=SSL_CTX, timeout=timeout) as r:
-        return r.read()
+        if max_bytes is None:
+            return r.read()
+
+        declared = int(r.info().get("Content-Length") or 0)
+        if declared > max_bytes:
+            raise ValueError(f"{url} is {declared} bytes (limit {max_bytes})")
+        buf = BytesIO()
+        while True:
+            chunk = r.read(65536)
+            if not chunk:
+                break
+            if buf.tell() + len(chunk) > max_bytes:
+                raise ValueError(f"{url} exceeds {max_bytes} bytes")
+            buf.write(chunk)
+        return buf.getvalue()
+
+
+def response_validators(headers):
+    """ETag / Last-Modified / Content-Length from a response's headers."""
+    get = headers.get
+    return {
+        "etag": get("ETag") or get("etag"),
+        "last_modified": get("Last-Modified") or get("last-modified"),
+        "content_length": int(get("Content-Length") or get("content-length") or 0),
+    }
+
+
+def validators_match(old, new):
+    """True when two validator sets describe the same upstream file."""
+    if not old or not new:
+        return False
+    if old.get("etag") and new.get("etag"):
+        return old["etag"] == new["etag"]
+    if old.get("last_modified") and new.get("last_modified"):
+        return (
+            old["last_modified"] == new["last_modified"]
+            and old.get("content_length") == new.get("content_length")
+        )
+    return False
 
 
-def http_download_file(url: str, path: str, progress_cb=None, timeout=30):
+def _http_download_file(url: str, path: str, progress_cb=None, timeout=30, validators=None):
+    """
+    Stream url to path; returns the SHA-256 of what was written.
+    If validators is a dict it is filled with the response's ETag etc.
+    """
     req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
     with urllib.request.urlopen(req, context=SSL_CTX, timeout=timeout) as response:
+        if validators is not None:
+            validators.update(response_validators(response.info()))
         total_size = int(response.info().get("Content-Length", 0))
         block_size = 8192
         downloaded = 0
+        digest = hashlib.sha256()
 
         start_time = time.time()
         last_update_time = 0
@@ -97,6 +292,7 @@ def http_download_file(url: str, path: str, progress_cb=None, timeout=30):
                 if not chunk:
                     break
                 out_file.write(chunk)
+                digest.update(chunk)
                 downloaded += len(chunk)
 
                 # Update UI only every 0.1s to prevent lag
@@ -120,258 +316,2995 @@ def http_download_file(url: str, path: str, progress_cb=None, timeout=30):
             if progress_cb and total_size > 0:
                 progress_cb(total_size, total_size, 0)
 
+    return digest.hexdigest()
 
-class InstallerApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Modpack Installer")
-        self.root.configure(bg=BG_COLOR)
 
-        self.icon_cache = {}
-        self.current_icon_base64 = None
-        self.current_action_name = "Processing"
+class _KeepMethodRedirectHandler(urllib.request.HTTPRedirectHandler):
+    # urllib turns a redirected HEAD into a GET; GitHub release assets
+    # always redirect, so keep it a HEAD.
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        new = super().redirect_request(req, fp, code, msg, headers, newurl)
+        if new is not None and req.get_method() == "HEAD":
+            new.method = "HEAD"
+        return new
 
-        # Center window
-        window_width = 500
-        window_height = 800
-        screen_width = root.winfo_screenwidth()
-        screen_height = root.winfo_screenheight()
-        x = (screen_width // 2) - (window_width // 2)
-        y = (screen_height // 2) - (window_height // 2)
-        self.root.geometry(f"{window_width}x{window_height}+{int(x)}+{int(y)}")
 
-        # Configure Dark Theme Styles
-        style = ttk.Style()
-        style.theme_use("clam")  # 'clam' allows for better color customization
+_HEAD_OPENER = urllib.request.build_opener(
+    urllib.request.HTTPSHandler(context=SSL_CTX), _KeepMethodRedirectHandler
+)
 
-        style.configure(
-            "TLabel",
-            background=BG_COLOR,
-            foreground=FG_COLOR,
-            font=("Segoe UI", 10),
-        )
-        style.configure(
-            "TButton",
-            background=BUTTON_BG,
-            foreground=BUTTON_FG,
-            borderwidth=1,
-            font=("Segoe UI", 10),
-        )
-        style.map("TButton", background=[("active", BUTTON_ACTIVE)])
 
-        style.configure(
-            "TCombobox",
-            fieldbackground=ENTRY_BG,
-            background=BUTTON_BG,
-            foreground=FG_COLOR,
-            arrowcolor=FG_COLOR,
-        )
-        style.map(
-            "TCombobox",
-            fieldbackground=[("readonly", ENTRY_BG)],
-            selectbackground=[("readonly", ACCENT_COLOR)],
-        )
+def _http_head(url: str, timeout=15, headers=None) -> dict:
+    req = urllib.request.Request(
+        url, method="HEAD", headers={"User-Agent": "Mozilla/5.0", **(headers or {})}
+    )
+    with _HEAD_OPENER.open(req, timeout=timeout) as r:
+        return {k.lower(): v for k, v in r.headers.items()}
 
-        style.configure(
-            "Horizontal.TProgressbar",
-            background=ACCENT_COLOR,
-            troughcolor=BUTTON_BG,
-            bordercolor=BG_COLOR,
-            lightcolor=ACCENT_COLOR,
-            darkcolor=ACCENT_COLOR,
-        )
 
-        self.modpacks = self.load_data()
+# --- ASYNC NETWORK LAYER ---
+# One event loop on a background thread carries every catalog/icon/HEAD/
+# download request as a coroutine, so a sweep over all packs is hundreds of
+# sockets rather than dozens of OS threads. The blocking helpers below
+# (http_get_bytes, http_download_file, http_head) are thin wrappers that run
+# a coroutine on that loop. With a system proxy configured the same
+# coroutines fall back to urllib in the loop's executor, since the minimal
+# HTTP/1.1 client here doesn't speak to proxies.
 
-        # --- DEBUG ICON (Top Right) ---
-        self.btn_debug = tk.Button(
-            root,
-            text="⚙",
-            font=("Segoe UI", 12),
-            command=self.open_debug_menu,
-            bg=BG_COLOR,
-            fg=FG_COLOR,
-            activebackground=BUTTON_ACTIVE,
-            activeforeground=FG_COLOR,
-            bd=0,
-            highlightthickness=0,
-        )
-        self.btn_debug.place(relx=0.92, rely=0.02)
+HttpResponse = collections.namedtuple("HttpResponse", "status headers url")
 
-        # Header
-        tk.Label(
-            root,
-            text="Select a Modpack",
-            font=("Segoe UI", 18, "bold"),
-            bg=BG_COLOR,
-            fg=FG_COLOR,
-        ).pack(pady=(20, 10))
 
-        self.btn_refresh = tk.Button(
-            root,
-            text="Refresh List",
-            command=self.refresh_data,
-            font=("Segoe UI", 9),
-            bg=BUTTON_BG,
-            fg=BUTTON_FG,
-            activebackground=BUTTON_ACTIVE,
-            activeforeground=BUTTON_FG,
-            bd=1,
-            relief="flat",
-        )
-        self.btn_refresh.pack(pady=5)
+class HttpError(Exception):
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
 
-        # Main Content Frame
-        content_frame = tk.Frame(root, bg=BG_COLOR)
-        content_frame.pack(fill="both", expand=True, padx=20)
 
-        # Category Dropdown
-        tk.Label(
-            content_frame,
-            text="CATEGORY",
-            font=("Segoe UI", 9, "bold"),
-            bg=BG_COLOR,
-            fg="#AAAAAA",
-        ).pack(pady=(15, 2), anchor="w")
-        self.selected_category = tk.StringVar()
-        self.cat_dropdown = ttk.Combobox(
-            content_frame,
-            textvariable=self.selected_category,
-            state="readonly",
-            font=("Segoe UI", 11),
-        )
-        if self.modpacks:
-            self.cat_dropdown["values"] = list(self.modpacks.keys())
-            self.cat_dropdown.current(0)
-        else:
-            self.cat_dropdown["values"] = ["Error loading data"]
-        self.cat_dropdown.bind("<<ComboboxSelected>>", self.update_pack_dropdown)
-        self.cat_dropdown.pack(pady=5, fill="x")
+def _proxies_configured():
+    proxies = urllib.request.getproxies()
+    return bool(proxies.get("http") or proxies.get("https"))
 
-        # Pack Dropdown
-        tk.Label(
-            content_frame,
-            text="MODPACK",
-            font=("Segoe UI", 9, "bold"),
-            bg=BG_COLOR,
-            fg="#AAAAAA",
-        ).pack(pady=(15, 2), anchor="w")
-        self.selected_pack = tk.StringVar()
-        self.pack_dropdown = ttk.Combobox(
-            content_frame,
-            textvariable=self.selected_pack,
-            state="readonly",
-            font=("Segoe UI", 11),
-        )
-        self.pack_dropdown.bind("<<ComboboxSelected>>", self.on_pack_selected)
-        self.pack_dropdown.pack(pady=5, fill="x")
 
-        # Icon Area
-        self.icon_frame = tk.Frame(content_frame, bg=BG_COLOR, height=80)
-        self.icon_frame.pack(pady=(20, 10))
-        self.icon_label = tk.Label(self.icon_frame, text="", bg=BG_COLOR)
-        self.icon_label.pack()
+USE_URLLIB = _proxies_configured()
 
-        # Description Label
-        self.desc_label = tk.Label(
-            content_frame,
-            text="Description will appear here.",
-            font=("Segoe UI", 10),
-            fg="#CCCCCC",
-            bg=BG_COLOR,
-            wraplength=400,
-            justify="center",
-        )
-        self.desc_label.pack(pady=(0, 10))
 
-        # Rating Frame
-        self.rating_frame = tk.Frame(content_frame, bg=BG_COLOR)
-        self.rating_frame.pack(pady=(5, 15))
+async def _close_writer(writer):
+    writer.close()
+    try:
+        await asyncio.wait_for(writer.wait_closed(), 2)
+    except Exception:
+        pass
 
-        self.rating_title = tk.Label(
-            self.rating_frame,
-            text="RATING",
-            font=("Segoe UI", 8, "bold"),
-            fg="#888888",
-            bg=BG_COLOR,
-        )
-        self.rating_title.pack(anchor="center")
 
-        self.rating_text = tk.Label(
-            self.rating_frame,
-            text="",
-            font=("Segoe UI", 10, "bold"),
-            fg="#FFD700",
-            bg=BG_COLOR,
-            wraplength=400,
-            justify="center",
+async def _read_body(reader, headers, sink, timeout):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size_line = await asyncio.wait_for(reader.readline(), timeout)
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers up to the blank line
+                while (await asyncio.wait_for(reader.readline(), timeout)) not in (
+                    b"\r\n",
+                    b"",
+                ):
+                    pass
+                return
+            sink(await asyncio.wait_for(reader.readexactly(size), timeout))
+            await asyncio.wait_for(reader.readexactly(2), timeout)
+
+    remaining = int(headers["content-length"]) if "content-length" in headers else None
+    while remaining is None or remaining > 0:
+        want = 65536 if remaining is None else min(65536, remaining)
+        chunk = await asyncio.wait_for(reader.read(want), timeout)
+        if not chunk:
+            if remaining is not None:
+                raise ConnectionError("connection closed before end of body")
+            return
+        sink(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+
+
+async def async_request(
+    method, url, headers=None, sink=None, timeout=15, expect=None, max_redirects=5
+):
+    """
+    One HTTP/1.1 request on its own connection, following redirects.
+    The body goes to sink(chunk) as it arrives.
+    """
+    for _ in range(max_redirects + 1):
+        parts = urllib.parse.urlsplit(url)
+        secure = parts.scheme == "https"
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                parts.hostname,
+                parts.port or (443 if secure else 80),
+                ssl=SSL_CTX if secure else None,
+                server_hostname=parts.hostname if secure else None,
+            ),
+            timeout,
         )
-        self.rating_text.pack(anchor="center")
-
-        # Install Button
-        self.btn_install = tk.Button(
-            root,
-            text="INSTALL SELECTED PACK",
-            command=self.start_thread,
-            bg=ACCENT_COLOR,
-            fg="white",
-            font=("Segoe UI", 11, "bold"),
-            activebackground="#005A9E",
-            activeforeground="white",
-            bd=0,
-            relief="flat",
-            height=2,
+        try:
+            target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            lines = [
+                f"{method} {target} HTTP/1.1",
+                f"Host: {parts.netloc.rsplit('@', 1)[-1]}",
+                "User-Agent: Mozilla/5.0",
+                "Accept-Encoding: identity",
+                "Connection: close",
+            ]
+            lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            await writer.drain()
+
+            raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+            head = raw.decode("latin-1").split("\r\n")
+            status = int(head[0].split(" ", 2)[1])
+            resp_headers = {}
+            for line in head[1:]:
+                key, sep, value = line.partition(":")
+                if sep:
+                    resp_headers[key.strip().lower()] = value.strip()
+
+            if status in (301, 302, 303, 307, 308) and "location" in resp_headers:
+                url = urllib.parse.urljoin(url, resp_headers["location"])
+                continue
+            if status >= 400 or (expect and status not in expect):
+                raise HttpError(status, url)
+            if sink is not None and method != "HEAD" and status not in (204, 304):
+                await _read_body(reader, resp_headers, sink, timeout)
+            return HttpResponse(status, resp_headers, url)
+        finally:
+            await _close_writer(writer)
+    raise HttpError(310, url)
+
+
+async def _gather_or_cancel(coros):
+    # Structured concurrency: one failure cancels the siblings
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def _with_mirrors(url, fetch):
+    # fetch(source, is_origin) is tried against the LAN cache, then the origin
+    sources = mirror_candidates(url)
+    last_error = None
+    for source in sources:
+        is_origin = source is sources[-1]
+        try:
+            return await fetch(source, is_origin)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            last_error = e
+            if not is_origin:
+                log(f"Cache server failed for {url}: {e!r}, falling back")
+    raise last_error
+
+
+async def async_get_bytes(url, timeout=15, fresh=False, max_bytes=None):
+    # fresh=True adds a cache-buster, but only for the origin (the LAN
+    # cache keys assets by their real URL).
+    async def fetch(source, is_origin):
+        if fresh and is_origin:
+            source = _fresh_url(url)
+        if USE_URLLIB:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: _http_get_bytes(source, timeout, max_bytes)
+            )
+        buf = BytesIO()
+
+        def sink(chunk):
+            if max_bytes is not None and buf.tell() + len(chunk) > max_bytes:
+                raise ValueError(f"{url} exceeds {max_bytes} bytes")
+            buf.write(chunk)
+
+        await async_request(
+            "GET",
+            source,
+            headers={"Cache-Control": "no-cache", "Pragma": "no-cache"},
+            sink=sink,
+            timeout=timeout,
         )
-        self.btn_install.pack(pady=(20, 10), fill="x", padx=40)
+        return buf.getvalue()
 
-        # Commands Help Button
-        self.btn_commands = tk.Button(
-            root,
-            text="COMMAND HELP",
-            command=self.show_command_help,
-            bg=BUTTON_BG,
-            fg=BUTTON_FG,
-            font=("Segoe UI", 9),
-            activebackground=BUTTON_ACTIVE,
-            activeforeground=BUTTON_FG,
-            bd=1,
-            relief="flat",
-            height=1,
-            state="disabled",  # Start disabled
-        )
-        self.btn_commands.pack(pady=(0, 10), fill="x", padx=40)
+    return await _with_mirrors(url, fetch)
 
-        # Progress Bar
-        self.progress_var = tk.DoubleVar()
-        self.progress_bar = ttk.Progressbar(
-            root,
-            variable=self.progress_var,
-            maximum=100,
-            style="Horizontal.TProgressbar",
-        )
 
-        # Status Label
-        self.status = tk.Label(
-            root,
-            text="Ready",
-            fg="#888888",
-            bg=BG_COLOR,
-            font=("Segoe UI", 9),
+async def async_head(url, timeout=15):
+    """Lower-cased response headers from the origin (never the LAN cache)."""
+    if USE_URLLIB:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: _http_head(url, timeout)
         )
-        self.status.pack(side="bottom", pady=15)
+    return (await async_request("HEAD", url, timeout=timeout)).headers
 
-        if self.modpacks:
-            self.update_pack_dropdown(None)
 
-    # --- DEBUG MENU LOGIC ---
-    def open_debug_menu(self):
-        debug_win = tk.Toplevel(self.root)
-        debug_win.title("Debug / Tools")
-        debug_win.geometry("350x300")
-        debug_win.configure(bg=BG_COLOR)
+async def async_get_range(url, start, end, timeout=15):
+    """Bytes start..end (inclusive) of url from the origin, or HttpError."""
+    headers = {"Range": f"bytes={start}-{end}"}
+    if USE_URLLIB:
 
-        tk.Label(
-            debug_win,
+        def run():
+            req = urllib.request.Request(
+                url, headers={"User-Agent": "Mozilla/5.0", **headers}
+            )
+            with urllib.request.urlopen(req, context=SSL_CTX, timeout=timeout) as r:
+                if r.status != 206:
+                    raise HttpError(r.status, url)
+                return r.read()
+
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+    buf = BytesIO()
+    await async_request(
+        "GET", url, headers=headers, sink=buf.write, timeout=timeout, expect=(206,)
+    )
+    return buf.getvalue()
+
+
+async def async_head_many(urls, timeout=15, concurrency=HEAD_CONCURRENCY):
+    """{url: headers or None}; failures are logged, not raised."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(url):
+        async with sem:
+            try:
+                return url, await async_head(url, timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"HEAD failed for {url}: {e!r}")
+                return url, None
+
+    return dict(await asyncio.gather(*(one(url) for url in urls)))
+
+
+class _Progress:
+    """Throttled (downloaded, total, eta) reporting, like the urllib path."""
+
+    def __init__(self, total, callback):
+        self.total = total
+        self.callback = callback
+        self.done = 0
+        self.start = time.time()
+        self.last = 0
+
+    def add(self, n):
+        self.done += n
+        now = time.time()
+        if self.callback and self.total > 0 and now - self.last > 0.1:
+            elapsed = now - self.start
+            speed = self.done / elapsed if elapsed > 0 else 0
+            eta = (self.total - self.done) / speed if speed > 0 else 0
+            self.callback(self.done, self.total, eta)
+            self.last = now
+
+    def finish(self):
+        if self.callback and self.total > 0:
+            self.callback(self.total, self.total, 0)
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def _download_from(source, path, progress_cb, timeout, validators, segments, known):
+    """
+    One attempt at source. known is what a HEAD of it already said (the
+    plan's validators plus "ranged"); without it this sends its own HEAD.
+    """
+    if known is None:
+        head = await async_request("HEAD", source, timeout=timeout)
+        target = head.url
+        known = dict(
+            response_validators(head.headers),
+            ranged=head.headers.get("accept-ranges", "").lower() == "bytes",
+        )
+    else:
+        target = source  # the plan already sent this URL a HEAD
+    total = known.get("content_length", 0)
+    if validators is not None:
+        validators.update(
+            {k: known.get(k) for k in ("etag", "last_modified", "content_length")}
+        )
+    progress = _Progress(total, progress_cb)
+
+    if segments > 1 and known.get("ranged") and total >= SEGMENTED_MIN_BYTES:
+        try:
+            return await _download_segments(target, path, total, segments, progress, timeout)
+        except HttpError as e:
+            if e.status != 200:
+                raise
+            # Advertised ranges, then answered with the whole file
+            log(f"{target} ignored the Range header, downloading in one piece")
+            progress = _Progress(total, progress_cb)
+
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+
+        def sink(chunk):
+            f.write(chunk)
+            digest.update(chunk)
+            progress.add(len(chunk))
+
+        response = await async_request("GET", target, sink=sink, timeout=timeout)
+    progress.finish()
+    if validators is not None:
+        # The GET's own answer is the freshest; a chunked one has no length
+        fresh = response_validators(response.headers)
+        validators.update({k: v for k, v in fresh.items() if v})
+    return digest.hexdigest()
+
+
+async def _download_segments(url, path, total, segments, progress, timeout):
+    with open(path, "wb") as f:
+        f.truncate(total)
+    step = -(-total // segments)
+
+    async def segment(start, end):
+        with open(path, "r+b") as f:
+            f.seek(start)
+
+            def sink(chunk):
+                f.write(chunk)
+                progress.add(len(chunk))
+
+            await async_request(
+                "GET",
+                url,
+                headers={"Range": f"bytes={start}-{end}"},
+                sink=sink,
+                timeout=timeout,
+                expect=(206,),
+            )
+
+    await _gather_or_cancel(
+        segment(start, min(start + step, total) - 1) for start in range(0, total, step)
+    )
+    progress.finish()
+    # Segments arrive out of order, so hash once the file is complete
+    return await asyncio.get_running_loop().run_in_executor(None, _sha256_file, path)
+
+
+async def async_download_file(
+    url,
+    path,
+    progress_cb=None,
+    timeout=30,
+    validators=None,
+    segments=DOWNLOAD_SEGMENTS,
+    known=None,
+):
+    """
+    Download url to path (Range-segmented when large); returns its SHA-256.
+    known (InstallPlan.download_hint) saves the HEAD this would otherwise send.
+    """
+
+    async def fetch(source, is_origin):
+        if USE_URLLIB:
+            return await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: _http_download_file(
+                    source, path, progress_cb, timeout, validators
+                ),
+            )
+        return await _download_from(
+            source, path, progress_cb, timeout, validators, segments, known
+        )
+
+    return await _with_mirrors(url, fetch)
+
+
+class AsyncTransport:
+    """
+    Owns the network event loop thread. run() blocks on a coroutine;
+    submit() delivers callback(result, error) on the Tk thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="network-loop", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro, timeout=None):
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("AsyncTransport.run() called from the network loop")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def submit(self, coro, callback=None, root=None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if callback is not None:
+
+            def done(f):
+                if f.cancelled():
+                    return
+                error = f.exception()
+                result = None if error else f.result()
+                if root is not None:
+                    root.after(0, lambda: callback(result, error))
+                else:
+                    callback(result, error)
+
+            future.add_done_callback(done)
+        return future
+
+
+_transport = None
+
+
+def get_transport():
+    global _transport
+    with _asset_locks_guard:
+        if _transport is None:
+            _transport = AsyncTransport()
+        return _transport
+
+
+def http_get_bytes(url: str, timeout=15, fresh=False, max_bytes=None) -> bytes:
+    return get_transport().run(
+        async_get_bytes(url, timeout=timeout, fresh=fresh, max_bytes=max_bytes)
+    )
+
+
+def http_download_file(
+    url: str, path: str, progress_cb=None, timeout=30, validators=None, known=None
+):
+    return get_transport().run(
+        async_download_file(
+            url,
+            path,
+            progress_cb=progress_cb,
+            timeout=timeout,
+            validators=validators,
+            known=known,
+        )
+    )
+
+
+def http_head(url: str, timeout=15) -> dict:
+    """
+    Response headers for url (after redirects), with lower-case keys.
+    Always asks the origin: these answers are what update checks trust.
+    """
+    return get_transport().run(async_head(url, timeout=timeout))
+
+
+def load_icon_frame(data: bytes, size):
+    """
+    Decode only the first frame of an icon, scaled to size x size.
+    Never touch is_animated: it walks every frame to count them.
+    """
+    image = Image.open(BytesIO(data))
+    image.draft(image.mode, (size, size))  # JPEG: decode at reduced scale
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    return image.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def fetch_icon_png(url: str, size=128, timeout=20) -> bytes:
+    data = http_get_bytes(url, timeout=timeout, max_bytes=MAX_ICON_BYTES)
+    image = load_icon_frame(data, size)
+    del data
+    out = BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+CatalogEntry = collections.namedtuple("CatalogEntry", "category name config")
+
+
+def loader_of(version_id: str) -> str:
+    vid = version_id.lower()
+    for loader in ("neoforge", "forge", "fabric", "quilt"):
+        if loader in vid:
+            return loader
+    return "vanilla"
+
+
+class Catalog:
+    """Indexed view of modpacks.json, built once per load for lookups and search."""
+
+    def __init__(self, data):
+        self.data = data or {}
+        self.entries = []
+        self.categories = list(self.data.keys())
+        self.by_category = {}
+        self.by_folder = {}
+        self.by_profile = {}
+        self.by_version = {}
+        self.by_loader = {}
+        self._haystacks = []
+        self._positions = {}  # id(config) -> index into entries
+
+        for category, packs in self.data.items():
+            self.by_category[category] = list(packs.keys())
+            for name, cfg in packs.items():
+                entry = CatalogEntry(category, name, cfg)
+                self._positions[id(cfg)] = len(self.entries)
+                self.entries.append(entry)
+                if "folder_name" in cfg:
+                    self.by_folder[cfg["folder_name"]] = cfg
+                if "profile_name" in cfg:
+                    self.by_profile[cfg["profile_name"]] = cfg
+                version_id = cfg.get("version_id", "")
+                self.by_version.setdefault(version_id, []).append(entry)
+                self.by_loader.setdefault(loader_of(version_id), []).append(entry)
+                self._haystacks.append(self._haystack(name, cfg))
+
+    @staticmethod
+    def _haystack(name, cfg):
+        return f"{name} {cfg.get('profile_name', '')} {cfg.get('description', '')}".lower()
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def get(self, category, name):
+        return self.data.get(category, {}).get(name)
+
+    def add_details(self, config, details):
+        """Merge a pack's detail record into its config and its search text."""
+        for key, value in details.items():
+            config.setdefault(key, value)
+        position = self._positions.get(id(config))
+        if position is not None:
+            self._haystacks[position] = self._haystack(self.entries[position].name, config)
+
+    def search(self, query: str):
+        """
+        Entries matching every word of query; 'loader:', 'version:' and
+        'category:' terms filter instead of matching text.
+        """
+        words = []
+        filters = []
+        for token in query.lower().split():
+            key, sep, value = token.partition(":")
+            if sep and value and key in ("loader", "version", "category"):
+                filters.append((key, value))
+            else:
+                words.append(token)
+
+        results = []
+        for entry, haystack in zip(self.entries, self._haystacks):
+            if not all(w in haystack for w in words):
+                continue
+            ok = True
+            for key, value in filters:
+                if key == "loader":
+                    ok = loader_of(entry.config.get("version_id", "")) == value
+                elif key == "version":
+                    ok = value in entry.config.get("version_id", "").lower()
+                else:
+                    ok = value in entry.category.lower()
+                if not ok:
+                    break
+            if ok:
+                results.append(entry)
+        return results
+
+
+_asset_locks = {}
+_asset_locks_guard = threading.Lock()
+
+
+def asset_lock(key):
+    """One lock per asset/target so concurrent installs never share work dirs."""
+    with _asset_locks_guard:
+        return _asset_locks.setdefault(key, threading.Lock())
+
+
+def try_lock_file(path):
+    """
+    An exclusive OS lock on path, as the open file holding it, or None if
+    it's already held. The OS drops it when the holder exits.
+    """
+    f = open(path, "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def release_lock_file(f):
+    if f is None or f.closed:
+        return
+    if os.name == "nt":
+        import msvcrt
+
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+    f.close()
+
+
+def pack_download_url(config):
+    current_os = platform.system()
+    if current_os == "Darwin" and "mac_url" in config:
+        return config["mac_url"]
+    if current_os == "Windows" and "windows_url" in config:
+        return config["windows_url"]
+    return config["url"]
+
+
+def loader_version_id(loader_url):
+    name = loader_url.split("/")[-1]
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+ARCHIVE_FORMATS = ("zip", "tar.zst")
+ARCHIVE_SUFFIXES = (".tar.zst", ".tzst", ".zip")
+ZSTD_SIZE_GUESS = 3  # unpacked/packed ratio assumed for .tar.zst preflight
+
+
+def archive_kind(url, declared=None):
+    """'zip' or 'tar.zst' for an archive URL (declared is a catalog "format")."""
+    if declared:
+        return declared
+    path = urllib.parse.urlsplit(url).path.lower()
+    if path.endswith((".tar.zst", ".tzst")):
+        return "tar.zst"
+    return "zip"
+
+
+def pack_archive_kind(config, download_url):
+    return archive_kind(download_url, config.get("format"))
+
+
+def require_archive_support(kind, url):
+    if kind == "tar.zst" and not HAS_ZSTD:
+        raise Exception(
+            f"{url} is a .tar.zst archive, which needs the zstandard module "
+            "(pip install zstandard)."
+        )
+
+
+def open_zstd(fileobj):
+    """Readable stream of the decompressed data; handles multi-frame files."""
+    if zstandard is not None:
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, read_across_frames=True)
+    return stdlib_zstd.ZstdFile(fileobj)
+
+
+ArchiveSlice = collections.namedtuple("ArchiveSlice", "path offset size")
+
+
+class SliceFile(RawIOBase):
+    """
+    Read-only view of bytes [offset, offset + size) of a local file.
+    fileno() and base give the whole file, for mmap and kernel copies.
+    """
+
+    def __init__(self, path, offset, size):
+        super().__init__()
+        self._f = open(path, "rb", buffering=0)
+        self.base = offset
+        self.size = size
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=0):
+        base = {0: 0, 1: self.pos, 2: self.size}[whence]
+        self.pos = max(0, base + offset)
+        return self.pos
+
+    def readinto(self, b):
+        n = min(len(b), self.size - self.pos)
+        if n <= 0:
+            return 0
+        self._f.seek(self.base + self.pos)
+        got = self._f.readinto(memoryview(b)[:n])
+        self.pos += got
+        return got
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+def open_archive(source):
+    """Seekable binary file for an archive path or an ArchiveSlice."""
+    if isinstance(source, ArchiveSlice):
+        return SliceFile(source.path, source.offset, source.size)
+    return open(source, "rb")
+
+
+def archive_size(source):
+    if isinstance(source, ArchiveSlice):
+        return source.size
+    return os.path.getsize(source)
+
+
+# tarfile extraction filters arrived in 3.12 and were backported to 3.11.4
+TAR_HAS_FILTER = hasattr(tarfile, "data_filter")
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+class InstallPlan:
+    """The unique loader and mods downloads needed for a set of packs."""
+
+    def __init__(self):
+        self.packs = []  # (config, download_url) in install order
+        self.loaders = {}  # loader_url -> version_id
+        self.mods = {}  # download_url -> [config, ...]
+        self.validators = {}  # url -> response_validators() of a HEAD
+        self.ranged = set()  # urls whose HEAD advertised byte ranges
+        self.unchanged = []  # configs skipped because upstream matches state
+
+    def download_hint(self, url):
+        """The `known` for async_download_file, or None if the HEAD failed."""
+        if not self.validators.get(url):
+            return None
+        return dict(self.validators[url], ranged=url in self.ranged)
+
+    @property
+    def total_bytes(self):
+        urls = list(self.loaders) + list(self.mods)
+        return sum(self.validators.get(url, {}).get("content_length", 0) for url in urls)
+
+    def describe(self):
+        size = format_bytes(self.total_bytes) if self.total_bytes else "unknown size"
+        text = (
+            f"{len(self.packs)} pack(s), {len(self.loaders)} loader(s), "
+            f"{len(self.mods)} mods download(s), {size}"
+        )
+        if self.unchanged:
+            text += f", {len(self.unchanged)} up to date"
+        return text
+
+
+def plan_install(
+    mc_dir, configs, include_loaders=True, skip_unchanged=False, known_validators=None
+):
+    """
+    With skip_unchanged, packs matching their recorded validators go to
+    plan.unchanged. URLs in known_validators are not sent a HEAD.
+    """
+    plan = InstallPlan()
+    versions_dir = os.path.join(mc_dir, "versions")
+    for config in configs:
+        download_url = pack_download_url(config)
+        plan.packs.append((config, download_url))
+        plan.mods.setdefault(download_url, []).append(config)
+
+        loader_url = config.get("loader_url")
+        if include_loaders and loader_url and loader_url not in plan.loaders:
+            version_id = loader_version_id(loader_url)
+            if not loader_installed(mc_dir, version_id):
+                plan.loaders[loader_url] = version_id
+
+    known_validators = known_validators or {}
+    urls = [u for u in list(plan.loaders) + list(plan.mods) if u not in known_validators]
+    if urls:
+        heads = get_transport().run(async_head_many(urls))
+        plan.validators = {
+            url: response_validators(headers) if headers else {}
+            for url, headers in heads.items()
+        }
+        plan.ranged = {
+            url
+            for url, headers in heads.items()
+            if headers and headers.get("accept-ranges", "").lower() == "bytes"
+        }
+    for url in list(plan.loaders) + list(plan.mods):
+        if url in known_validators:
+            plan.validators[url] = known_validators[url]
+
+    if skip_unchanged:
+        state = load_state(mc_dir)
+        for download_url in list(plan.mods):
+            current = plan.validators.get(download_url)
+            stale = []
+            for config in plan.mods[download_url]:
+                record = state.profile(config["folder_name"])
+                if (
+                    record
+                    and record.get("url") == download_url
+                    and validators_match(record.get("validators"), current)
+                    and os.path.isdir(
+                        os.path.join(mc_dir, "profiles", config["folder_name"])
+                    )
+                ):
+                    plan.unchanged.append(config)
+                else:
+                    stale.append(config)
+            if stale:
+                plan.mods[download_url] = stale
+            else:
+                del plan.mods[download_url]
+        skipped = {id(config) for config in plan.unchanged}
+        plan.packs = [p for p in plan.packs if id(p[0]) not in skipped]
+
+    log(f"PLAN: {plan.describe()}")
+    return plan
+
+
+def loader_installed(mc_dir, version_id):
+    # The version JSON is the last thing a loader zip needs to provide;
+    # an empty or half-copied folder doesn't count.
+    version_folder = os.path.join(mc_dir, "versions", version_id)
+    return os.path.exists(os.path.join(version_folder, version_id + ".json"))
+
+
+def list_files(root, prefix=""):
+    """Relative paths (with '/' separators) of every file under root."""
+    out = []
+    for root_path, _dirs, files in os.walk(root):
+        rel = os.path.relpath(root_path, root)
+        for name in files:
+            path = name if rel == "." else f"{rel}/{name}".replace(os.sep, "/")
+            out.append(prefix + path)
+    return sorted(out)
+
+
+class StateStore:
+    """
+    installer_state.json: what this installer put on disk, per profile folder
+    and per loader version, with the upstream validators it came from.
+    """
+
+    def __init__(self, mc_dir):
+        self.path = os.path.join(mc_dir, "installer_state.json")
+        self._lock = threading.Lock()
+        self.data = {
+            "version": 1,
+            "profiles": {},
+            "loaders": {},
+            "icons": {},
+            "settings": {},
+        }
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            self.data["profiles"].update(loaded.get("profiles", {}))
+            self.data["loaders"].update(loaded.get("loaders", {}))
+            self.data["icons"].update(loaded.get("icons", {}))
+            self.data["settings"].update(loaded.get("settings", {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log(f"STATE: ignoring unreadable {self.path}: {e!r}")
+
+    def profile(self, folder):
+        return self.data["profiles"].get(folder)
+
+    def loader(self, version_id):
+        return self.data["loaders"].get(version_id)
+
+    def record_profile(self, folder, record):
+        self._record("profiles", folder, record)
+
+    def record_loader(self, version_id, record):
+        self._record("loaders", version_id, record)
+
+    def icon(self, folder):
+        return self.data["icons"].get(folder)
+
+    def record_icon(self, folder, record):
+        self._record("icons", folder, record)
+
+    def setting(self, key, default=None):
+        return self.data["settings"].get(key, default)
+
+    def set_setting(self, key, value):
+        with self._lock:
+            self.data["settings"][key] = value
+            self._save()
+
+    def _record(self, section, key, record):
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        with self._lock:
+            previous = self.data[section].get(key) or {}
+            record = dict(record)
+            record["installed_at"] = previous.get("installed_at", now)
+            record["updated_at"] = now
+            self.data[section][key] = record
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(self.path + ".tmp", self.path)
+
+
+_state_stores = {}
+
+
+def load_state(mc_dir):
+    with _asset_locks_guard:
+        if mc_dir not in _state_stores:
+            _state_stores[mc_dir] = StateStore(mc_dir)
+        return _state_stores[mc_dir]
+
+
+async def async_check_pack_update(mc_dir, config):
+    """'not installed', 'up to date', 'update available' or 'installed' (unknown)."""
+    folder = config["folder_name"]
+    if not os.path.isdir(os.path.join(mc_dir, "profiles", folder)):
+        return "not installed"
+    record = load_state(mc_dir).profile(folder)
+    download_url = pack_download_url(config)
+    if not record or record.get("url") != download_url:
+        return "installed"
+    try:
+        current = response_validators(await async_head(download_url))
+    except Exception as e:
+        log(f"Update check failed for {folder}: {e!r}")
+        return "installed"
+    if validators_match(record.get("validators"), current):
+        return "up to date"
+    return "update available"
+
+
+def check_pack_update(mc_dir, config):
+    return get_transport().run(async_check_pack_update(mc_dir, config))
+
+
+CATALOG_FORMAT = 2  # newest catalog layout this installer understands
+
+# key: (type, required) for a pack once any format-2 references are expanded
+PACK_FIELDS = {
+    "url": (str, True),
+    "profile_name": (str, True),
+    "folder_name": (str, True),
+    "version_id": (str, True),
+    "mac_url": (str, False),
+    "windows_url": (str, False),
+    "loader_url": (str, False),
+    "icon_url": (str, False),
+    "icon": (str, False),
+    "is_complex": (bool, False),
+    "jvm_args": (str, False),
+    "description": (str, False),
+    "rating": (str, False),
+    "commands": (list, False),
+    "detail_url": (str, False),
+    "format": (str, False),
+    "heap_min_mb": (int, False),
+    "heap_max_mb": (int, False),
+}
+DETAIL_FIELDS = {
+    "description": (str, False),
+    "rating": (str, False),
+    "commands": (list, False),
+}
+URL_FIELDS = ("url", "mac_url", "windows_url", "loader_url", "icon_url", "detail_url")
+
+
+def compile_record_check(fields, extra=None):
+    """
+    Turn a {key: (type, required)} table into check(record) -> [problems].
+    extra(record) adds checks the table can't express.
+    """
+    required = frozenset(k for k, (_type, needed) in fields.items() if needed)
+    types = {k: t for k, (t, _needed) in fields.items()}
+
+    def check(record):
+        if not isinstance(record, dict):
+            return ["not an object"]
+        problems = [f"missing {key}" for key in sorted(required - record.keys())]
+        for key, value in record.items():
+            expected = types.get(key)
+            if expected is not None and not isinstance(value, expected):
+                problems.append(f"{key} should be {expected.__name__}")
+        if not problems and extra is not None:
+            problems += extra(record)
+        return problems
+
+    return check
+
+
+def _pack_sanity(config):
+    problems = []
+    folder = config["folder_name"]
+    if folder in ("", ".", "..") or "/" in folder or "\\" in folder:
+        problems.append("folder_name must be a plain folder name")
+    for key in URL_FIELDS:
+        if key in config and not config[key].startswith(("https://", "http://")):
+            problems.append(f"{key} is not an http(s) URL")
+    if config.get("format", "zip") not in ARCHIVE_FORMATS:
+        problems.append(f"unknown format {config['format']!r}")
+    for key in ("heap_min_mb", "heap_max_mb"):
+        if key in config and config[key] <= 0:
+            problems.append(f"{key} must be positive")
+    heap_min, heap_max = heap_bounds(config)
+    if heap_min > heap_max:
+        problems.append(f"heap_min_mb is above the heap maximum of {heap_max} MB")
+    return problems
+
+
+check_pack = compile_record_check(PACK_FIELDS, _pack_sanity)
+check_detail = compile_record_check(DETAIL_FIELDS)
+
+
+def expand_catalog(data, base_url):
+    """
+    {category: {pack name: config}} from either catalog format, plus a
+    list of problems. Format 2 references are resolved against its tables.
+    """
+    version = data.get("format", 1)
+    if not isinstance(version, int):
+        return data, []  # format 1 with a category that happens to be called "format"
+    if version == 1:
+        return {k: v for k, v in data.items() if k != "format"}, []
+    if version > CATALOG_FORMAT:
+        raise ValueError(f"catalog format {version} needs a newer installer")
+
+    loaders = data.get("loaders", {})
+    jvm_sets = data.get("jvm_args", {})
+    defaults = data.get("defaults", {})
+    catalog = {}
+    problems = []
+    for category, packs in data.get("packs", {}).items():
+        catalog[category] = {}
+        for name, pack in packs.items():
+            if not isinstance(pack, dict):
+                problems.append(f"{category}/{name}: not an object")
+                continue
+            config = dict(defaults)
+            config.update(
+                {k: v for k, v in pack.items() if k not in ("loader", "jvm", "detail")}
+            )
+            if "loader" in pack:
+                if pack["loader"] not in loaders:
+                    problems.append(f"{category}/{name}: unknown loader {pack['loader']!r}")
+                    continue
+                for key, value in loaders[pack["loader"]].items():
+                    config.setdefault(key, value)
+            if "jvm" in pack:
+                if pack["jvm"] not in jvm_sets:
+                    problems.append(f"{category}/{name}: unknown jvm set {pack['jvm']!r}")
+                    continue
+                config.setdefault("jvm_args", jvm_sets[pack["jvm"]])
+            if "detail" in pack:
+                config["detail_url"] = urllib.parse.urljoin(base_url, pack["detail"])
+            catalog[category][name] = config
+    return catalog, problems
+
+
+def parse_catalog(raw, base_url=None):
+    """
+    Expand and validate a catalog. Packs that fail validation are logged
+    and left out, so a bad entry can't surface as a KeyError mid-install.
+    """
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("catalog is not a JSON object")
+    catalog, problems = expand_catalog(data, base_url or MODPACKS_URL)
+
+    clean = {}
+    for category, packs in catalog.items():
+        if not isinstance(packs, dict):
+            problems.append(f"{category}: not an object")
+            continue
+        for name, config in packs.items():
+            bad = check_pack(config)
+            if bad:
+                problems.append(f"{category}/{name}: {'; '.join(bad)}")
+                continue
+            clean.setdefault(category, {})[name] = config
+
+    for problem in problems:
+        log(f"CATALOG: skipping {problem}")
+    return clean
+
+
+def fetch_catalog():
+    raw = http_get_bytes(MODPACKS_URL, timeout=15, fresh=True).decode("utf-8")
+    return parse_catalog(raw)
+
+
+async def async_fetch_pack_details(config):
+    """The lazily loaded detail record of a format-2 pack (or {})."""
+    if "detail_url" not in config:
+        return {}
+    raw = await async_get_bytes(config["detail_url"], timeout=15)
+    details = json.loads(raw.decode("utf-8"))
+    problems = check_detail(details)
+    if problems:
+        raise ValueError(f"bad detail record {config['detail_url']}: {'; '.join(problems)}")
+    return details
+
+
+async def async_fetch_details_many(configs, concurrency=HEAD_CONCURRENCY):
+    """{detail_url: details or None} for configs; failures are logged, not raised."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(config):
+        async with sem:
+            try:
+                return config["detail_url"], await async_fetch_pack_details(config)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"Could not load details {config['detail_url']}: {e!r}")
+                return config["detail_url"], None
+
+    return dict(await asyncio.gather(*(one(config) for config in configs)))
+
+
+def installed_profiles(mc_dir):
+    profiles_dir = os.path.join(mc_dir, "profiles")
+    if not os.path.isdir(profiles_dir):
+        return []
+    return sorted(e.name for e in os.scandir(profiles_dir) if e.is_dir())
+
+
+async def _conditional_head(url, recorded, timeout):
+    """(status, headers) for a HEAD carrying the recorded validators."""
+    headers = {}
+    if recorded and recorded.get("etag"):
+        headers["If-None-Match"] = recorded["etag"]
+    elif recorded and recorded.get("last_modified"):
+        headers["If-Modified-Since"] = recorded["last_modified"]
+
+    if USE_URLLIB:
+
+        def run():
+            try:
+                return 200, _http_head(url, timeout, headers)
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    return 304, {}
+                raise
+
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+    resp = await async_request("HEAD", url, headers=headers, timeout=timeout)
+    return resp.status, resp.headers
+
+
+async def async_check_updates(mc_dir, catalog, timeout=15):
+    """
+    Which installed profiles are out of date, from conditional HEADs,
+    one per distinct URL, all run concurrently.
+    """
+    started = time.time()
+    state = load_state(mc_dir)
+    rows = []
+    checks = {}  # (url, etag, last_modified) -> recorded validators
+
+    def want(url, recorded):
+        key = (url, (recorded or {}).get("etag"), (recorded or {}).get("last_modified"))
+        checks.setdefault(key, recorded)
+        return key
+
+    for folder in installed_profiles(mc_dir):
+        config = catalog.by_folder.get(folder)
+        if config is None:
+            rows.append({"folder": folder, "status": "not in catalog"})
+            continue
+
+        record = state.profile(folder) or {}
+        download_url = pack_download_url(config)
+        recorded = record.get("validators") if record.get("url") == download_url else None
+        row = {
+            "folder": folder,
+            "profile_name": config["profile_name"],
+            "mods": {"url": download_url, "key": want(download_url, recorded)},
+        }
+
+        loader_url = config.get("loader_url")
+        if loader_url:
+            version_id = loader_version_id(loader_url)
+            loader_record = state.loader(version_id) or {}
+            row["loader"] = {"url": loader_url, "version_id": version_id}
+            if not loader_installed(mc_dir, version_id):
+                row["loader"]["status"] = "missing"
+            elif loader_record.get("url") == loader_url:
+                row["loader"]["key"] = want(loader_url, loader_record.get("validators"))
+            else:
+                row["loader"]["status"] = "installed"
+        rows.append(row)
+
+    sem = asyncio.Semaphore(HEAD_CONCURRENCY)
+
+    async def check(key):
+        recorded = checks[key]
+        async with sem:
+            try:
+                status, headers = await _conditional_head(key[0], recorded, timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"Update check failed for {key[0]}: {e!r}")
+                return key, "error"
+        if status == 304:
+            return key, "up to date"
+        if not recorded:
+            return key, "unknown"
+        if validators_match(recorded, response_validators(headers)):
+            return key, "up to date"
+        return key, "update available"
+
+    results = dict(await asyncio.gather(*(check(key) for key in checks)))
+
+    for row in rows:
+        for part in ("mods", "loader"):
+            if part in row and "key" in row[part]:
+                row[part]["status"] = results[row[part].pop("key")]
+        if row.get("status") == "not in catalog":
+            continue
+        parts = [row["mods"]["status"], row.get("loader", {}).get("status")]
+        if "update available" in parts or "missing" in parts:
+            row["status"] = "update available"
+        elif "error" in parts:
+            row["status"] = "error"
+        elif parts[0] == "unknown":
+            row["status"] = "unknown"
+        else:
+            row["status"] = "up to date"
+
+    return {
+        "checked_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "elapsed_ms": int((time.time() - started) * 1000),
+        "profiles": rows,
+    }
+
+
+def check_updates(mc_dir, catalog):
+    return get_transport().run(async_check_updates(mc_dir, catalog))
+
+
+def zip_dir_prefix(names, dirname):
+    """Member prefix of the shallowest directory called dirname, or None."""
+    best = None
+    for name in names:
+        parts = name.split("/")
+        for depth, part in enumerate(parts[:-1]):
+            if part == dirname:
+                found = (depth, "/".join(parts[: depth + 1]) + "/")
+                if best is None or found < best:
+                    best = found
+                break
+    return best[1] if best else None
+
+
+def zip_roots(zip_path, dirnames):
+    """
+    {dirname: member prefix} for each of dirnames present in the zip,
+    read from its central directory alone.
+    """
+    with open_archive(zip_path) as raw, zipfile.ZipFile(raw, "r") as z:
+        names = z.namelist()
+    roots = {}
+    for dirname in dirnames:
+        prefix = zip_dir_prefix(names, dirname)
+        if prefix is not None:
+            roots[dirname] = prefix
+    return roots
+
+
+# What ZipFile.extract replaces in names on Windows
+_WINDOWS_ILLEGAL = str.maketrans(':<>|"?*', "_______")
+
+
+def member_path(dest, filename, windows=os.name == "nt"):
+    """
+    Where filename lands under dest, sanitized like ZipFile.extract
+    (with its Windows rules when windows is set).
+    """
+    splitdrive = ntpath.splitdrive if windows else os.path.splitdrive
+    arcname = splitdrive(filename.replace("\\", "/"))[1]
+    parts = [p for p in arcname.split("/") if p not in ("", ".", "..")]
+    if windows:
+        parts = [p.translate(_WINDOWS_ILLEGAL).rstrip(" .") for p in parts]
+        parts = [p for p in parts if p]
+    return os.path.join(dest, *parts)
+
+
+def _member_data_offset(mm, info, base=0):
+    """Where info's data starts in mm, from its local file header."""
+    header_offset = base + info.header_offset
+    header = mm[header_offset : header_offset + 30]
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename!r}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    return header_offset + 30 + name_len + extra_len
+
+
+def _copy_range(src_fd, dst_fd, offset, count, view):
+    """
+    Copy count bytes at offset in src_fd to dst_fd's position, in the
+    kernel where possible; the rest comes from view or src_fd.
+    """
+    done = 0
+    kernel_copies = []
+    if hasattr(os, "copy_file_range"):
+        kernel_copies.append(lambda at, n: os.copy_file_range(src_fd, dst_fd, n, at))
+    if sys.platform.startswith("linux"):
+        # copy_file_range fails across filesystems on older kernels (EXDEV)
+        # and on some filesystems (ENOSYS, EINVAL); sendfile still works there
+        kernel_copies.append(lambda at, n: os.sendfile(dst_fd, src_fd, at, n))
+    for kernel_copy in kernel_copies:
+        try:
+            while done < count:
+                n = kernel_copy(offset + done, count - done)
+                if n == 0:
+                    break
+                done += n
+        except OSError as e:
+            log(f"Kernel copy failed ({e!r}), trying the next way")
+        if done >= count:
+            break
+    while done < count:
+        if view is not None:
+            done += os.write(dst_fd, view[done:count])
+            continue
+        os.lseek(src_fd, offset + done, os.SEEK_SET)
+        chunk = os.read(src_fd, min(INFLATE_CHUNK, count - done))
+        if not chunk:
+            raise OSError(f"source ended {count - done} bytes early")
+        os.write(dst_fd, chunk)
+        done += len(chunk)
+
+
+def same_file_content(a, b, size):
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        remaining = size
+        while remaining > 0:
+            chunk = fa.read(min(INFLATE_CHUNK, remaining))
+            if not chunk or chunk != fb.read(len(chunk)):
+                return False
+            remaining -= len(chunk)
+    return True
+
+
+def copy_file_fast(src, dst, size):
+    """
+    Copy src over dst through a COPY_SUFFIX temp file, keeping the
+    permission bits and mtime (set last, once dst is in place).
+    """
+    tmp = dst + COPY_SUFFIX
+    with open(src, "rb") as fin, open(tmp, "wb", buffering=0) as fout:
+        _copy_range(fin.fileno(), fout.fileno(), 0, size, None)
+    st = os.stat(src)
+    os.chmod(tmp, st.st_mode & 0o7777)
+    os.replace(tmp, dst)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def copy_tree(src, dst, progress_cb=None, workers=COPY_WORKERS):
+    """
+    Merge src into dst on a thread pool, skipping files with the same size
+    and mtime or content. Returns (copied, skipped).
+    """
+    jobs = []
+    pending = [(src, dst)]
+    while pending:
+        src_dir, dst_dir = pending.pop()
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                target = os.path.join(dst_dir, entry.name)
+                if entry.is_dir():
+                    pending.append((entry.path, target))
+                else:
+                    st = entry.stat()
+                    jobs.append((entry.path, target, st.st_size, st.st_mtime_ns))
+
+    total = sum(job[2] for job in jobs)
+    lock = threading.Lock()
+    progress = {"done": 0, "last": 0.0, "copied": 0}
+    started = time.time()
+
+    def handle(job):
+        path, target, size, mtime_ns = job
+        try:
+            existing = os.stat(target)
+        except FileNotFoundError:
+            existing = None
+        unchanged = existing is not None and existing.st_size == size and (
+            existing.st_mtime_ns == mtime_ns or same_file_content(path, target, size)
+        )
+        if not unchanged:
+            copy_file_fast(path, target, size)
+        with lock:
+            progress["done"] += size
+            progress["copied"] += 0 if unchanged else 1
+            now = time.time()
+            if progress_cb is None or now - progress["last"] < 0.1:
+                return
+            progress["last"] = now
+            done = progress["done"]
+        eta = (total - done) * (now - started) / done if done else 0
+        progress_cb(done, total, eta)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(handle, jobs))
+    if progress_cb is not None:
+        progress_cb(total, total, 0)
+    return progress["copied"], len(jobs) - progress["copied"]
+
+
+def extract_member(z, info, dest, mm, src_fd, base=0):
+    """
+    Extract info to dest from mm, an mmap of z's file (the archive starting
+    base bytes in). Big stored members are copied by the kernel.
+    """
+    target = member_path(dest, info.filename)
+    if info.is_dir():
+        os.makedirs(target, exist_ok=True)
+        return
+    if info.flag_bits & 0x1 or info.compress_type not in (
+        zipfile.ZIP_STORED,
+        zipfile.ZIP_DEFLATED,
+    ):
+        set_zip_mtime(z.extract(info, dest), info)
+        return
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    start = _member_data_offset(mm, info, base)
+    view = memoryview(mm)[start : start + info.compress_size]
+    try:
+        with open(target, "w+b", buffering=0) as out:
+            if info.compress_type == zipfile.ZIP_STORED:
+                if info.file_size >= ZERO_COPY_MIN_BYTES:
+                    _copy_range(src_fd, out.fileno(), start, info.file_size, view)
+                    # Checked on what landed in target, so the archive is
+                    # only read once (by the copy)
+                    with mmap.mmap(out.fileno(), 0, access=mmap.ACCESS_READ) as copied:
+                        crc = zlib.crc32(copied)
+                else:
+                    crc = zlib.crc32(view)
+                    out.write(view)
+            else:
+                crc = 0
+                inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+                for pos in range(0, len(view), INFLATE_CHUNK):
+                    data = inflater.decompress(view[pos : pos + INFLATE_CHUNK])
+                    crc = zlib.crc32(data, crc)
+                    out.write(data)
+                data = inflater.flush()
+                crc = zlib.crc32(data, crc)
+                out.write(data)
+    finally:
+        view.release()
+    if crc != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+    set_zip_mtime(target, info)
+
+
+def set_zip_mtime(path, info):
+    """
+    Give an extracted file its zip date_time, so copy_tree can skip it
+    when the same archive is extracted again.
+    """
+    try:
+        mtime = time.mktime(info.date_time + (0, 0, -1))
+    except (OverflowError, ValueError):
+        return
+    os.utime(path, (mtime, mtime))
+
+
+class RangeFile(RawIOBase):
+    """
+    Read-only, seekable view of a remote file of known size, backed by
+    Range requests, so zipfile can read a central directory remotely.
+    """
+
+    def __init__(self, url, size, timeout=15):
+        super().__init__()
+        self.url = url
+        self.size = size
+        self.timeout = timeout
+        self.pos = 0
+        self._tail_start = max(0, size - RANGE_TAIL_BYTES)
+        self._tail = self._fetch(self._tail_start, size) if size else b""
+
+    def _fetch(self, start, end):
+        # The LAN cache serves ranges too, and answering these warms it up
+        return get_transport().run(
+            _with_mirrors(
+                self.url,
+                lambda source, _is_origin: async_get_range(
+                    source, start, end - 1, timeout=self.timeout
+                ),
+            )
+        )
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=0):
+        base = {0: 0, 1: self.pos, 2: self.size}[whence]
+        self.pos = max(0, base + offset)
+        return self.pos
+
+    def readinto(self, b):
+        end = min(self.pos + len(b), self.size)
+        if end <= self.pos:
+            return 0
+        if self.pos >= self._tail_start:
+            data = self._tail[self.pos - self._tail_start : end - self._tail_start]
+        else:
+            data = self._fetch(self.pos, end)
+        b[: len(data)] = data
+        self.pos += len(data)
+        return len(data)
+
+
+def zip_targets(infos, dirnames=None):
+    """
+    [(path, size)] of the files extracting infos writes. With dirnames only
+    members under them count (all of them when none is present).
+    """
+    names = [info.filename for info in infos]
+    roots = {d: zip_dir_prefix(names, d) for d in dirnames or ()}
+    roots = {d: p for d, p in roots.items() if p}
+    if not roots:
+        return [(i.filename, i.file_size) for i in infos if not i.is_dir()]
+    targets = []
+    for info in infos:
+        if info.is_dir():
+            continue
+        for dirname, prefix in roots.items():
+            if info.filename.startswith(prefix):
+                targets.append((f"{dirname}/{info.filename[len(prefix):]}", info.file_size))
+                break
+    return targets
+
+
+def zip_usage(infos, dirnames=None):
+    """(bytes, files) that extracting infos writes; see zip_targets."""
+    targets = zip_targets(infos, dirnames)
+    return sum(size for _path, size in targets), len(targets)
+
+
+def existing_size(base, paths):
+    """Bytes already on disk at base/path for each of paths."""
+    total = 0
+    for path in paths:
+        try:
+            total += os.stat(os.path.join(base, *path.split("/"))).st_size
+        except OSError:
+            pass
+    return total
+
+
+def tree_size(path):
+    total = 0
+    for root_path, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root_path, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class InsufficientSpaceError(Exception):
+    pass
+
+
+def estimate_plan_space(plan, local=None, mc_dir=None):
+    """
+    Peak (bytes, inodes) that run_plan needs on the target filesystem. With
+    mc_dir, files a step replaces are credited back once it commits.
+    """
+    dirnames = {url: ("versions", "libraries") for url in plan.loaders}
+    for url, configs in plan.mods.items():
+        complex_pack = any(c.get("is_complex", False) for c in configs)
+        dirnames[url] = None if complex_pack else ("mods",)
+    kinds = {url: archive_kind(url) for url in plan.loaders}
+    kinds.update({url: pack_archive_kind(cfgs[0], url) for url, cfgs in plan.mods.items()})
+
+    def measure(url):
+        # -> (archive bytes, extracted bytes, files, target paths or None)
+        source = local(url) if local else None
+        if source is not None:
+            length = archive_size(source)
+            if kinds[url] == "tar.zst":
+                return url, (length, length * ZSTD_SIZE_GUESS, 0, None)
+            with open_archive(source) as raw, zipfile.ZipFile(raw) as z:
+                targets = zip_targets(z.infolist(), dirnames[url])
+        else:
+            length = plan.validators.get(url, {}).get("content_length", 0)
+            if not length:
+                return url, (0, 0, 0, None)
+            if kinds[url] == "tar.zst":
+                # No index to read remotely; assume a typical ratio
+                return url, (length, length * ZSTD_SIZE_GUESS, 0, None)
+            try:
+                with zipfile.ZipFile(RangeFile(url, length)) as z:
+                    targets = zip_targets(z.infolist(), dirnames[url])
+            except Exception as e:
+                # No Range support: jars barely compress, so use the zip size
+                log(f"Could not read the zip directory of {url}: {e!r}")
+                return url, (length, length, 0, None)
+        used = sum(size for _path, size in targets)
+        return url, (length, used, len(targets), [path for path, _size in targets])
+
+    with ThreadPoolExecutor(max_workers=PREFLIGHT_WORKERS) as pool:
+        sizes = dict(pool.map(measure, dirnames))
+
+    def replaced(url, config=None):
+        paths = sizes[url][3]
+        if mc_dir is None:
+            return 0
+        if config is None:
+            return existing_size(mc_dir, paths or ())
+        profile_dir = os.path.join(mc_dir, "profiles", config["folder_name"])
+        if dirnames[url] == ("mods",) and (paths is None or all(p.startswith("mods/") for p in paths)):
+            return tree_size(os.path.join(profile_dir, "mods"))
+        return existing_size(profile_dir, paths or ())
+
+    installed = inodes = peak = peak_inodes = 0
+    for url in plan.loaders:
+        length, used, files, _paths = sizes[url]
+        peak = max(peak, installed + length + used, installed + 2 * used)
+        peak_inodes = max(peak_inodes, inodes + 2 * files)
+        installed += used - replaced(url)
+        inodes += files
+    for url, configs in plan.mods.items():
+        length, used, files, _paths = sizes[url]
+        # A shared download stays on disk until its last pack is installed
+        for config in configs:
+            peak = max(peak, installed + length + used)
+            peak_inodes = max(peak_inodes, inodes + files + 1)
+            installed += used - replaced(url, config)
+            inodes += files
+    return peak, peak_inodes
+
+
+def check_disk_space(mc_dir, plan, local=None):
+    """Raise InsufficientSpaceError if plan cannot fit on mc_dir's filesystem."""
+    needed, inodes = estimate_plan_space(plan, local, mc_dir)
+    free = shutil.disk_usage(mc_dir).free
+    if needed + DISK_SPACE_MARGIN > free:
+        raise InsufficientSpaceError(
+            f"Not enough disk space: this install needs about "
+            f"{format_bytes(needed + DISK_SPACE_MARGIN)} but only "
+            f"{format_bytes(free)} is free on the drive with {mc_dir}."
+        )
+    if hasattr(os, "statvfs"):
+        st = os.statvfs(mc_dir)
+        # Filesystems without a fixed inode table report f_files == 0
+        if st.f_files and inodes + INODE_MARGIN > st.f_favail:
+            raise InsufficientSpaceError(
+                f"Not enough free inodes: this install creates about {inodes} "
+                f"files but only {st.f_favail} more fit on the drive with {mc_dir}."
+            )
+    return needed, inodes
+
+
+def move_tree_into(src, dst):
+    """
+    Move everything under src into dst with renames, replacing files.
+    Safe to re-run after an interruption.
+    """
+    for root_path, dirs, files in os.walk(src):
+        rel = os.path.relpath(root_path, src)
+        target_root = dst if rel == "." else os.path.join(dst, rel)
+        os.makedirs(target_root, exist_ok=True)
+        for name in list(dirs):
+            target = os.path.join(target_root, name)
+            if not os.path.exists(target):
+                os.rename(os.path.join(root_path, name), target)
+                dirs.remove(name)
+        for name in files:
+            os.replace(os.path.join(root_path, name), os.path.join(target_root, name))
+
+
+TX_LOCK_NAME = "owner.lock"
+TX_CREATE_GRACE = 60  # seconds a tx without a journal is assumed to be starting up
+
+
+def get_staging_dir(mc_dir):
+    # Inside mc_dir so commits are same-filesystem renames into profiles/
+    return os.path.join(mc_dir, "installer_staging")
+
+
+def get_trash_dir(mc_dir):
+    return os.path.join(mc_dir, "installer_trash")
+
+
+def lower_thread_priority():
+    """
+    Move the calling thread (only) to background priority, so deleting or
+    scanning on it never competes with the UI or an install.
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            # Linux nice values are per thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        elif sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentThread.restype = wintypes.HANDLE
+            kernel32.SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+            # Background mode lowers CPU, disk and memory priority together
+            if not kernel32.SetThreadPriority(
+                kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN
+            ):
+                raise ctypes.WinError()
+        elif sys.platform == "darwin":
+            # who=0 is the calling thread; PRIO_DARWIN_BG also throttles its I/O
+            which = getattr(os, "PRIO_DARWIN_THREAD", 3)
+            os.setpriority(which, 0, getattr(os, "PRIO_DARWIN_BG", 0x1000))
+    except Exception as e:
+        log(f"Could not lower the priority of {threading.current_thread().name}: {e!r}")
+
+
+class TrashCollector:
+    """
+    Deletes trees moved into installer_trash, one at a time on a
+    low-priority daemon thread.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, path):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self.queue.put(path)
+
+    def wait(self):
+        self.queue.join()
+
+    def _run(self):
+        lower_thread_priority()
+        while True:
+            path = self.queue.get()
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                self.queue.task_done()
+
+
+_trash = TrashCollector()
+
+
+def discard_tree(path, mc_dir):
+    """
+    Rename path into mc_dir's trash to be deleted in the background,
+    or delete it in place if it can't be renamed.
+    """
+    if not os.path.lexists(path):
+        return
+    trash_dir = get_trash_dir(mc_dir)
+    try:
+        os.makedirs(trash_dir, exist_ok=True)
+        holder = tempfile.mkdtemp(prefix="trash_", dir=trash_dir)
+        os.rename(path, os.path.join(holder, os.path.basename(path)))
+        _trash.put(holder)
+    except OSError as e:
+        log(f"Could not move {path} to trash ({e!r}), deleting in place")
+        _trash.put(path)
+
+
+def purge_trash(mc_dir):
+    """Queue whatever an earlier run left in the trash for deletion."""
+    trash_dir = get_trash_dir(mc_dir)
+    if not os.path.isdir(trash_dir):
+        return
+    for entry in os.scandir(trash_dir):
+        _trash.put(entry.path)
+
+
+def make_work_dir(prefix, mc_dir):
+    """
+    (path, lock) for a new temp dir in mc_dir. The lock keeps --scan and
+    --reclaim away from it; pass both to discard_work_dir.
+    """
+    path = tempfile.mkdtemp(prefix=prefix, dir=mc_dir)
+    return path, try_lock_file(os.path.join(path, TX_LOCK_NAME))
+
+
+def discard_work_dir(path, lock, mc_dir):
+    release_lock_file(lock)
+    discard_tree(path, mc_dir)
+
+
+def dir_in_use(path):
+    """Whether a live process holds the lock of a make_work_dir dir."""
+    lock_path = os.path.join(path, TX_LOCK_NAME)
+    if not os.path.isfile(lock_path):
+        return False
+    lock = try_lock_file(lock_path)
+    if lock is None:
+        return True
+    release_lock_file(lock)
+    return False
+
+
+def get_scan_index_path(mc_dir):
+    return os.path.join(mc_dir, "installer_scan_index.json")
+
+
+def is_orphan_name(name):
+    return (
+        name in ORPHAN_NAMES
+        or name.startswith(ORPHAN_PREFIXES)
+        or name.endswith((".part", ".tmp"))
+    )
+
+
+class ScanIndex:
+    """
+    installer_scan_index.json: jar hashes keyed by size and mtime, so
+    unchanged jars are never re-hashed.
+    """
+
+    def __init__(self, mc_dir):
+        self.path = get_scan_index_path(mc_dir)
+        self.hashes = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.hashes = json.load(f).get("hashes", {})
+        except Exception:
+            pass
+        self._seen = set()
+
+    def listing(self, path):
+        """({file name: (size, mtime_ns)}, [subdirectory paths]) for path."""
+        files, subdirs = {}, []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        files[entry.name] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue  # deleted while we were listing
+        with self._lock:
+            self._seen.add(path)
+        return files, subdirs
+
+    def sha256(self, path, size, mtime_ns):
+        with self._lock:
+            cached = self.hashes.get(path)
+        if cached is not None and cached[:2] == [size, mtime_ns]:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(INFLATE_CHUNK), b""):
+                digest.update(chunk)
+        with self._lock:
+            self.hashes[path] = [size, mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def save(self):
+        # Forget jars whose directory wasn't seen on this scan
+        hashes = {
+            p: h for p, h in self.hashes.items() if os.path.dirname(p) in self._seen
+        }
+        write_json_atomic(self.path, {"hashes": hashes}, indent=None)
+
+
+def tree_usage(index, path):
+    """(bytes, files, {jar path: (size, mtime_ns)}) under path, via index."""
+    total = count = 0
+    jars = {}
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        try:
+            files, subdirs = index.listing(current)
+        except OSError:
+            continue
+        for name, (size, mtime_ns) in files.items():
+            total += size
+            count += 1
+            if name.endswith(".jar"):
+                jars[os.path.join(current, name)] = (size, mtime_ns)
+        pending.extend(subdirs)
+    return total, count, jars
+
+
+def copy_leftovers(index, path):
+    """(path, mtime_ns) of each COPY_SUFFIX file under path, via index."""
+    found = []
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        try:
+            files, subdirs = index.listing(current)
+        except OSError:
+            continue
+        for name, (_size, mtime_ns) in files.items():
+            if name.endswith(COPY_SUFFIX):
+                found.append((os.path.join(current, name), mtime_ns))
+        pending.extend(subdirs)
+    return found
+
+
+def scan_profiles(mc_dir, catalog=None, workers=SCAN_WORKERS):
+    """
+    Space report for mc_dir: size per profile, duplicated jars, leftover
+    temp artifacts and, given a Catalog, profiles it doesn't know.
+    """
+    started = time.monotonic()
+    index = ScanIndex(mc_dir)
+    profiles_dir = os.path.join(mc_dir, "profiles")
+    now = time.time()
+
+    orphans = []
+    candidates = [(mc_dir, "mc_dir")]
+    folders = installed_profiles(mc_dir)
+    candidates += [(os.path.join(profiles_dir, f), f) for f in folders]
+    for parent, owner in candidates:
+        try:
+            entries = list(os.scandir(parent))
+        except OSError:
+            continue
+        for entry in entries:
+            if not is_orphan_name(entry.name):
+                continue
+            if owner == "mc_dir" and entry.name.endswith(".tmp"):
+                continue  # state files being written right now
+            try:
+                if now - entry.stat(follow_symlinks=False).st_mtime < ORPHAN_MIN_AGE:
+                    continue
+            except OSError:
+                continue
+            if dir_in_use(entry.path):
+                continue
+            orphans.append({"path": entry.path, "owner": owner})
+    try:
+        orphans += [
+            {"path": e.path, "owner": "installer_trash"}
+            for e in os.scandir(get_trash_dir(mc_dir))
+        ]
+    except OSError:
+        pass
+
+    # Copies interrupted mid-merge leave a temp file next to their target
+    for dirname in COPY_DIRS:
+        for path, mtime_ns in copy_leftovers(index, os.path.join(mc_dir, dirname)):
+            if now - mtime_ns / 1e9 >= ORPHAN_MIN_AGE:
+                orphans.append({"path": path, "owner": "mc_dir"})
+
+    def measure_profile(folder):
+        return (folder,) + tree_usage(index, os.path.join(profiles_dir, folder))
+
+    def measure_orphan(orphan):
+        # The TrashCollector may delete any of these while we measure
+        try:
+            if os.path.isdir(orphan["path"]) and not os.path.islink(orphan["path"]):
+                orphan["bytes"] = tree_usage(index, orphan["path"])[0]
+            else:
+                orphan["bytes"] = os.lstat(orphan["path"]).st_size
+        except OSError:
+            return None
+        return orphan
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        measured = list(pool.map(measure_profile, folders))
+        orphans = [o for o in pool.map(measure_orphan, orphans) if o is not None]
+
+        # Only jars sharing a size with another profile's jar get hashed
+        by_size = {}
+        for folder, _bytes, _files, jars in measured:
+            for path, (size, mtime_ns) in jars.items():
+                by_size.setdefault(size, []).append((folder, path, mtime_ns))
+        suspects = [
+            (size, item)
+            for size, items in by_size.items()
+            if len({folder for folder, _p, _m in items}) > 1
+            for item in items
+        ]
+        hashes = pool.map(
+            lambda job: index.sha256(job[1][1], job[0], job[1][2]), suspects
+        )
+        groups = {}
+        for (size, (folder, path, _m)), digest in zip(suspects, hashes):
+            groups.setdefault((digest, size), []).append(path)
+
+    index.save()
+    duplicates = [
+        {"sha256": digest, "size": size, "paths": sorted(paths), "wasted": size * (len(paths) - 1)}
+        for (digest, size), paths in groups.items()
+        if len(paths) > 1
+    ]
+    duplicates.sort(key=lambda d: d["wasted"], reverse=True)
+    profiles = [
+        {
+            "folder": folder,
+            "bytes": size,
+            "files": count,
+            "in_catalog": None if catalog is None else folder in catalog.by_folder,
+        }
+        for folder, size, count, _jars in measured
+    ]
+    profiles.sort(key=lambda p: p["bytes"], reverse=True)
+    return {
+        "scanned_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+        "total_bytes": sum(p["bytes"] for p in profiles),
+        "profiles": profiles,
+        "duplicates": duplicates,
+        "duplicate_bytes": sum(d["wasted"] for d in duplicates),
+        "orphans": sorted(orphans, key=lambda o: o["path"]),
+        "reclaimable_bytes": sum(o["bytes"] for o in orphans),
+        "uncataloged": [p["folder"] for p in profiles if p["in_catalog"] is False],
+    }
+
+
+def reclaim_space(mc_dir, report):
+    """
+    Delete the orphaned temp artifacts in a scan_profiles report;
+    returns the bytes freed.
+    """
+    freed = 0
+    for orphan in report["orphans"]:
+        path = orphan["path"]
+        if dir_in_use(path):
+            log(f"SCAN: {path} is in use, skipped")
+            continue
+        try:
+            if orphan["owner"] == "installer_trash":
+                _trash.put(path)
+            elif os.path.isdir(path) and not os.path.islink(path):
+                discard_tree(path, mc_dir)
+            else:
+                os.remove(path)
+        except OSError as e:
+            log(f"SCAN: could not remove {path}: {e!r}")
+            continue
+        log(f"SCAN: reclaimed {path} ({orphan['bytes']} bytes)")
+        freed += orphan["bytes"]
+    return freed
+
+
+class InstallTransaction:
+    """
+    Stages a profile change under installer_staging/tx_* and applies it
+    with journaled renames in commit().
+    """
+
+    def __init__(self, mc_dir, profile_dir):
+        staging_dir = get_staging_dir(mc_dir)
+        os.makedirs(staging_dir, exist_ok=True)
+        self.mc_dir = mc_dir
+        self.root = tempfile.mkdtemp(prefix="tx_", dir=staging_dir)
+        # Held until discard(); recovery in other processes skips a locked tx
+        self._owner = try_lock_file(os.path.join(self.root, TX_LOCK_NAME))
+        self.journal = {
+            "profile_dir": profile_dir,
+            "state": "staging",
+            "pid": os.getpid(),
+            "ops": [],
+        }
+        self._write_journal()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.journal["state"] == "staging":
+            # Nothing outside the staging dir was touched; just drop it
+            self.discard()
+        return False
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def rename(self, src, dst):
+        self.journal["ops"].append({"op": "rename", "src": src, "dst": dst})
+
+    def merge(self, src, dst):
+        self.journal["ops"].append({"op": "merge", "src": src, "dst": dst})
+
+    def commit(self):
+        self.journal["state"] = "committing"
+        self._write_journal()
+        apply_journal_ops(self.journal["ops"], self._write_journal)
+        self.journal["state"] = "committed"
+        self._write_journal()
+        self.discard()
+
+    def discard(self):
+        # Old mods and extraction leftovers go with it, off the install's path
+        release_lock_file(self._owner)
+        discard_tree(self.root, self.mc_dir)
+
+    def _write_journal(self):
+        write_journal(self.root, self.journal)
+
+
+def write_journal(tx_root, journal):
+    journal_path = os.path.join(tx_root, "journal.json")
+    with open(journal_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(journal, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(journal_path + ".tmp", journal_path)
+
+
+def apply_journal_ops(ops, save):
+    """
+    Apply ops in order, saving each as done right after it is applied, so
+    a replay never redoes one (after a swap the old path holds NEW content).
+    """
+    for op in ops:
+        if op.get("done"):
+            continue
+        src, dst = op["src"], op["dst"]
+        if os.path.exists(src):
+            if op["op"] == "rename":
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(src, dst)
+            else:
+                move_tree_into(src, dst)
+        op["done"] = True
+        save()
+
+
+def recover_transactions(mc_dir):
+    """
+    Roll interrupted installs forward, or discard ones that never
+    committed. Transactions a running installer still locks are skipped.
+    """
+    staging_dir = get_staging_dir(mc_dir)
+    if not os.path.isdir(staging_dir):
+        return
+    for name in os.listdir(staging_dir):
+        tx_root = os.path.join(staging_dir, name)
+        if not os.path.isdir(tx_root):
+            continue
+        try:
+            owner = try_lock_file(os.path.join(tx_root, TX_LOCK_NAME))
+        except OSError:
+            continue  # discarded by someone else meanwhile
+        if owner is None:
+            log(f"RECOVERY: {tx_root} belongs to a running installer, skipping")
+            continue
+        try:
+            journal = None
+            try:
+                with open(os.path.join(tx_root, "journal.json"), "r", encoding="utf-8") as f:
+                    journal = json.load(f)
+            except Exception:
+                pass
+
+            if journal is None and time.time() - os.stat(tx_root).st_mtime < TX_CREATE_GRACE:
+                continue  # just created; its owner hasn't locked it yet
+            if journal and journal.get("state") == "committing":
+                try:
+                    apply_journal_ops(
+                        journal["ops"], lambda: write_journal(tx_root, journal)
+                    )
+                    journal["state"] = "committed"
+                    write_journal(tx_root, journal)
+                    log(f"RECOVERY: rolled forward install of {journal['profile_dir']}")
+                except Exception as e:
+                    log(f"RECOVERY: could not roll forward {tx_root}: {e!r}")
+                    continue
+            elif journal and journal.get("state") != "committed":
+                log(f"RECOVERY: discarded unfinished install of {journal['profile_dir']}")
+        finally:
+            release_lock_file(owner)
+        discard_tree(tx_root, mc_dir)
+
+
+class CombinedProgress:
+    """
+    One progress bar over phases running at once, weighted by bytes
+    (expected sizes up front, replaced by real totals as they report).
+    """
+
+    def __init__(self, report, expected):
+        self.report = report
+        self.totals = dict(expected)
+        self.done = dict.fromkeys(expected, 0)
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def callback(self, part):
+        def update(current, total, _eta=0):
+            with self._lock:
+                self.done[part] = current
+                if total:
+                    self.totals[part] = max(total, current)
+                done = sum(self.done.values())
+                total_all = max(sum(self.totals.values()), done)
+            elapsed = time.time() - self.started
+            eta = (total_all - done) * elapsed / done if done else 0
+            self.report(done, total_all, eta)
+
+        return update
+
+
+class InstallRun:
+    """
+    Progress state of one run_plan call, handed to every install step so
+    concurrent runs never share status or loader waits.
+    """
+
+    def __init__(self, report, reset=None, plan=None):
+        self.report = report
+        self.reset = reset or (lambda: None)
+        self.plan = plan
+        self.action = "Processing"  # shown next to the percentage
+        # Set by run_overlapped while a pack and its loader install side by side
+        self.combined = None
+        self.loader_futures = {}
+
+    def progress(self, current, total, eta=0):
+        self.report(current, total, eta, self.action)
+
+    def progress_for(self, part):
+        """Progress callback for one phase of an install."""
+        if self.combined is not None:
+            return self.combined.callback(part)
+        return self.progress
+
+    def reset_progress(self):
+        if self.combined is None:
+            self.reset()
+
+    def download_hint(self, url):
+        return self.plan.download_hint(url) if self.plan is not None else None
+
+
+_hardware = None
+
+
+def system_memory_mb():
+    """Physical RAM in MB, or None when the platform won't say."""
+    try:
+        system = platform.system()
+        if system == "Windows":
+            import ctypes
+
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return None
+            return status.ullTotalPhys // (1024 * 1024)
+        if system == "Darwin":
+            out = subprocess.run(
+                ["sysctl", "-n", "hw.memsize"], capture_output=True, text=True, timeout=5
+            ).stdout
+            return int(out.strip()) // (1024 * 1024)
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except Exception as e:
+        log(f"JVM: could not read physical memory: {e!r}")
+        return None
+
+
+def hardware():
+    """(RAM in MB or None, CPU count), probed once per run."""
+    global _hardware
+    if _hardware is None:
+        _hardware = (system_memory_mb(), os.cpu_count() or 2)
+        log(f"JVM: {_hardware[0]} MB RAM, {_hardware[1]} CPUs")
+    return _hardware
+
+
+def mods_footprint(profile_dir):
+    """(jar count, total jar bytes) in profile_dir/mods."""
+    count = size = 0
+    try:
+        with os.scandir(os.path.join(profile_dir, "mods")) as it:
+            for entry in it:
+                if entry.name.endswith(".jar") and entry.is_file():
+                    count += 1
+                    size += entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return count, size
+
+
+def parse_xmx_mb(jvm_args):
+    """The -Xmx in jvm_args in MB, or None."""
+    match = re.search(r"-Xmx(\d+)([kKmMgG]?)(?:\s|$)", jvm_args or "")
+    if not match:
+        return None
+    value, unit = int(match.group(1)), match.group(2).lower()
+    return {"k": value // 1024, "m": value, "g": value * 1024, "": value // (1024 * 1024)}[unit]
+
+
+def heap_bounds(config):
+    """
+    (min, max) heap in MB for a pack: heap_min_mb/heap_max_mb when set,
+    otherwise the -Xmx the pack's jvm_args were curated with is the max.
+    """
+    heap_max = config.get("heap_max_mb") or parse_xmx_mb(config.get("jvm_args")) or HEAP_MAX_MB
+    heap_min = config.get("heap_min_mb") or min(HEAP_MIN_MB, heap_max)
+    return heap_min, heap_max
+
+
+def affordable_heap_mb(ram_mb):
+    """
+    The most heap this machine can spare: RAM minus the OS reserve and
+    off-heap use, and at most half of RAM on small machines.
+    """
+    affordable = ram_mb - OS_RESERVE_MB - JVM_OFFHEAP_MB
+    if ram_mb <= SMALL_MACHINE_MB:
+        affordable = min(affordable, ram_mb // 2)
+    return affordable
+
+
+def recommend_heap_mb(mod_count, mods_bytes, ram_mb, heap_min=HEAP_MIN_MB, heap_max=HEAP_MAX_MB):
+    """
+    -Xmx for a pack from its mods, within the pack's bounds, rounded to
+    512 MB, and never more than the machine can spare.
+    """
+    want = (
+        HEAP_BASE_MB
+        + HEAP_PER_MOD_MB * mod_count
+        + HEAP_PER_JAR_MB * mods_bytes // (1024 * 1024)
+    )
+    heap = min(max(want, heap_min), heap_max)
+    heap = min(-(-heap // 512) * 512, heap_max)
+    if ram_mb:
+        heap = min(heap, affordable_heap_mb(ram_mb) // 512 * 512)
+    return max(heap, HEAP_FLOOR_MB)
+
+
+def gc_flags(heap_mb, cpus):
+    """G1 tuned for short pauses, with GC threads left for the game."""
+    gc_threads = max(1, min(cpus - 1, 8))
+    flags = [
+        "-XX:+UseG1GC",
+        "-XX:+ParallelRefProcEnabled",
+        "-XX:MaxGCPauseMillis=50",
+        f"-XX:ParallelGCThreads={gc_threads}",
+        f"-XX:ConcGCThreads={max(1, gc_threads // 4)}",
+    ]
+    if heap_mb >= 8192:
+        flags.append("-XX:G1HeapRegionSize=16M")
+    return flags
+
+
+# Flags the generated set replaces in a pack's own jvm_args
+HEAP_FLAG_PREFIXES = ("-Xmx", "-Xms")
+GC_SELECTOR_FLAGS = (
+    "-XX:+UseG1GC", "-XX:+UseZGC", "-XX:+UseShenandoahGC",
+    "-XX:+UseParallelGC", "-XX:+UseSerialGC", "-XX:+UseConcMarkSweepGC",
+)
+TUNED_FLAG_PREFIXES = HEAP_FLAG_PREFIXES + (
+    "-XX:ParallelGCThreads=", "-XX:ConcGCThreads=", "-XX:MaxGCPauseMillis=",
+    "-XX:G1HeapRegionSize=", "-XX:+ParallelRefProcEnabled",
+)
+
+
+def tuned_jvm_args(config, profile_dir):
+    """
+    The pack's jvm_args with the heap sized for this machine. GC flags are
+    generated too, unless the pack picks its own collector.
+    """
+    ram_mb, cpus = hardware()
+    mod_count, mods_bytes = mods_footprint(profile_dir)
+    heap_min, heap_max = heap_bounds(config)
+    heap = recommend_heap_mb(mod_count, mods_bytes, ram_mb, heap_min, heap_max)
+    if heap < heap_min:
+        log(
+            f"JVM: {config['folder_name']} asks for at least {heap_min} MB of heap, "
+            f"but this machine ({ram_mb} MB RAM) can only spare {heap} MB"
+        )
+    given = config.get("jvm_args", DEFAULT_JVM_ARGS).split()
+    # A collector the pack chose keeps its own tuning flags with it
+    own_gc = any(arg in GC_SELECTOR_FLAGS for arg in given)
+    replaced = HEAP_FLAG_PREFIXES if own_gc else TUNED_FLAG_PREFIXES
+    kept = [arg for arg in given if not arg.startswith(replaced)]
+    args = [f"-Xmx{heap}m", f"-Xms{min(heap, 1024)}m"]
+    args += ([] if own_gc else gc_flags(heap, cpus)) + kept
+    log(f"JVM: {config['folder_name']}: {mod_count} mods, {mods_bytes >> 20} MB -> -Xmx{heap}m")
+    return " ".join(args)
+
+
+def launcher_profile_id(name):
+    return name.replace(" ", "_")
+
+
+def icon_sha256(icon):
+    """SHA-256 of the PNG inside a data:image/png;base64 icon, else None."""
+    prefix = "data:image/png;base64,"
+    if not icon or not icon.startswith(prefix):
+        return None
+    try:
+        png = base64.b64decode(icon[len(prefix):], validate=True)
+    except ValueError:
+        return None
+    return hashlib.sha256(png).hexdigest()
+
+
+def read_launcher_profiles(mc_dir):
+    """launcher_profiles.json's "profiles", or {} if it can't be read."""
+    try:
+        with open(os.path.join(mc_dir, "launcher_profiles.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("profiles", {})
+    except Exception:
+        return {}
+
+
+def reconcile_launcher_profiles(data, entries, now):
+    """
+    Bring launcher_profiles.json data in line with entries, in place.
+    Returns [(profile_id, "add" | "update" | "same", changed_keys)].
+    """
+    profiles = data.setdefault("profiles", {})
+    changes = []
+    for entry in entries:
+        profile_id = launcher_profile_id(entry["name"])
+        desired = {
+            "gameDir": entry["game_dir"],
+            "icon": entry["icon"],
+            "lastVersionId": entry["version_id"],
+            "name": entry["name"],
+            "type": "custom",
+            "javaArgs": (
+                f'{entry["jvm_args"]} '
+                f'-Dminecraft.applet.TargetDirectory="{entry["game_dir"]}"'
+            ),
+        }
+        current = profiles.get(profile_id)
+        if current is None:
+            profiles[profile_id] = {"created": now, "lastUsed": now, **desired}
+            changes.append((profile_id, "add", sorted(desired)))
+            continue
+        changed = sorted(k for k, v in desired.items() if current.get(k) != v)
+        current.update(desired)
+        changes.append((profile_id, "update" if changed else "same", changed))
+    return changes
+
+
+def write_json_atomic(path, data, indent=2):
+    # A temp name of its own, so concurrent writers never share one
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)  # mkstemp makes it 0600
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def extract_archive(zip_path, dest, roots=None, progress_cb=None, kind="zip"):
+    """
+    Extract zip_path into dest. With roots (from zip_roots) only members
+    under each prefix are extracted, to dest/<dirname>.
+    """
+    progress_cb = progress_cb or (lambda *a: None)
+    os.makedirs(dest, exist_ok=True)
+    if kind == "tar.zst":
+        extract_tar_zst(zip_path, dest, roots, progress_cb)
+        return
+
+    with open_archive(zip_path) as raw, zipfile.ZipFile(raw, "r") as z:
+        base = getattr(raw, "base", 0)
+        if roots is None:
+            members = z.infolist()
+        else:
+            members = []
+            for dirname, prefix in roots.items():
+                os.makedirs(os.path.join(dest, dirname), exist_ok=True)
+                for info in z.infolist():
+                    rest = info.filename[len(prefix):]
+                    if info.filename.startswith(prefix) and rest:
+                        # Renamed copy: extract() writes it under the new
+                        # name and still sanitizes it like any member.
+                        info = copy.copy(info)
+                        info.filename = f"{dirname}/{rest}"
+                        members.append(info)
+
+        total_size = sum(f.file_size for f in members)
+        extracted_size = 0
+        start_time = time.time()
+        last_update_time = 0
+
+        mm = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for file_info in members:
+                extract_member(z, file_info, dest, mm, raw.fileno(), base)
+                extracted_size += file_info.file_size
+
+                current_time = time.time()
+                if current_time - last_update_time > 0.1:
+                    elapsed_time = current_time - start_time
+                    if elapsed_time > 0 and extracted_size > 0:
+                        speed = extracted_size / elapsed_time
+                        if speed > 0:
+                            remaining = total_size - extracted_size
+                            eta = remaining / speed
+                        else:
+                            eta = 0
+                        progress_cb(extracted_size, total_size, eta)
+                    last_update_time = current_time
+        finally:
+            mm.close()
+
+        progress_cb(total_size, total_size, 0)
+
+
+def extract_tar_zst(path, dest, roots, progress_cb, keep=None):
+    """
+    extract_archive for .tar.zst in one streaming pass; without roots,
+    only the names keep() accepts. Progress follows compressed bytes.
+    """
+    total_size = archive_size(path)
+    last_update_time = 0
+    start_time = time.time()
+    if roots:
+        for dirname in roots:
+            os.makedirs(os.path.join(dest, dirname), exist_ok=True)
+
+    with open_archive(path) as raw, open_zstd(raw) as stream:
+        with tarfile.open(fileobj=stream, mode="r|") as tar:
+            for member in tar:
+                if roots is not None:
+                    name = member.name + ("/" if member.isdir() else "")
+                    for dirname, prefix in roots.items():
+                        if name.startswith(prefix) and name != prefix:
+                            member.name = f"{dirname}/{name[len(prefix):]}"
+                            break
+                    else:
+                        continue
+                elif keep is not None:
+                    if not keep(member.name + ("/" if member.isdir() else "")):
+                        continue
+                if TAR_HAS_FILTER:
+                    # The "data" filter refuses absolute paths, '..' and
+                    # links pointing outside dest
+                    tar.extract(member, dest, filter="data")
+                else:
+                    extract_tar_member(tar, member, dest)
+
+                current_time = time.time()
+                if current_time - last_update_time > 0.1:
+                    done = raw.tell()
+                    elapsed_time = current_time - start_time
+                    eta = (total_size - done) * elapsed_time / done if done else 0
+                    progress_cb(done, total_size, eta)
+                    last_update_time = current_time
+
+    progress_cb(total_size, total_size, 0)
+
+
+def extract_tar_member(tar, member, dest):
+    """
+    tar.extract for Pythons without extraction filters: files and
+    directories only, placed with member_path.
+    """
+    target = member_path(dest, member.name)
+    if member.isdir():
+        os.makedirs(target, exist_ok=True)
+    elif member.isfile():
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with tar.extractfile(member) as src, open(target, "wb") as out:
+            shutil.copyfileobj(src, out, INFLATE_CHUNK)
+        os.utime(target, (member.mtime, member.mtime))
+    else:
+        log(f"Skipped {member.name} in tar: not a regular file")
+
+
+def extract_dirs(
+    zip_path, dest, dirnames, progress_cb=None, kind="zip", whole_if_missing=False
+):
+    """
+    Extract the shallowest directory named each of dirnames to
+    dest/<dirname>; returns the roots found, as zip_roots would.
+    """
+    if kind != "tar.zst":
+        roots = zip_roots(zip_path, dirnames)
+        if whole_if_missing and not roots:
+            extract_archive(zip_path, dest, None, progress_cb, kind)
+        else:
+            extract_archive(zip_path, dest, roots, progress_cb, kind)
+        return roots
+
+    scratch = os.path.join(dest, ".candidates")
+    names = []
+
+    def keep(name):
+        if any(part in dirnames for part in name.split("/")[:-1]):
+            names.append(name)
+            return True
+        return False
+
+    extract_tar_zst(zip_path, scratch, None, progress_cb or (lambda *a: None), keep)
+    roots = {}
+    for dirname in dirnames:
+        prefix = zip_dir_prefix(names, dirname)
+        if prefix is not None:
+            roots[dirname] = prefix
+            os.rename(member_path(scratch, prefix), os.path.join(dest, dirname))
+    shutil.rmtree(scratch, ignore_errors=True)
+    if whole_if_missing and not roots:
+        # Rare (a simple pack with no mods folder): a second pass for the rest
+        extract_archive(zip_path, dest, None, progress_cb, kind)
+    return roots
+
+
+class InstallerApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Modpack Installer")
+        self.root.configure(bg=BG_COLOR)
+
+        self.init_state()
+
+        # Center window
+        window_width = 500
+        window_height = 860
+        screen_width = root.winfo_screenwidth()
+        screen_height = root.winfo_screenheight()
+        x = (screen_width // 2) - (window_width // 2)
+        y = (screen_height // 2) - (window_height // 2)
+        self.root.geometry(f"{window_width}x{window_height}+{int(x)}+{int(y)}")
+
+        # Configure Dark Theme Styles
+        style = ttk.Style()
+        style.theme_use("clam")  # 'clam' allows for better color customization
+
+        style.configure(
+            "TLabel",
+            background=BG_COLOR,
+            foreground=FG_COLOR,
+            font=("Segoe UI", 10),
+        )
+        style.configure(
+            "TButton",
+            background=BUTTON_BG,
+            foreground=BUTTON_FG,
+            borderwidth=1,
+            font=("Segoe UI", 10),
+        )
+        style.map("TButton", background=[("active", BUTTON_ACTIVE)])
+
+        style.configure(
+            "TCombobox",
+            fieldbackground=ENTRY_BG,
+            background=BUTTON_BG,
+            foreground=FG_COLOR,
+            arrowcolor=FG_COLOR,
+        )
+        style.map(
+            "TCombobox",
+            fieldbackground=[("readonly", ENTRY_BG)],
+            selectbackground=[("readonly", ACCENT_COLOR)],
+        )
+
+        style.configure(
+            "Horizontal.TProgressbar",
+            background=ACCENT_COLOR,
+            troughcolor=BUTTON_BG,
+            bordercolor=BG_COLOR,
+            lightcolor=ACCENT_COLOR,
+            darkcolor=ACCENT_COLOR,
+        )
+
+        style.configure(
+            "Treeview",
+            background=ENTRY_BG,
+            fieldbackground=ENTRY_BG,
+            foreground=FG_COLOR,
+            font=("Segoe UI", 9),
+        )
+        style.configure(
+            "Treeview.Heading",
+            background=BUTTON_BG,
+            foreground=FG_COLOR,
+            font=("Segoe UI", 9, "bold"),
+        )
+
+        self.modpacks = self.load_data()
+        self.catalog = Catalog(self.modpacks)
+        self.search_results = None  # None = no filter active
+        self._search_job = None
+        self._details_fetched_for = None  # the Catalog load_search_details ran on
+
+        # --- DEBUG ICON (Top Right) ---
+        self.btn_debug = tk.Button(
+            root,
+            text="⚙",
+            font=("Segoe UI", 12),
+            command=self.open_debug_menu,
+            bg=BG_COLOR,
+            fg=FG_COLOR,
+            activebackground=BUTTON_ACTIVE,
+            activeforeground=FG_COLOR,
+            bd=0,
+            highlightthickness=0,
+        )
+        self.btn_debug.place(relx=0.92, rely=0.02)
+
+        # Header
+        tk.Label(
+            root,
+            text="Select a Modpack",
+            font=("Segoe UI", 18, "bold"),
+            bg=BG_COLOR,
+            fg=FG_COLOR,
+        ).pack(pady=(20, 10))
+
+        self.btn_refresh = tk.Button(
+            root,
+            text="Refresh List",
+            command=self.refresh_data,
+            font=("Segoe UI", 9),
+            bg=BUTTON_BG,
+            fg=BUTTON_FG,
+            activebackground=BUTTON_ACTIVE,
+            activeforeground=BUTTON_FG,
+            bd=1,
+            relief="flat",
+        )
+        self.btn_refresh.pack(pady=5)
+
+        # Main Content Frame
+        content_frame = tk.Frame(root, bg=BG_COLOR)
+        content_frame.pack(fill="both", expand=True, padx=20)
+
+        # Search Box
+        tk.Label(
+            content_frame,
+            text="SEARCH",
+            font=("Segoe UI", 9, "bold"),
+            bg=BG_COLOR,
+            fg="#AAAAAA",
+        ).pack(pady=(15, 2), anchor="w")
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(
+            content_frame,
+            textvariable=self.search_var,
+            bg=ENTRY_BG,
+            fg=ENTRY_FG,
+            insertbackground=ENTRY_FG,
+            relief="flat",
+            font=("Segoe UI", 11),
+        )
+        self.search_entry.pack(pady=5, fill="x", ipady=3)
+        self.search_var.trace_add("write", self.on_search_changed)
+
+        # Category Dropdown
+        tk.Label(
+            content_frame,
+            text="CATEGORY",
+            font=("Segoe UI", 9, "bold"),
+            bg=BG_COLOR,
+            fg="#AAAAAA",
+        ).pack(pady=(15, 2), anchor="w")
+        self.selected_category = tk.StringVar()
+        self.cat_dropdown = ttk.Combobox(
+            content_frame,
+            textvariable=self.selected_category,
+            state="readonly",
+            font=("Segoe UI", 11),
+        )
+        if self.modpacks:
+            self.cat_dropdown["values"] = self.catalog.categories
+            self.cat_dropdown.current(0)
+        else:
+            self.cat_dropdown["values"] = ["Error loading data"]
+        self.cat_dropdown.bind("<<ComboboxSelected>>", self.update_pack_dropdown)
+        self.cat_dropdown.pack(pady=5, fill="x")
+
+        # Pack Dropdown
+        tk.Label(
+            content_frame,
+            text="MODPACK",
+            font=("Segoe UI", 9, "bold"),
+            bg=BG_COLOR,
+            fg="#AAAAAA",
+        ).pack(pady=(15, 2), anchor="w")
+        self.selected_pack = tk.StringVar()
+        self.pack_dropdown = ttk.Combobox(
+            content_frame,
+            textvariable=self.selected_pack,
+            state="readonly",
+            font=("Segoe UI", 11),
+        )
+        self.pack_dropdown.bind("<<ComboboxSelected>>", self.on_pack_selected)
+        self.pack_dropdown.pack(pady=5, fill="x")
+
+        # Icon Area
+        self.icon_frame = tk.Frame(content_frame, bg=BG_COLOR, height=80)
+        self.icon_frame.pack(pady=(20, 10))
+        self.icon_label = tk.Label(self.icon_frame, text="", bg=BG_COLOR)
+        self.icon_label.pack()
+
+        # Installed / update state of the selected pack
+        self.pack_state_label = tk.Label(
+            content_frame,
+            text="",
+            font=("Segoe UI", 9, "bold"),
+            fg="#88CC88",
+            bg=BG_COLOR,
+        )
+        self.pack_state_label.pack(pady=(0, 5))
+
+        # Description Label
+        self.desc_label = tk.Label(
+            content_frame,
+            text="Description will appear here.",
+            font=("Segoe UI", 10),
+            fg="#CCCCCC",
+            bg=BG_COLOR,
+            wraplength=400,
+            justify="center",
+        )
+        self.desc_label.pack(pady=(0, 10))
+
+        # Rating Frame
+        self.rating_frame = tk.Frame(content_frame, bg=BG_COLOR)
+        self.rating_frame.pack(pady=(5, 15))
+
+        self.rating_title = tk.Label(
+            self.rating_frame,
+            text="RATING",
+            font=("Segoe UI", 8, "bold"),
+            fg="#888888",
+            bg=BG_COLOR,
+        )
+        self.rating_title.pack(anchor="center")
+
+        self.rating_text = tk.Label(
+            self.rating_frame,
+            text="",
+            font=("Segoe UI", 10, "bold"),
+            fg="#FFD700",
+            bg=BG_COLOR,
+            wraplength=400,
+            justify="center",
+        )
+        self.rating_text.pack(anchor="center")
+
+        # Install Button
+        self.btn_install = tk.Button(
+            root,
+            text="INSTALL SELECTED PACK",
+            command=self.start_thread,
+            bg=ACCENT_COLOR,
+            fg="white",
+            font=("Segoe UI", 11, "bold"),
+            activebackground="#005A9E",
+            activeforeground="white",
+            bd=0,
+            relief="flat",
+            height=2,
+        )
+        self.btn_install.pack(pady=(20, 10), fill="x", padx=40)
+
+        # Commands Help Button
+        self.btn_commands = tk.Button(
+            root,
+            text="COMMAND HELP",
+            command=self.show_command_help,
+            bg=BUTTON_BG,
+            fg=BUTTON_FG,
+            font=("Segoe UI", 9),
+            activebackground=BUTTON_ACTIVE,
+            activeforeground=BUTTON_FG,
+            bd=1,
+            relief="flat",
+            height=1,
+            state="disabled",  # Start disabled
+        )
+        self.btn_commands.pack(pady=(0, 10), fill="x", padx=40)
+
+        # Progress Bar
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(
+            root,
+            variable=self.progress_var,
+            maximum=100,
+            style="Horizontal.TProgressbar",
+        )
+
+        # Status Label
+        self.status = tk.Label(
+            root,
+            text="Ready",
+            fg="#888888",
+            bg=BG_COLOR,
+            font=("Segoe UI", 9),
+        )
+        self.status.pack(side="bottom", pady=15)
+
+        # What the running install will fetch, kept above the step-by-step status
+        self.plan_label = tk.Label(
+            root,
+            text="",
+            fg="#888888",
+            bg=BG_COLOR,
+            font=("Segoe UI", 9),
+        )
+
+        if self.modpacks:
+            self.update_pack_dropdown(None)
+
+    # --- DEBUG MENU LOGIC ---
+    def open_debug_menu(self):
+        debug_win = tk.Toplevel(self.root)
+        debug_win.title("Debug / Tools")
+        debug_win.geometry("350x440")
+        debug_win.configure(bg=BG_COLOR)
+
+        tk.Label(
+            debug_win,
             text="Maintenance Tools",
             font=("Segoe UI", 12, "bold"),
             bg=BG_COLOR,
@@ -392,6 +3325,45 @@ class InstallerApp:
         )
         btn_update_json.pack(pady=5, fill="x", padx=30, ipady=5)
 
+        btn_preview_json = tk.Button(
+            debug_win,
+            text="Preview Profile Changes (Dry Run)",
+            command=lambda: self.debug_update_profiles(debug_win, dry_run=True),
+            bg=BUTTON_BG,
+            fg=BUTTON_FG,
+            activebackground=BUTTON_ACTIVE,
+            activeforeground=BUTTON_FG,
+            relief="flat",
+            font=("Segoe UI", 10),
+        )
+        btn_preview_json.pack(pady=5, fill="x", padx=30, ipady=5)
+
+        btn_check = tk.Button(
+            debug_win,
+            text="Check for Updates",
+            command=self.debug_check_updates,
+            bg=BUTTON_BG,
+            fg=BUTTON_FG,
+            activebackground=BUTTON_ACTIVE,
+            activeforeground=BUTTON_FG,
+            relief="flat",
+            font=("Segoe UI", 10),
+        )
+        btn_check.pack(pady=5, fill="x", padx=30, ipady=5)
+
+        btn_scan = tk.Button(
+            debug_win,
+            text="Disk Usage / Cleanup",
+            command=self.debug_scan_profiles,
+            bg=BUTTON_BG,
+            fg=BUTTON_FG,
+            activebackground=BUTTON_ACTIVE,
+            activeforeground=BUTTON_FG,
+            relief="flat",
+            font=("Segoe UI", 10),
+        )
+        btn_scan.pack(pady=5, fill="x", padx=30, ipady=5)
+
         # Button 2: Update Mods
         tk.Label(
             debug_win,
@@ -435,61 +3407,221 @@ class InstallerApp:
         )
         btn_update_mods.pack(pady=10, fill="x", padx=30, ipady=5)
 
-    def debug_update_profiles(self, window):
+    def debug_check_updates(self):
+        win = tk.Toplevel(self.root)
+        win.title("Update Check")
+        win.geometry("560x380")
+        win.configure(bg=BG_COLOR)
+
+        summary = tk.Label(
+            win, text="Checking...", font=("Segoe UI", 10), bg=BG_COLOR, fg=FG_COLOR
+        )
+        summary.pack(pady=(10, 0))
+
+        columns = (
+            ("profile", "Profile", 220),
+            ("mods", "Mods", 110),
+            ("loader", "Loader", 90),
+            ("status", "Status", 120),
+        )
+        table = ttk.Treeview(win, columns=[c[0] for c in columns], show="headings")
+        for key, text, width in columns:
+            table.heading(key, text=text)
+            table.column(key, width=width)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def done(report, error):
+            if not win.winfo_exists():
+                return
+            if error is not None:
+                summary.config(text=f"Check failed: {error}")
+                return
+            rows = report["profiles"]
+            for row in rows:
+                table.insert(
+                    "",
+                    "end",
+                    values=(
+                        row.get("profile_name", row["folder"]),
+                        row.get("mods", {}).get("status", ""),
+                        row.get("loader", {}).get("status", ""),
+                        row["status"],
+                    ),
+                )
+            outdated = sum(1 for row in rows if row["status"] == "update available")
+            summary.config(
+                text=f"{len(rows)} profiles checked in {report['elapsed_ms']} ms, "
+                f"{outdated} with updates"
+            )
+
+        get_transport().submit(
+            async_check_updates(self.get_mc_dir(), self.catalog), done, root=self.root
+        )
+
+    def debug_scan_profiles(self):
+        win = tk.Toplevel(self.root)
+        win.title("Disk Usage")
+        win.geometry("560x420")
+        win.configure(bg=BG_COLOR)
+
+        summary = tk.Label(
+            win,
+            text="Scanning...",
+            font=("Segoe UI", 10),
+            bg=BG_COLOR,
+            fg=FG_COLOR,
+            justify="left",
+        )
+        summary.pack(pady=(10, 0))
+
+        columns = (
+            ("profile", "Profile", 260),
+            ("size", "Size", 110),
+            ("files", "Files", 80),
+            ("catalog", "In Catalog", 90),
+        )
+        table = ttk.Treeview(win, columns=[c[0] for c in columns], show="headings")
+        for key, text, width in columns:
+            table.heading(key, text=text)
+            table.column(key, width=width)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        btn_reclaim = tk.Button(
+            win,
+            text="Reclaim Temp Files",
+            state="disabled",
+            bg=BUTTON_BG,
+            fg=BUTTON_FG,
+            activebackground=BUTTON_ACTIVE,
+            activeforeground=BUTTON_FG,
+            relief="flat",
+            font=("Segoe UI", 10),
+        )
+        btn_reclaim.pack(pady=(0, 10), ipadx=10, ipady=3)
+
+        def mb(n):
+            return f"{n / (1024 * 1024):.1f} MB"
+
+        def show(report):
+            if not win.winfo_exists():
+                return
+            table.delete(*table.get_children())
+            for row in report["profiles"]:
+                table.insert(
+                    "",
+                    "end",
+                    values=(
+                        row["folder"],
+                        mb(row["bytes"]),
+                        row["files"],
+                        "yes" if row["in_catalog"] else "NO",
+                    ),
+                )
+            summary.config(
+                text=f"{mb(report['total_bytes'])} in {len(report['profiles'])} profiles "
+                f"(scanned in {report['elapsed_ms']} ms)\n"
+                f"Duplicate jars across profiles: {mb(report['duplicate_bytes'])}\n"
+                f"Leftover temp files: {len(report['orphans'])}, "
+                f"{mb(report['reclaimable_bytes'])}"
+            )
+            btn_reclaim.config(
+                state="normal" if report["orphans"] else "disabled",
+                command=lambda: run(reclaim=report),
+            )
+
+        def run(reclaim=None):
+            btn_reclaim.config(state="disabled")
+            mc_dir = self.get_mc_dir()
+
+            def work():
+                try:
+                    if reclaim is not None:
+                        freed = reclaim_space(mc_dir, reclaim)
+                        self.root.after(
+                            0, lambda: messagebox.showinfo("Debug", f"Reclaimed {mb(freed)}.")
+                        )
+                    report = scan_profiles(mc_dir, self.catalog or None)
+                except Exception as e:
+                    log("ERROR scanning profiles: " + repr(e))
+                    log(traceback.format_exc())
+                    message = f"Scan failed: {e}"
+                    self.root.after(0, lambda: summary.config(text=message))
+                    return
+                self.root.after(0, lambda: show(report))
+
+            threading.Thread(target=work, daemon=True).start()
+
+        run()
+
+    def debug_update_profiles(self, window, dry_run=False):
         threading.Thread(
-            target=self._debug_update_profiles_thread, args=(window,), daemon=True
+            target=self._debug_update_profiles_thread,
+            args=(window, dry_run),
+            daemon=True,
         ).start()
 
-    def _debug_update_profiles_thread(self, window):
+    def _debug_update_profiles_thread(self, window, dry_run=False):
         mc_dir = self.get_mc_dir()
-        log("DEBUG: Updating profiles JSON...")
-        count = 0
+        log(f"DEBUG: Reconciling profiles JSON (dry_run={dry_run})...")
         try:
-            all_configs = {}
-            for cat in self.modpacks:
-                for pack_name, cfg in self.modpacks[cat].items():
-                    all_configs[cfg["folder_name"]] = cfg
+            all_configs = self.catalog.by_folder
 
             profiles_dir = os.path.join(mc_dir, "profiles")
+            jobs = []
             if os.path.exists(profiles_dir):
                 for folder in os.listdir(profiles_dir):
                     if folder in all_configs:
-                        cfg = all_configs[folder]
-
-                        final_icon = cfg.get("icon", "Furnace")
-                        if "icon_url" in cfg and HAS_PILLOW:
-                            try:
-                                b64 = self.download_icon_as_base64(
-                                    cfg["icon_url"],
-                                    os.path.join(profiles_dir, folder),
-                                )
-                                if b64:
-                                    final_icon = b64
-                            except Exception:
-                                pass
-
-                        default_args = (
-                            "-Xmx4096m -Xms256m "
-                            "-Dfml.ignorePatchDiscrepancies=true "
-                            "-Dfml.ignoreInvalidMinecraftCertificates=true "
-                            "-Duser.language=en -Duser.country=US"
-                        )
-                        jvm_args = cfg.get("jvm_args", default_args)
-
-                        self.update_json_profile(
-                            mc_dir=mc_dir,
-                            name=cfg["profile_name"],
-                            game_dir=os.path.join(profiles_dir, folder),
-                            version_id=cfg["version_id"],
-                            icon=final_icon,
-                            jvm_args=jvm_args,
-                        )
-                        count += 1
+                        jobs.append((folder, all_configs[folder]))
 
-            messagebox.showinfo(
-                "Debug", f"Updated {count} profiles in launcher_profiles.json"
-            )
-            window.destroy()
+            launcher_profiles = read_launcher_profiles(mc_dir)
+
+            def build_entry(job):
+                folder, cfg = job
+                game_dir = os.path.join(profiles_dir, folder)
+                current = launcher_profiles.get(
+                    launcher_profile_id(cfg["profile_name"]), {}
+                )
+                final_icon = cfg.get("icon", "Furnace")
+                try:
+                    final_icon = self.profile_icon(
+                        mc_dir, cfg, current.get("icon"), fetch=not dry_run
+                    )
+                    if final_icon is None:
+                        # Dry run: the icon would be downloaded again
+                        final_icon = "(new icon)"
+                except Exception as e:
+                    log(f"DEBUG: icon failed for {folder}: {e!r}")
+                return {
+                    "name": cfg["profile_name"],
+                    "game_dir": game_dir,
+                    "version_id": cfg["version_id"],
+                    "icon": final_icon,
+                    "jvm_args": tuned_jvm_args(cfg, game_dir),
+                }
+
+            # Icon fetches are network-bound and Pillow releases the GIL while
+            # resizing, so a small pool makes the whole refresh roughly as
+            # slow as the slowest icon. Icons already in the launcher from the
+            # same icon_url are reused without a download.
+            with ThreadPoolExecutor(max_workers=ICON_WORKERS) as pool:
+                entries = list(pool.map(build_entry, jobs))
+            changes = []
+            if entries:
+                changes = self.update_json_profiles(mc_dir, entries, dry_run=dry_run)
+
+            lines = [
+                f"{action}: {profile_id} ({', '.join(keys)})"
+                for profile_id, action, keys in changes
+                if action != "same"
+            ]
+            same = len(changes) - len(lines)
+            if len(lines) > 15:
+                lines = lines[:15] + [f"... and {len(lines) - 15} more"]
+            verb = "Would change" if dry_run else "Changed"
+            summary = f"{verb} {len(changes) - same} profiles, {same} already up to date."
+            messagebox.showinfo("Debug", "\n".join([summary] + lines))
+            if not dry_run:
+                window.destroy()
         except Exception as e:
             log(f"DEBUG ERROR: {e}")
             messagebox.showerror("Error", str(e))
@@ -508,10 +3640,7 @@ class InstallerApp:
 
         mc_dir = self.get_mc_dir()
 
-        all_configs = {}
-        for cat in self.modpacks:
-            for pname, cfg in self.modpacks[cat].items():
-                all_configs[cfg["folder_name"]] = cfg
+        all_configs = self.catalog.by_folder
 
         targets = []
         if selection == "All":
@@ -529,31 +3658,40 @@ class InstallerApp:
             self.reset_ui()
             return
 
-        for i, config in enumerate(targets):
-            self.update_status(
-                f"Updating {config['profile_name']} ({i+1}/{len(targets)})..."
-            )
-            try:
-                download_url = config["url"]
-                if platform.system() == "Darwin" and "mac_url" in config:
-                    download_url = config["mac_url"]
-                elif platform.system() == "Windows" and "windows_url" in config:
-                    download_url = config["windows_url"]
-
-                # Use the same logic as normal: detect existing profile and update
-                self.install_modpack_logic(mc_dir, config, download_url)
-            except Exception as e:
-                log(f"Failed to update {config['profile_name']}: {e}")
+        try:
+            plan = plan_install(mc_dir, targets, skip_unchanged=True)
+            self.run_plan(mc_dir, plan, keep_going=True)
+        except Exception as e:
+            # e.g. InsufficientSpaceError from the preflight, before any pack ran
+            log("UPDATE ERROR: " + repr(e))
+            log(traceback.format_exc())
+            self.update_status("Update failed.")
+            message = f"{e}\n\nLog: {LOG_PATH}"
+            self.root.after(0, lambda: messagebox.showerror("Error", message))
+            self.root.after(0, self.reset_ui)
+            return
+        for config in plan.unchanged:
+            log(f"{config['profile_name']} is up to date, skipped")
 
+        msg = "Selected modpacks have been updated."
+        if plan.unchanged:
+            msg += f"\n\n{len(plan.unchanged)} were already up to date and skipped."
         self.update_status("Update Complete!")
-        messagebox.showinfo("Success", "Selected modpacks have been updated.")
+        messagebox.showinfo("Success", msg)
         self.reset_ui()
 
     def update_status(self, text):
         self.root.after(0, lambda: self.status.config(text=text))
         log(f"STATUS: {text}")
 
-    def update_progress(self, current, total, eta_seconds=0):
+    def update_plan(self, text):
+        def show():
+            self.plan_label.config(text=text)
+            self.plan_label.pack(side="bottom")
+
+        self.root.after(0, show)
+
+    def update_progress(self, current, total, eta_seconds=0, action="Processing"):
         if total <= 0:
             return
         percent = (current / total) * 100
@@ -564,15 +3702,13 @@ class InstallerApp:
         else:
             time_str = f"{int(eta_seconds // 60)}m {int(eta_seconds % 60)}s"
 
-        status_text = f"{self.current_action_name}... {int(percent)}% ({time_str} left)"
+        status_text = f"{action}... {int(percent)}% ({time_str} left)"
         self.root.after(0, lambda: self.status.config(text=status_text))
 
     def load_data(self):
         try:
-            fresh_url = f"{MODPACKS_URL}?t={int(time.time())}-{random.randint(1, 999999)}"
-            log(f"Loading modpacks from: {fresh_url}")
-            raw = http_get_bytes(fresh_url, timeout=15).decode("utf-8")
-            data = json.loads(raw)
+            log(f"Loading modpacks from: {MODPACKS_URL}")
+            data = fetch_catalog()
             log(f"Loaded modpacks OK. Categories: {len(data)}")
             return data
         except Exception as e:
@@ -588,10 +3724,10 @@ class InstallerApp:
             new_data = self.load_data()
             if new_data:
                 self.modpacks = new_data
+                self.catalog = Catalog(new_data)
+                self.loaded_details = set()  # the new configs have none merged
                 self.cat_dropdown.set("")
-                self.cat_dropdown["values"] = list(self.modpacks.keys())
-                self.cat_dropdown.current(0)
-                self.update_pack_dropdown(None)
+                self.apply_search()
                 messagebox.showinfo("Refreshed", "Modpack list updated successfully!")
             else:
                 messagebox.showwarning(
@@ -603,12 +3739,97 @@ class InstallerApp:
 
         self.root.after(100, do_refresh)
 
+    def on_search_changed(self, *_args):
+        # Debounce so a burst of keystrokes only filters once
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(120, self.apply_search)
+
+    def apply_search(self):
+        self._search_job = None
+        if not self.modpacks:
+            return
+        query = self.search_var.get().strip()
+        self.search_results = self.catalog.search(query) if query else None
+        if query:
+            self.load_search_details()
+
+        categories = self.visible_categories()
+        if not categories:
+            # Shown in a disabled box, so it can't be picked and installed
+            self.cat_dropdown["values"] = []
+            self.cat_dropdown.set("No matches")
+            self.cat_dropdown.config(state="disabled")
+            self.pack_dropdown["values"] = []
+            self.pack_dropdown.set("")
+            self.pack_dropdown.config(state="disabled")
+            self.clear_pack_details()
+            return
+
+        self.cat_dropdown.config(state="readonly")
+        self.pack_dropdown.config(state="readonly")
+        self.cat_dropdown["values"] = categories
+        if self.selected_category.get() not in categories:
+            self.cat_dropdown.current(0)
+        self.update_pack_dropdown(None)
+
+    def load_search_details(self):
+        # Format-2 descriptions live in detail records; fetch the ones not
+        # loaded yet (once per catalog) so searching covers them, then
+        # search again.
+        if self._details_fetched_for is self.catalog:
+            return
+        self._details_fetched_for = self.catalog
+        configs = [
+            e.config
+            for e in self.catalog.entries
+            if "detail_url" in e.config
+            and e.config["detail_url"] not in self.loaded_details
+        ]
+        if not configs:
+            return
+        self.loaded_details.update(c["detail_url"] for c in configs)
+        catalog = self.catalog
+
+        def apply(results, error):
+            if catalog is not self.catalog:
+                return  # refreshed meanwhile
+            for config in configs:
+                details = None if error else results.get(config["detail_url"])
+                if details is None:
+                    self.loaded_details.discard(config["detail_url"])
+                else:
+                    catalog.add_details(config, details)
+            if self.search_var.get().strip():
+                self.apply_search()
+
+        get_transport().submit(async_fetch_details_many(configs), apply, root=self.root)
+
+    def clear_pack_details(self):
+        self.current_icon_base64 = None
+        self.icon_label.config(image="", text="")
+        self.pack_state_label.config(text="")
+        self.desc_label.config(text="")
+        self.rating_frame.pack_forget()
+        self.btn_commands.config(state="disabled")
+
+    def visible_categories(self):
+        if self.search_results is None:
+            return self.catalog.categories
+        matched = {entry.category for entry in self.search_results}
+        return [c for c in self.catalog.categories if c in matched]
+
+    def visible_packs(self, category):
+        if self.search_results is None:
+            return self.catalog.by_category.get(category, [])
+        return [e.name for e in self.search_results if e.category == category]
+
     def update_pack_dropdown(self, _event):
         if not self.modpacks:
             return
         category = self.selected_category.get()
         if category in self.modpacks:
-            packs = list(self.modpacks[category].keys())
+            packs = self.visible_packs(category)
             self.pack_dropdown["values"] = packs
             if packs:
                 self.pack_dropdown.current(0)
@@ -627,6 +3848,9 @@ class InstallerApp:
             else:
                 self.icon_label.config(image="", text="")
 
+            self.show_pack_state(config)
+            self.load_pack_details(category, pack_name, config)
+
             desc_text = config.get("description", "No description available.")
             self.desc_label.config(text=desc_text)
 
@@ -644,6 +3868,50 @@ class InstallerApp:
             else:
                 self.btn_commands.config(state="disabled")
 
+    def load_pack_details(self, category, pack_name, config):
+        # Format-2 catalogs keep descriptions in per-pack records; fetch one
+        # the first time its pack is shown, then redraw if still selected.
+        if "detail_url" not in config or config["detail_url"] in self.loaded_details:
+            return
+        self.loaded_details.add(config["detail_url"])
+
+        def apply(details, error):
+            if error is not None:
+                log(f"Could not load details for {pack_name}: {error!r}")
+                self.loaded_details.discard(config["detail_url"])
+                return
+            self.catalog.add_details(config, details)
+            if (self.selected_category.get(), self.selected_pack.get()) == (
+                category,
+                pack_name,
+            ):
+                self.on_pack_selected(None)
+
+        get_transport().submit(async_fetch_pack_details(config), apply, root=self.root)
+
+    def show_pack_state(self, config):
+        self.pack_state_label.config(text="")
+
+        def apply(state, error):
+            # Ignore answers for a pack that is no longer selected
+            selected = self.catalog.get(
+                self.selected_category.get(), self.selected_pack.get()
+            )
+            if error is not None or selected is not config:
+                return
+            if state == "update available":
+                self.pack_state_label.config(text="UPDATE AVAILABLE", fg="#FFD700")
+            elif state == "up to date":
+                self.pack_state_label.config(
+                    text="INSTALLED · UP TO DATE", fg="#88CC88"
+                )
+            elif state == "installed":
+                self.pack_state_label.config(text="INSTALLED", fg="#88CC88")
+
+        get_transport().submit(
+            async_check_pack_update(self.get_mc_dir(), config), apply, root=self.root
+        )
+
     def show_command_help(self):
         category = self.selected_category.get()
         pack_name = self.selected_pack.get()
@@ -671,22 +3939,28 @@ class InstallerApp:
             self.icon_label.config(image=photo, text="")
             return
 
-        def fetch():
-            try:
-                img_data = http_get_bytes(url, timeout=15)
-                image = Image.open(BytesIO(img_data))
-                if getattr(image, "is_animated", False):
-                    image.seek(0)
-                image = image.resize((64, 64), Image.Resampling.LANCZOS)
-                self.root.after(
-                    0,
-                    lambda: self._finish_icon_load(url, image),
-                )
-            except Exception as e:
-                log("ERROR preview icon: " + repr(e))
-                log(traceback.format_exc())
+        async def fetch():
+            img_data = await async_get_bytes(
+                url, timeout=15, max_bytes=MAX_ICON_BYTES
+            )
+            # Decoding is CPU work; keep it off the network loop
+            return await asyncio.get_running_loop().run_in_executor(
+                None, load_icon_frame, img_data, 64
+            )
+
+        def done(image, error):
+            if error is not None:
+                log("ERROR preview icon: " + repr(error))
+                log("".join(traceback.format_exception(
+                    type(error), error, error.__traceback__
+                )))
+                return
+            self._finish_icon_load(url, image)
 
-        threading.Thread(target=fetch, daemon=True).start()
+        # A newer selection supersedes any preview still in flight
+        if self._icon_future is not None:
+            self._icon_future.cancel()
+        self._icon_future = get_transport().submit(fetch(), done, root=self.root)
 
     def _finish_icon_load(self, url, image):
         try:
@@ -700,7 +3974,8 @@ class InstallerApp:
         self.icon_label.config(image=photo, text="")
 
     def start_thread(self):
-        if not self.modpacks:
+        selected = (self.selected_category.get(), self.selected_pack.get())
+        if self.catalog.get(*selected) is None:
             return
         self.btn_install.config(state="disabled", text="INSTALLING...", bg="#555555")
         self.progress_bar.pack(fill="x", padx=40, pady=10)
@@ -711,6 +3986,7 @@ class InstallerApp:
             state="normal", text="INSTALL SELECTED PACK", bg=ACCENT_COLOR
         )
         self.progress_bar.pack_forget()
+        self.plan_label.pack_forget()
 
     def copy_options_template(self, profile_dir):
         template_name = "base_options.txt"
@@ -740,22 +4016,9 @@ class InstallerApp:
             config = self.modpacks[category][pack_name]
             mc_dir = self.get_mc_dir()
 
-            download_url = config["url"]
-            current_os = platform.system()
-
-            if current_os == "Darwin" and "mac_url" in config:
-                log(f"Detected Mac: Using mac_url for {pack_name}")
-                download_url = config["mac_url"]
-            elif current_os == "Windows" and "windows_url" in config:
-                log(f"Detected Windows: Using windows_url for {pack_name}")
-                download_url = config["windows_url"]
-
             self.update_status(f"Checking loader for {pack_name}...")
-
-            self.current_action_name = "Downloading Loader"
-            self.install_loader(mc_dir, config["loader_url"])
-
-            self.install_modpack_logic(mc_dir, config, download_url)
+            plan = plan_install(mc_dir, [config])
+            self.run_plan(mc_dir, plan)
 
             self.root.after(0, self.reset_ui)
             self.root.after(0, lambda: self.status.config(text="Installation Complete"))
@@ -768,33 +4031,168 @@ class InstallerApp:
         except Exception as e:
             log("INSTALL ERROR: " + repr(e))
             log(traceback.format_exc())
-            self.root.after(
-                0,
-                lambda: messagebox.showerror(
-                    "Error", f"{e}\n\nLog: {LOG_PATH}"
-                ),
-            )
+            # e is unbound once this block ends, before the callback runs
+            message = f"{e}\n\nLog: {LOG_PATH}"
+            self.root.after(0, lambda: messagebox.showerror("Error", message))
             self.root.after(0, self.reset_ui)
 
+    def run_plan(self, mc_dir, plan, keep_going=False):
+        """
+        Download every unique asset in plan once: loaders first, then mods.
+        With keep_going, a failing pack is logged and the rest continue.
+        """
+        self.update_plan(f"Plan: {plan.describe()}")
+        run = InstallRun(self.update_progress, lambda: self.progress_var.set(0), plan)
+        if plan.mods or plan.loaders:
+            # Refuse up front rather than fail halfway with a full disk
+            self.update_status("Checking disk space...")
+            local = None
+            if self.bundle is not None:
+                local = self.bundle.source
+            needed, _inodes = check_disk_space(mc_dir, plan, local)
+            log(f"Preflight: peak disk use about {format_bytes(needed)}")
+
+        if len(plan.packs) == 1 and plan.loaders:
+            self.run_overlapped(mc_dir, plan, run)
+            return
+
+        for loader_url in plan.loaders:
+            run.action = "Downloading Loader"
+            try:
+                self.install_loader(mc_dir, loader_url, run)
+            except Exception as e:
+                if not keep_going:
+                    raise
+                log(f"Failed to install loader {loader_url}: {e}")
+
+        done = 0
+        for download_url, configs in plan.mods.items():
+            shared_dir = shared_lock = None
+            shared_zip = None
+            shared_info = {}
+            try:
+                bundled, bundled_info = self.bundled_archive(download_url)
+                if bundled is not None:
+                    shared_zip, shared_info = bundled, bundled_info
+                elif len(configs) > 1:
+                    shared_dir, shared_lock = make_work_dir("temp_shared_", mc_dir)
+                    shared_zip = os.path.join(
+                        shared_dir, f"mods.{pack_archive_kind(configs[0], download_url)}"
+                    )
+                    run.action = "Downloading Mods"
+                    shared_info["validators"] = {}
+                    shared_info["sha256"] = http_download_file(
+                        download_url,
+                        shared_zip,
+                        progress_cb=run.progress,
+                        timeout=120,
+                        validators=shared_info["validators"],
+                        known=run.download_hint(download_url),
+                    )
+                for config in configs:
+                    done += 1
+                    self.update_status(
+                        f"Installing {config['profile_name']} ({done}/{len(plan.packs)})..."
+                    )
+                    try:
+                        self.install_modpack_logic(
+                            mc_dir,
+                            config,
+                            download_url,
+                            run,
+                            zip_path=shared_zip,
+                            zip_info=shared_info,
+                        )
+                    except Exception as e:
+                        if not keep_going:
+                            raise
+                        log(f"Failed to update {config['profile_name']}: {e}")
+            except Exception as e:
+                if not keep_going:
+                    raise
+                log(f"Failed to download {download_url}: {e}")
+            finally:
+                if shared_dir:
+                    discard_work_dir(shared_dir, shared_lock, mc_dir)
+
+    def run_overlapped(self, mc_dir, plan, run):
+        """
+        One pack that needs a loader: the loader installs on a second thread
+        while the mods download here; the pack commits once both are done.
+        """
+        config, download_url = plan.packs[0]
+
+        def size(url):
+            return plan.validators.get(url, {}).get("content_length", 0)
+
+        # Extracted sizes aren't known yet; jars barely compress, so the
+        # zip size is the estimate until extraction reports the real one.
+        expected = {"mods": size(download_url), "mods_extract": size(download_url)}
+        for loader_url in plan.loaders:
+            expected[f"loader:{loader_url}"] = size(loader_url)
+            expected[f"loader_extract:{loader_url}"] = size(loader_url)
+            expected[f"loader_merge:{loader_url}"] = size(loader_url)
+
+        run.reset()
+        run.combined = CombinedProgress(run.progress, expected)
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            run.loader_futures = {
+                loader_url: pool.submit(self.install_loader, mc_dir, loader_url, run)
+                for loader_url in plan.loaders
+            }
+            self.update_status(f"Installing {config['profile_name']} and its loader...")
+            bundled, bundled_info = self.bundled_archive(download_url)
+            self.install_modpack_logic(
+                mc_dir, config, download_url, run, zip_path=bundled, zip_info=bundled_info
+            )
+            for future in run.loader_futures.values():
+                future.result()
+        finally:
+            pool.shutdown(wait=True)
+
+    def wait_for_loader(self, config, run):
+        # See run_overlapped: never commit a pack before its loader is in
+        future = run.loader_futures.get(config.get("loader_url"))
+        if future is not None and not future.done():
+            self.update_status("Waiting for the loader to finish...")
+        if future is not None:
+            future.result()
+
+    def bundled_archive(self, url):
+        """(ArchiveSlice, zip_info) for url from the imported bundle, or (None, {})."""
+        if self.bundle is None or self.bundle.source(url) is None:
+            return None, {}
+        return self.bundle.source(url), self.bundle.info(url)
+
+    def init_state(self):
+        """Non-UI state, shared with HeadlessInstaller; finishes old installs."""
+        # Set for --import-bundle: archives and icons come from it, not the network
+        self.bundle = None
+        self.icon_cache = {}
+        self._icon_future = None
+        self.loaded_details = set()
+        self.current_icon_base64 = None
+        try:
+            recover_transactions(self.get_mc_dir())
+            purge_trash(self.get_mc_dir())
+        except Exception as e:
+            log("ERROR recovering installs: " + repr(e))
+
     def get_mc_dir(self):
-        system = platform.system()
-        if system == "Windows":
-            return os.path.join(os.getenv("APPDATA"), ".minecraft")
-        if system == "Darwin":
-            return os.path.join(
-                os.path.expanduser("~"),
-                "Library",
-                "Application Support",
-                "minecraft",
-            )
-        return os.path.join(os.path.expanduser("~"), ".minecraft")
+        return get_mc_dir()
+
+    def install_loader(self, mc_dir, loader_url, run):
+        version_id = loader_version_id(loader_url)
+        # Two installs needing the same loader: the second waits and then
+        # sees the version folder the first one created.
+        with asset_lock(("loader", mc_dir, version_id)):
+            self._install_loader_locked(mc_dir, loader_url, version_id, run)
 
-    def install_loader(self, mc_dir, loader_url):
-        version_id = loader_url.split("/")[-1].replace(".zip", "")
+    def _install_loader_locked(self, mc_dir, loader_url, version_id, run):
         versions_dir = os.path.join(mc_dir, "versions")
-        version_folder = os.path.join(versions_dir, version_id)
 
-        if os.path.exists(version_folder):
+        if loader_installed(mc_dir, version_id):
             self.update_status(
                 f"Loader {version_id} already installed, skipping..."
             )
@@ -804,360 +4202,1418 @@ class InstallerApp:
         os.makedirs(versions_dir, exist_ok=True)
         os.makedirs(libraries_dir, exist_ok=True)
 
-        temp_loader_zip = os.path.join(mc_dir, "temp_loader.zip")
-        self.progress_var.set(0)
-
-        self.current_action_name = "Downloading Loader"
-        http_download_file(
-            loader_url, temp_loader_zip, progress_cb=self.update_progress, timeout=60
-        )
-
-        self.update_status("Installing Loader...")
-        temp_extract_path = os.path.join(mc_dir, "temp_loader_extract")
-        if os.path.exists(temp_extract_path):
-            shutil.rmtree(temp_extract_path)
-        os.makedirs(temp_extract_path, exist_ok=True)
-
-        with zipfile.ZipFile(temp_loader_zip, "r") as z:
-            z.extractall(temp_extract_path)
-        os.remove(temp_loader_zip)
-
-        found_versions = None
-        found_libraries = None
-        for root_path, dirs, _files in os.walk(temp_extract_path):
-            if "versions" in dirs:
-                found_versions = os.path.join(root_path, "versions")
-            if "libraries" in dirs:
-                found_libraries = os.path.join(root_path, "libraries")
-            if found_versions and found_libraries:
-                break
+        # Unique work dir per install so concurrent loaders never collide
+        work_dir, work_lock = make_work_dir("temp_loader_", mc_dir)
+        try:
+            kind = archive_kind(loader_url)
+            require_archive_support(kind, loader_url)
+            temp_loader_zip = os.path.join(work_dir, f"loader.{kind}")
+            run.reset_progress()
+
+            run.action = "Downloading Loader"
+            bundled, bundled_info = self.bundled_archive(loader_url)
+            if bundled is not None:
+                temp_loader_zip = bundled
+                validators = bundled_info["validators"]
+                sha256 = bundled_info["sha256"]
+            else:
+                validators = {}
+                sha256 = http_download_file(
+                    loader_url,
+                    temp_loader_zip,
+                    progress_cb=run.progress_for(f"loader:{loader_url}"),
+                    timeout=60,
+                    validators=validators,
+                    known=run.download_hint(loader_url),
+                )
 
-        if found_versions:
-            self.merge_folders(found_versions, versions_dir)
-        if found_libraries:
-            self.merge_folders(found_libraries, libraries_dir)
+            self.update_status("Installing Loader...")
+            temp_extract_path = os.path.join(work_dir, "extract")
+            os.makedirs(temp_extract_path, exist_ok=True)
+
+            # Only versions/ and libraries/ are used, so nothing else in the
+            # zip is extracted.
+            roots = self.extract_with_progress(
+                run,
+                temp_loader_zip,
+                temp_extract_path,
+                ("versions", "libraries"),
+                progress_cb=run.progress_for(f"loader_extract:{loader_url}"),
+                kind=kind,
+            )
+            if bundled is None:
+                os.remove(temp_loader_zip)
+
+            found_versions = None
+            found_libraries = None
+            if "versions" in roots:
+                found_versions = os.path.join(temp_extract_path, "versions")
+            if "libraries" in roots:
+                found_libraries = os.path.join(temp_extract_path, "libraries")
+
+            # Different loaders share library files; merge one at a time
+            files = []
+            run.action = "Merging Loader"
+            merge_progress = run.progress_for(f"loader_merge:{loader_url}")
+            with asset_lock(("libraries", mc_dir)):
+                if found_versions:
+                    self.merge_folders(found_versions, versions_dir, merge_progress)
+                    files += list_files(found_versions, "versions/")
+                if found_libraries:
+                    self.merge_folders(found_libraries, libraries_dir, merge_progress)
+                    files += list_files(found_libraries, "libraries/")
+
+            load_state(mc_dir).record_loader(
+                version_id,
+                {
+                    "url": loader_url,
+                    "validators": validators,
+                    "sha256": sha256,
+                    "files": files,
+                },
+            )
+        finally:
+            discard_work_dir(work_dir, work_lock, mc_dir)
 
-        shutil.rmtree(temp_extract_path, ignore_errors=True)
+    def merge_folders(self, src, dst, progress_cb=None):
+        copied, skipped = copy_tree(src, dst, progress_cb=progress_cb)
+        log(f"Merged {src} -> {dst}: {copied} copied, {skipped} unchanged")
 
-    def merge_folders(self, src, dst):
-        if sys.version_info >= (3, 8):
-            shutil.copytree(src, dst, dirs_exist_ok=True)
-        else:
-            os.makedirs(dst, exist_ok=True)
-            for item in os.listdir(src):
-                s = os.path.join(src, item)
-                d = os.path.join(dst, item)
-                if os.path.isdir(s):
-                    self.merge_folders(s, d)
-                else:
-                    shutil.copy2(s, d)
+    def can_render_icon(self, icon_url):
+        # A bundle import is offline: only the icons it carries are used
+        if self.bundle is not None:
+            return self.bundle.has_icon(icon_url)
+        return HAS_PILLOW
 
     def download_icon_as_base64(self, icon_url, profile_dir):
-        if not HAS_PILLOW:
+        # Bundles carry icons already rendered, so no Pillow or network needed
+        if self.bundle is not None:
+            png = self.bundle.icon_png(icon_url)
+            if png is None:
+                return None
+        elif HAS_PILLOW:
+            png = fetch_icon_png(icon_url, size=128, timeout=20)
+        else:
             return None
+        with open(os.path.join(profile_dir, "icon.png"), "wb") as f:
+            f.write(png)
 
-        icon_path = os.path.join(profile_dir, "icon.png")
-        img_data = http_get_bytes(icon_url, timeout=20)
+        return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
 
-        image = Image.open(BytesIO(img_data))
-        if getattr(image, "is_animated", False):
-            image.seek(0)
-        if image.mode != "RGBA":
-            image = image.convert("RGBA")
-        image = image.resize((128, 128), Image.Resampling.LANCZOS)
-        image.save(icon_path, format="PNG")
+    def profile_icon(self, mc_dir, config, current_icon=None, fetch=True):
+        """
+        Launcher icon for config, reusing current_icon when it came from the
+        same icon_url. With fetch=False, None where a download is needed.
+        """
+        if "icon_url" not in config or not self.can_render_icon(config["icon_url"]):
+            return config.get("icon", "Furnace")
+
+        folder = config["folder_name"]
+        profile_dir = os.path.join(mc_dir, "profiles", folder)
+        state = load_state(mc_dir)
+        recorded = state.icon(folder) or {}
+        if (
+            recorded.get("url") == config["icon_url"]
+            and recorded.get("sha256")
+            and icon_sha256(current_icon) == recorded["sha256"]
+            and os.path.exists(os.path.join(profile_dir, "icon.png"))
+        ):
+            return current_icon
+        if not fetch:
+            return None
 
-        with open(icon_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-        return "data:image/png;base64," + b64
+        b64_icon = self.download_icon_as_base64(config["icon_url"], profile_dir)
+        if not b64_icon:
+            return config.get("icon", "Furnace")
+        state.record_icon(
+            folder, {"url": config["icon_url"], "sha256": icon_sha256(b64_icon)}
+        )
+        return b64_icon
+
+    def extract_with_progress(
+        self,
+        run,
+        zip_path,
+        dest,
+        dirnames=None,
+        progress_cb=None,
+        kind="zip",
+        whole_if_missing=False,
+    ):
+        """extract_dirs (or the whole archive, without dirnames); returns the roots."""
+        run.action = "Extracting"
+        progress_cb = progress_cb or run.progress
+        if dirnames is None:
+            extract_archive(zip_path, dest, None, progress_cb, kind)
+            return None
+        return extract_dirs(zip_path, dest, dirnames, progress_cb, kind, whole_if_missing)
+
+    def download_pack_zip(self, run, config, download_url, dest, label, zip_info):
+        require_archive_support(pack_archive_kind(config, download_url), download_url)
+        self.update_status(f"Downloading {config['profile_name']}{label}...")
+        run.reset_progress()
+        run.action = "Downloading Mods"
+        zip_info["validators"] = {}
+        zip_info["sha256"] = http_download_file(
+            download_url,
+            dest,
+            progress_cb=run.progress_for("mods"),
+            timeout=120,
+            validators=zip_info["validators"],
+            known=run.download_hint(download_url),
+        )
+        return dest
+
+    def record_install(self, mc_dir, config, download_url, zip_info, files):
+        load_state(mc_dir).record_profile(
+            config["folder_name"],
+            {
+                "url": download_url,
+                "loader_url": config.get("loader_url"),
+                "version_id": config.get("version_id"),
+                "validators": zip_info.get("validators", {}),
+                "sha256": zip_info.get("sha256"),
+                "files": files,
+            },
+        )
 
-    def install_modpack_update_in_place(self, mc_dir, config, download_url, profile_dir):
+    def install_modpack_update_in_place(
+        self, mc_dir, config, download_url, profile_dir, run, zip_path=None, zip_info=None
+    ):
         """
         Used when the profile already exists and the user chooses to update.
         It will NOT delete anything in the existing profile_dir.
         It only overwrites/merges content that is present in the downloaded zip.
         """
-        self.copy_options_template(profile_dir)
-
-        self.update_status(f"Downloading {config['profile_name']} (update)...")
-        self.progress_var.set(0)
-        temp_zip = os.path.join(profile_dir, "temp_update.zip")
-
-        self.current_action_name = "Downloading Mods"
-        http_download_file(
-            download_url, temp_zip, progress_cb=self.update_progress, timeout=120
-        )
-
-        temp_extract = os.path.join(profile_dir, "temp_update_extract")
-        if os.path.exists(temp_extract):
-            shutil.rmtree(temp_extract)
-        os.makedirs(temp_extract, exist_ok=True)
-
-        self.update_status("Extracting mods (update)...")
-        self.current_action_name = "Extracting"
-
-        with zipfile.ZipFile(temp_zip, "r") as z:
-            total_size = sum(f.file_size for f in z.infolist())
-            extracted_size = 0
-            start_time = time.time()
-            last_update_time = 0
-
-            for file_info in z.infolist():
-                z.extract(file_info, temp_extract)
-                extracted_size += file_info.file_size
-
-                current_time = time.time()
-                if current_time - last_update_time > 0.1:
-                    elapsed_time = current_time - start_time
-                    if elapsed_time > 0 and extracted_size > 0:
-                        speed = extracted_size / elapsed_time
-                        if speed > 0:
-                            remaining = total_size - extracted_size
-                            eta = remaining / speed
-                        else:
-                            eta = 0
-                        self.update_progress(
-                            extracted_size, total_size, eta
-                        )
-                    last_update_time = current_time
-
-            self.update_progress(total_size, total_size, 0)
-
-        os.remove(temp_zip)
+        zip_info = dict(zip_info or {})
+        kind = pack_archive_kind(config, download_url)
+
+        with InstallTransaction(mc_dir, profile_dir) as tx:
+            staged_options = tx.path("options")
+            os.makedirs(staged_options, exist_ok=True)
+            self.copy_options_template(staged_options)
+            if os.path.exists(os.path.join(staged_options, "options.txt")):
+                tx.rename(
+                    os.path.join(staged_options, "options.txt"),
+                    os.path.join(profile_dir, "options.txt"),
+                )
 
-        is_complex = config.get("is_complex", False)
+            temp_zip = zip_path or self.download_pack_zip(
+                run,
+                config, download_url, tx.path(f"download.{kind}"), " (update)", zip_info
+            )
 
-        if is_complex:
-            # Complex pack: merge everything from temp_extract into profile_dir,
-            # but DO NOT delete anything that is not in the zip.
-            self.merge_folders(temp_extract, profile_dir)
-        else:
-            # Simple pack: only replace the 'mods' folder
-            target_mods = os.path.join(profile_dir, "mods")
-            os.makedirs(target_mods, exist_ok=True)
+            temp_extract = tx.path("extract")
+            self.update_status("Extracting mods (update)...")
+            is_complex = config.get("is_complex", False)
+            # A simple pack only ever uses its mods folder, so when the zip
+            # has one that is all that gets extracted.
+            roots = self.extract_with_progress(
+                run,
+                temp_zip,
+                temp_extract,
+                None if is_complex else ("mods",),
+                progress_cb=run.progress_for("mods_extract"),
+                kind=kind,
+                whole_if_missing=True,
+            )
 
             found_mods_nested = None
-            for root_path, dirs, _files in os.walk(temp_extract):
-                if "mods" in dirs:
-                    found_mods_nested = os.path.join(root_path, "mods")
-                    break
+            if roots:
+                found_mods_nested = os.path.join(temp_extract, "mods")
 
             if found_mods_nested:
-                shutil.rmtree(target_mods, ignore_errors=True)
-                os.makedirs(target_mods, exist_ok=True)
-                self.merge_folders(found_mods_nested, target_mods)
+                # Simple pack: swap the whole 'mods' folder
+                target_mods = os.path.join(profile_dir, "mods")
+                files = list_files(found_mods_nested, "mods/")
+                if os.path.exists(target_mods):
+                    tx.rename(target_mods, tx.path("old", "mods"))
+                tx.rename(found_mods_nested, target_mods)
             else:
-                # If no mods folder in zip, just merge what exists
-                self.merge_folders(temp_extract, profile_dir)
-
-        shutil.rmtree(temp_extract, ignore_errors=True)
-
-        final_icon = config.get("icon", "Furnace")
-        if "icon_url" in config and HAS_PILLOW:
-            self.update_status("Downloading icon...")
-            try:
-                b64_icon = self.download_icon_as_base64(
-                    config["icon_url"], profile_dir
-                )
-                if b64_icon:
-                    final_icon = b64_icon
-            except Exception as e:
-                log("ERROR icon base64 (update): " + repr(e))
-                log(traceback.format_exc())
+                # Complex pack (or no mods folder in zip): merge everything
+                # into profile_dir, but DO NOT delete anything not in the zip.
+                files = list_files(temp_extract)
+                tx.merge(temp_extract, profile_dir)
 
-        default_args = (
-            "-Xmx4096m -Xms256m "
-            "-Dfml.ignorePatchDiscrepancies=true "
-            "-Dfml.ignoreInvalidMinecraftCertificates=true "
-            "-Duser.language=en -Duser.country=US"
-        )
-        custom_jvm_args = config.get("jvm_args", default_args)
+            self.wait_for_loader(config, run)
+            tx.commit()
 
-        self.update_json_profile(
-            mc_dir=mc_dir,
-            name=config["profile_name"],
-            game_dir=profile_dir,
-            version_id=config["version_id"],
-            icon=final_icon,
-            jvm_args=custom_jvm_args,
-        )
+        self.record_install(mc_dir, config, download_url, zip_info, files)
+        self.finish_profile(mc_dir, config, profile_dir)
 
     # --- REWRITTEN install_modpack_logic with prompt ---
-    def install_modpack_logic(self, mc_dir, config, download_url):
+    def install_modpack_logic(
+        self, mc_dir, config, download_url, run, zip_path=None, zip_info=None
+    ):
         if not os.path.exists(mc_dir):
             raise Exception("Minecraft folder not found.")
 
         profile_dir = os.path.join(mc_dir, "profiles", config["folder_name"])
+        with asset_lock(("profile", profile_dir)):
+            self._install_modpack_locked(
+                mc_dir, config, download_url, profile_dir, run, zip_path, zip_info
+            )
+
+    def confirm_update(self, config):
+        return messagebox.askyesno(
+            "Modpack Already Installed",
+            f"You already have '{config['profile_name']}' installed.\n\n"
+            "Would you like to update it?\n\n"
+            "This will overwrite files from the modpack itself, but your existing worlds and other data in this profile will stay.",
+        )
+
+    def _install_modpack_locked(
+        self, mc_dir, config, download_url, profile_dir, run, zip_path, zip_info
+    ):
         already_exists = os.path.exists(profile_dir)
 
         if already_exists:
-            answer = messagebox.askyesno(
-                "Modpack Already Installed",
-                f"You already have '{config['profile_name']}' installed.\n\n"
-                "Would you like to update it?\n\n"
-                "This will overwrite files from the modpack itself, but your existing worlds and other data in this profile will stay.",
-            )
-            if not answer:
+            if not self.confirm_update(config):
                 self.update_status("Update cancelled by user.")
                 return
 
-            os.makedirs(profile_dir, exist_ok=True)
             self.install_modpack_update_in_place(
-                mc_dir, config, download_url, profile_dir
+                mc_dir,
+                config,
+                download_url,
+                profile_dir,
+                run,
+                zip_path=zip_path,
+                zip_info=zip_info,
             )
             return
 
-        # Fresh install path
-        os.makedirs(profile_dir, exist_ok=True)
-
-        self.copy_options_template(profile_dir)
-
-        self.update_status(f"Downloading {config['profile_name']}...")
-        self.progress_var.set(0)
-        temp_zip = os.path.join(profile_dir, "temp.zip")
-
-        self.current_action_name = "Downloading Mods"
-        http_download_file(
-            download_url, temp_zip, progress_cb=self.update_progress, timeout=120
-        )
-
-        temp_extract = os.path.join(profile_dir, "temp_extract")
-        if os.path.exists(temp_extract):
-            shutil.rmtree(temp_extract)
-        os.makedirs(temp_extract, exist_ok=True)
-
-        self.update_status("Extracting mods...")
-        self.current_action_name = "Extracting"
-
-        with zipfile.ZipFile(temp_zip, "r") as z:
-            total_size = sum(f.file_size for f in z.infolist())
-            extracted_size = 0
-            start_time = time.time()
-            last_update_time = 0
-
-            for file_info in z.infolist():
-                z.extract(file_info, temp_extract)
-                extracted_size += file_info.file_size
-
-                current_time = time.time()
-                if current_time - last_update_time > 0.1:
-                    elapsed_time = current_time - start_time
-                    if elapsed_time > 0 and extracted_size > 0:
-                        speed = extracted_size / elapsed_time
-                        if speed > 0:
-                            remaining = total_size - extracted_size
-                            eta = remaining / speed
-                        else:
-                            eta = 0
-                        self.update_progress(
-                            extracted_size, total_size, eta
-                        )
-                    last_update_time = current_time
-
-            self.update_progress(total_size, total_size, 0)
+        # Fresh install path: build the whole profile in staging and move it
+        # into profiles/ with a single rename.
+        os.makedirs(os.path.dirname(profile_dir), exist_ok=True)
+        zip_info = dict(zip_info or {})
+        kind = pack_archive_kind(config, download_url)
 
-        os.remove(temp_zip)
+        with InstallTransaction(mc_dir, profile_dir) as tx:
+            staged_profile = tx.path("profile")
+            os.makedirs(staged_profile, exist_ok=True)
+            self.copy_options_template(staged_profile)
 
-        is_complex = config.get("is_complex", False)
-        if is_complex:
-            self.merge_folders(temp_extract, profile_dir)
-        else:
-            target_mods = os.path.join(profile_dir, "mods")
-            os.makedirs(target_mods, exist_ok=True)
+            temp_zip = zip_path or self.download_pack_zip(
+                run,
+                config, download_url, tx.path(f"download.{kind}"), "", zip_info
+            )
 
-            found_mods_nested = None
-            for root_path, dirs, _files in os.walk(temp_extract):
-                if "mods" in dirs:
-                    found_mods_nested = os.path.join(root_path, "mods")
-                    break
+            temp_extract = tx.path("extract")
+            self.update_status("Extracting mods...")
+            is_complex = config.get("is_complex", False)
+            roots = self.extract_with_progress(
+                run,
+                temp_zip,
+                temp_extract,
+                None if is_complex else ("mods",),
+                progress_cb=run.progress_for("mods_extract"),
+                kind=kind,
+                whole_if_missing=True,
+            )
 
-            if found_mods_nested:
-                self.merge_folders(found_mods_nested, target_mods)
+            if is_complex:
+                files = list_files(temp_extract)
+                move_tree_into(temp_extract, staged_profile)
             else:
-                self.merge_folders(temp_extract, target_mods)
+                target_mods = os.path.join(staged_profile, "mods")
+                found_mods_nested = None
+                if roots:
+                    found_mods_nested = os.path.join(temp_extract, "mods")
+                files = list_files(found_mods_nested or temp_extract, "mods/")
+                os.rename(found_mods_nested or temp_extract, target_mods)
 
-        shutil.rmtree(temp_extract, ignore_errors=True)
+            tx.rename(staged_profile, profile_dir)
+            self.wait_for_loader(config, run)
+            tx.commit()
 
+        self.record_install(mc_dir, config, download_url, zip_info, files)
+        self.finish_profile(mc_dir, config, profile_dir)
+
+    def finish_profile(self, mc_dir, config, profile_dir):
         final_icon = config.get("icon", "Furnace")
-        if "icon_url" in config and HAS_PILLOW:
+        if "icon_url" in config and self.can_render_icon(config["icon_url"]):
             self.update_status("Downloading icon...")
+            current = read_launcher_profiles(mc_dir).get(
+                launcher_profile_id(config["profile_name"]), {}
+            )
             try:
-                b64_icon = self.download_icon_as_base64(
-                    config["icon_url"], profile_dir
-                )
-                if b64_icon:
-                    final_icon = b64_icon
+                final_icon = self.profile_icon(mc_dir, config, current.get("icon"))
             except Exception as e:
                 log("ERROR icon base64: " + repr(e))
                 log(traceback.format_exc())
 
-        default_args = (
-            "-Xmx4096m -Xms256m "
-            "-Dfml.ignorePatchDiscrepancies=true "
-            "-Dfml.ignoreInvalidMinecraftCertificates=true "
-            "-Duser.language=en -Duser.country=US"
-        )
-        custom_jvm_args = config.get("jvm_args", default_args)
-
         self.update_json_profile(
             mc_dir=mc_dir,
             name=config["profile_name"],
             game_dir=profile_dir,
             version_id=config["version_id"],
             icon=final_icon,
-            jvm_args=custom_jvm_args,
+            jvm_args=tuned_jvm_args(config, profile_dir),
         )
 
     def update_json_profile(self, mc_dir, name, game_dir, version_id, icon, jvm_args):
+        self.update_json_profiles(
+            mc_dir,
+            [
+                {
+                    "name": name,
+                    "game_dir": game_dir,
+                    "version_id": version_id,
+                    "icon": icon,
+                    "jvm_args": jvm_args,
+                }
+            ],
+        )
+
+    def update_json_profiles(self, mc_dir, entries, dry_run=False):
+        """
+        Reconcile entries into launcher_profiles.json, writing (with a .bak)
+        only if something changed and never on dry_run.
+        """
         profiles_file = os.path.join(mc_dir, "launcher_profiles.json")
         if not os.path.exists(profiles_file):
             raise Exception(
                 "launcher_profiles.json not found (open Minecraft Launcher once first)."
             )
 
-        with open(profiles_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Concurrent installs would otherwise each write back what they read
+        with asset_lock(("launcher_profiles", os.path.realpath(mc_dir))):
+            with open(profiles_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            current_time = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+            changes = reconcile_launcher_profiles(data, entries, current_time)
+
+            if dry_run or all(action == "same" for _id, action, _keys in changes):
+                return changes
+
+            shutil.copy(profiles_file, profiles_file + ".bak")
+            write_json_atomic(profiles_file, data, indent=2)
+            return changes
+
+
+# --- LAN CACHE SERVER ---
+def catalog_asset_urls(data):
+    """Every URL a catalog entry may ask an installer to fetch."""
+    urls = set()
+    for cat in data.values():
+        for cfg in cat.values():
+            for key in URL_FIELDS:
+                if cfg.get(key):
+                    urls.add(cfg[key])
+    return urls
+
+
+def parse_byte_range(header, size):
+    """Parse a single 'bytes=a-b' Range header into inclusive (start, end)."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class CacheFill:
+    """
+    An asset downloading into the cache, served to clients as it grows.
+    Reads and the final rename share one lock (Windows can't rename open files).
+    """
+
+    def __init__(self, path):
+        self.path = path  # the .part file, then the cached file once done
+        self.cond = threading.Condition()
+        self.validators = None  # set once upstream has answered
+        self.written = 0
+        self.done = False
+        self.error = None
+
+    def wait_started(self, timeout):
+        with self.cond:
+            started = self.cond.wait_for(
+                lambda: self.validators is not None or self.error is not None, timeout
+            )
+            if self.error is not None:
+                raise self.error
+            if not started:
+                raise TimeoutError(f"upstream did not answer within {timeout}s")
+            return self.validators
+
+    def wait_done(self, timeout):
+        with self.cond:
+            if not self.cond.wait_for(
+                lambda: self.done or self.error is not None, timeout
+            ):
+                raise TimeoutError(f"upstream download stalled for {timeout}s")
+            if self.error is not None:
+                raise self.error
+
+    def read(self, offset, size, timeout):
+        """Up to size bytes at offset, waiting for them to arrive; b"" at the end."""
+        with self.cond:
+            if not self.cond.wait_for(
+                lambda: self.written > offset or self.done or self.error is not None,
+                timeout,
+            ):
+                raise TimeoutError(f"upstream download stalled for {timeout}s")
+            if self.written <= offset:
+                if self.error is not None:
+                    raise self.error
+                return b""
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                return f.read(min(size, self.written - offset))
+
+
+class AssetCache:
+    """
+    Pull-through cache used by --serve-cache. Only URLs that appear in the
+    catalog are fetched, so the server can't be used as an open proxy.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.allowed = {MODPACKS_URL}
+        self._fills = {}  # cached path -> CacheFill still downloading
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, url):
+        return os.path.join(self.cache_dir, cache_name_for_url(url))
+
+    def refresh_catalog(self):
+        path = self.path_for(MODPACKS_URL)
+        try:
+            raw = _http_get_bytes(_fresh_url(MODPACKS_URL), timeout=15)
+            data = parse_catalog(raw.decode("utf-8"))
+            with open(path + ".part", "wb") as f:
+                f.write(raw)
+            os.replace(path + ".part", path)
+        except Exception as e:
+            log(f"CACHE: catalog refresh failed, using cached copy: {e!r}")
+            if not os.path.exists(path):
+                raise
+            with open(path, "r", encoding="utf-8") as f:
+                data = parse_catalog(f.read())
+        self.allowed = {MODPACKS_URL} | catalog_asset_urls(data)
+        return path
+
+    def _read_meta(self, path):
+        try:
+            with open(path + ".meta", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _write_meta(self, path, meta):
+        with open(path + ".meta.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(path + ".meta.tmp", path + ".meta")
+
+    def ensure_cached(self, url):
+        """Cached file path and its upstream validators, fetching as needed."""
+        path, validators, fill = self.open_asset(url)
+        if fill is not None:
+            fill.wait_done(timeout=120)
+            path, validators = fill.path, fill.validators
+        return path, validators
+
+    def open_asset(self, url):
+        """
+        (path, validators, None) for a cached asset, or (None, None, fill) while
+        it downloads; the first request for a missing one starts it.
+        """
+        if url not in self.allowed:
+            raise KeyError(url)
+        path = self.path_for(url)
+        with asset_lock(("cache", path)):
+            if url == MODPACKS_URL:
+                if (
+                    not os.path.exists(path)
+                    or time.time() - os.path.getmtime(path) > CATALOG_CACHE_TTL
+                ):
+                    self.refresh_catalog()
+                return path, {}, None
+
+            fill = self._fills.get(path)
+            if fill is not None:
+                return None, None, fill
+
+            meta = self._read_meta(path) if os.path.exists(path) else None
+            if meta and time.time() - meta.get("checked", 0) > ASSET_REVALIDATE_TTL:
+                # Packs are republished under the same URL, so re-check
+                try:
+                    current = response_validators(http_head(url))
+                    if validators_match(meta["validators"], current):
+                        meta["checked"] = time.time()
+                        self._write_meta(path, meta)
+                    else:
+                        log(f"CACHE: {url} changed upstream")
+                        meta = None
+                except Exception as e:
+                    log(f"CACHE: revalidation failed for {url}, serving cached: {e!r}")
+
+            if meta is None:
+                log(f"CACHE: fetching {url}")
+                fill = CacheFill(path + ".part")
+                self._fills[path] = fill
+                threading.Thread(
+                    target=self._fill, args=(url, path, fill), daemon=True
+                ).start()
+                return None, None, fill
+        return path, meta["validators"], None
+
+    def _fill(self, url, path, fill):
+        try:
+            req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+            with urllib.request.urlopen(req, context=SSL_CTX, timeout=120) as response:
+                with open(fill.path, "wb") as out:
+                    with fill.cond:
+                        fill.validators = response_validators(response.info())
+                        fill.cond.notify_all()
+                    # read1: pass on whatever has arrived, don't wait for 64 KB
+                    for chunk in iter(lambda: response.read1(65536), b""):
+                        out.write(chunk)
+                        out.flush()
+                        with fill.cond:
+                            fill.written += len(chunk)
+                            fill.cond.notify_all()
+            with fill.cond:
+                os.replace(fill.path, path)
+                fill.path = path
+                self._write_meta(path, {"validators": fill.validators, "checked": time.time()})
+                fill.done = True
+                fill.cond.notify_all()
+        except Exception as e:
+            log(f"CACHE: fetching {url} failed: {e!r}")
+            with fill.cond:
+                fill.error = e
+                fill.cond.notify_all()
+        finally:
+            with asset_lock(("cache", path)):
+                self._fills.pop(path, None)
+
+
+class CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(head_only=False)
+
+    def do_HEAD(self):
+        self._serve(head_only=True)
+
+    def log_message(self, format, *args):
+        log(f"CACHE {self.address_string()} " + (format % args))
+
+    def _send_empty(self, code, extra_headers=None):
+        self.send_response(code)
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve(self, head_only):
+        parsed = urllib.parse.urlparse(self.path)
+        url = urllib.parse.parse_qs(parsed.query).get("url", [""])[0]
+        if parsed.path != "/asset" or not url:
+            self._send_empty(404)
+            return
+        try:
+            path, validators, fill = self.server.cache.open_asset(url)
+            if fill is not None:
+                validators = fill.wait_started(timeout=60)
+                if not validators["content_length"]:
+                    # No length to announce up front: serve it once complete
+                    fill.wait_done(timeout=600)
+                    path, fill = fill.path, None
+        except KeyError:
+            self._send_empty(404)
+            return
+        except Exception as e:
+            log(f"CACHE: upstream error for {url}: {e!r}")
+            self._send_empty(502)
+            return
+
+        size = validators["content_length"] if fill is not None else os.path.getsize(path)
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header:
+            byte_range = parse_byte_range(range_header, size)
+            if byte_range is None:
+                self._send_empty(416, {"Content-Range": f"bytes */{size}"})
+                return
+            start, end = byte_range
+            status = 206
+
+        content_type = mimetypes.guess_type(url.split("?")[0])[0]
+        self.send_response(status)
+        self.send_header("Content-Type", content_type or "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        if validators.get("etag"):
+            self.send_header("ETag", validators["etag"])
+        if validators.get("last_modified"):
+            self.send_header("Last-Modified", validators["last_modified"])
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head_only:
+            return
+
+        remaining = end - start + 1
+        if fill is not None:
+            # Relay the download as it lands; if upstream fails midway the
+            # short body makes the client fall back to the origin
+            offset = start
+            try:
+                while remaining > 0:
+                    chunk = fill.read(offset, min(65536, remaining), timeout=120)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    offset += len(chunk)
+                    remaining -= len(chunk)
+            except Exception as e:
+                log(f"CACHE: streaming {url} stopped: {e!r}")
+            if remaining:
+                self.close_connection = True
+            return
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(65536, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+
+def _answer_discovery(port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("", CACHE_DISCOVERY_PORT))
+    reply = json.dumps({"port": port}).encode("utf-8")
+    while True:
+        try:
+            data, addr = sock.recvfrom(1024)
+            if data == CACHE_DISCOVERY_MAGIC:
+                sock.sendto(reply, addr)
+        except Exception as e:
+            log(f"CACHE: discovery error: {e!r}")
+
 
-        if "profiles" not in data:
-            data["profiles"] = {}
+def serve_cache(port=CACHE_SERVER_PORT, cache_dir=None):
+    cache = AssetCache(cache_dir or get_cache_dir())
+    try:
+        cache.refresh_catalog()
+    except Exception as e:
+        log(f"CACHE: no catalog available yet: {e!r}")
+
+    httpd = http.server.ThreadingHTTPServer(("", port), CacheRequestHandler)
+    httpd.daemon_threads = True
+    httpd.cache = cache
+    threading.Thread(target=_answer_discovery, args=(port,), daemon=True).start()
+
+    msg = f"Serving asset cache {cache.cache_dir} on port {port}"
+    log(msg)
+    print(msg, flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
 
-        profile_id = name.replace(" ", "_")
-        current_time = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
 
-        final_java_args = (
-            f'{jvm_args} -Dminecraft.applet.TargetDirectory="{game_dir}"'
+def discover_cache_server(timeout=0.3):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.settimeout(timeout)
+        sock.sendto(CACHE_DISCOVERY_MAGIC, ("<broadcast>", CACHE_DISCOVERY_PORT))
+        data, addr = sock.recvfrom(1024)
+        port = int(json.loads(data.decode("utf-8"))["port"])
+        return f"http://{addr[0]}:{port}"
+    except Exception:
+        return None
+    finally:
+        sock.close()
+
+
+def configure_cache_server(url=None, discover=True, wait=True):
+    """
+    Pick the LAN cache server. Without wait, discovery runs on a
+    background thread and downloads use the server once it answers.
+    """
+    global CACHE_SERVER_URL
+    url = url or os.environ.get("MODS_CACHE_SERVER")
+    if not url and discover:
+        if not wait:
+            threading.Thread(
+                target=configure_cache_server, args=(None, True, True), daemon=True
+            ).start()
+            return
+        url = discover_cache_server()
+    CACHE_SERVER_URL = url.rstrip("/") if url else None
+    if CACHE_SERVER_URL:
+        log(f"Using LAN cache server: {CACHE_SERVER_URL}")
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def probe_host(url, timeout=PROBE_TIMEOUT):
+    """
+    DNS, TCP connect, TLS handshake and first-byte times for url in ms,
+    on a raw socket; a failing phase sets "error" and ends the probe.
+    """
+    parts = urllib.parse.urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    result = {"host": parts.hostname, "port": port, "scheme": parts.scheme}
+    sock = None
+    try:
+        start = time.perf_counter()
+        infos = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+        result["dns_ms"] = _ms(start)
+        family, kind, proto, _name, address = infos[0]
+        result["address"] = address[0]
+        result["family"] = "IPv6" if family == socket.AF_INET6 else "IPv4"
+
+        start = time.perf_counter()
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(timeout)
+        sock.connect(address)
+        result["connect_ms"] = _ms(start)
+
+        result["tls_ms"] = None
+        if secure:
+            start = time.perf_counter()
+            sock = SSL_CTX.wrap_socket(sock, server_hostname=parts.hostname)
+            result["tls_ms"] = _ms(start)
+            result["tls_version"] = sock.version()
+
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = (
+            f"HEAD {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            "User-Agent: Mozilla/5.0\r\nConnection: close\r\n\r\n"
         )
+        start = time.perf_counter()
+        sock.sendall(request.encode("latin-1"))
+        first = sock.recv(1024)
+        result["ttfb_ms"] = _ms(start)
+        status_line = first.split(b"\r\n", 1)[0].decode("latin-1")
+        result["status"] = int(status_line.split(" ", 2)[1]) if first else None
+    except Exception as e:
+        result["error"] = repr(e)
+    finally:
+        if sock is not None:
+            sock.close()
+    return result
+
+
+class _SampleFull(Exception):
+    pass
+
+
+async def async_sample_throughput(url, limit=THROUGHPUT_SAMPLE_BYTES, timeout=PROBE_TIMEOUT):
+    """
+    Download up to limit bytes of url, timing the rate from the first
+    chunk's arrival and leaving that chunk out.
+    """
+    got = 0
+    first = None
+    first_bytes = 0
+
+    def sink(chunk):
+        nonlocal got, first, first_bytes
+        if first is None:
+            first = time.perf_counter()
+            first_bytes = len(chunk)
+        got += len(chunk)
+        if got >= limit:
+            raise _SampleFull()
+
+    start = time.perf_counter()
+    try:
+        if USE_URLLIB:
 
-        data["profiles"][profile_id] = {
-            "created": current_time,
-            "gameDir": game_dir,
-            "icon": icon,
-            "lastUsed": current_time,
-            "lastVersionId": version_id,
-            "name": name,
-            "type": "custom",
-            "javaArgs": final_java_args,
+            def run():
+                req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+                with urllib.request.urlopen(req, context=SSL_CTX, timeout=timeout) as r:
+                    for chunk in iter(lambda: r.read(64 * 1024), b""):
+                        sink(chunk)
+
+            await asyncio.get_running_loop().run_in_executor(None, run)
+        else:
+            await async_request("GET", url, sink=sink, timeout=timeout)
+    except _SampleFull:
+        pass
+    end = time.perf_counter()
+    seconds = end - (first or end)
+    measured = got - first_bytes
+    return {
+        "url": url,
+        "bytes": got,
+        "first_byte_ms": round(((first or end) - start) * 1000, 1),
+        "mbit_per_s": (
+            round(measured * 8 / seconds / 1e6, 2) if measured and seconds > 0 else None
+        ),
+    }
+
+
+def measure_disk(directory, size=DISK_SAMPLE_BYTES):
+    """Sequential write and fsync speed of a scratch file in directory."""
+    block = os.urandom(1024 * 1024)
+    path = os.path.join(directory, f"temp_selftest_{os.getpid()}.bin")
+    try:
+        start = time.perf_counter()
+        with open(path, "wb") as f:
+            for _ in range(size // len(block)):
+                f.write(block)
+            f.flush()
+            written = time.perf_counter()
+            os.fsync(f.fileno())
+        done = time.perf_counter()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return {
+        "directory": directory,
+        "bytes": size,
+        "write_mb_per_s": round(size / (written - start) / 1e6, 1),
+        "fsync_ms": round((done - written) * 1000, 1),
+        "write_fsync_mb_per_s": round(size / (done - start) / 1e6, 1),
+    }
+
+
+def measure_extract(directory):
+    """
+    Extraction speed through extract_archive, on a generated zip of
+    mod-jar-sized deflated members (half random, half compressible).
+    """
+    work_dir, work_lock = make_work_dir("temp_selftest_", directory)
+    try:
+        zip_path = os.path.join(work_dir, "sample.zip")
+        half = EXTRACT_SAMPLE_FILE_BYTES // 2
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
+            for i in range(EXTRACT_SAMPLE_FILES):
+                z.writestr(f"mods/sample{i}.jar", os.urandom(half) + bytes(half))
+        total = EXTRACT_SAMPLE_FILES * EXTRACT_SAMPLE_FILE_BYTES
+        start = time.perf_counter()
+        extract_archive(zip_path, os.path.join(work_dir, "out"))
+        seconds = time.perf_counter() - start
+        return {
+            "files": EXTRACT_SAMPLE_FILES,
+            "bytes": total,
+            "ms": round(seconds * 1000, 1),
+            "mb_per_s": round(total / seconds / 1e6, 1),
         }
+    finally:
+        release_lock_file(work_lock)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def probe_urls(catalog):
+    """One URL per distinct (scheme, host, port): the catalog and its assets."""
+    urls = {}
+    for url in [MODPACKS_URL] + [
+        entry.config[key]
+        for entry in catalog.entries
+        for key in URL_FIELDS
+        if entry.config.get(key)
+    ]:
+        parts = urllib.parse.urlsplit(url)
+        urls.setdefault((parts.scheme, parts.hostname, parts.port), url)
+    return list(urls.values())
+
+
+def run_diagnostics(mc_dir=None):
+    """
+    The --selftest report. Every section records its own error; "ok" is
+    whether the catalog could be fetched and parsed.
+    """
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "os": f"{platform.system()} {platform.release()}",
+        "python": sys.version.split()[0],
+        "features": {"certifi": HAS_CERTIFI, "pillow": HAS_PILLOW, "zstd": HAS_ZSTD},
+        "urllib_fallback": USE_URLLIB,
+        "catalog_url": MODPACKS_URL,
+    }
+    ram_mb, cpus = hardware()
+    report["hardware"] = {"ram_mb": ram_mb, "cpus": cpus}
+
+    catalog = Catalog({})
+    start = time.perf_counter()
+    try:
+        raw = http_get_bytes(MODPACKS_URL, timeout=15).decode("utf-8")
+        catalog = Catalog(parse_catalog(raw))
+        report["catalog"] = {"ms": _ms(start), "bytes": len(raw), "packs": len(catalog.entries)}
+    except Exception as e:
+        report["catalog"] = {"ms": _ms(start), "error": repr(e)}
+        log(traceback.format_exc())
+    report["ok"] = "error" not in report["catalog"]
+
+    urls = probe_urls(catalog)
+    with ThreadPoolExecutor(max_workers=PREFLIGHT_WORKERS) as pool:
+        report["hosts"] = list(pool.map(probe_host, urls))
+
+    sample_url = next(
+        (e.config["loader_url"] for e in catalog.entries if e.config.get("loader_url")),
+        next((e.config["url"] for e in catalog.entries), None),
+    )
+    if sample_url is None:
+        report["throughput"] = {"error": "no asset to sample"}
+    else:
+        try:
+            report["throughput"] = get_transport().run(async_sample_throughput(sample_url))
+        except Exception as e:
+            report["throughput"] = {"url": sample_url, "error": repr(e)}
+        # Connections try addresses in getaddrinfo order, as probe_host does
+        sample_host = urllib.parse.urlsplit(sample_url).hostname
+        for host in report["hosts"]:
+            if host["host"] == sample_host and "family" in host:
+                report["throughput"]["family"] = host["family"]
+                break
 
-        shutil.copy(profiles_file, profiles_file + ".bak")
-        with open(profiles_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    directory = mc_dir if mc_dir and os.path.isdir(mc_dir) else tempfile.gettempdir()
+    for key, measure in (("disk", measure_disk), ("extract", measure_extract)):
+        try:
+            report[key] = measure(directory)
+        except Exception as e:
+            report[key] = {"directory": directory, "error": repr(e)}
+    return report
 
 
-def selftest():
+def selftest(report_path=None):
     log("=== SELFTEST START ===")
     log(f"OS={platform.system()} {platform.release()}  PY={sys.version}")
-    log(f"HAS_CERTIFI={HAS_CERTIFI}  HAS_PILLOW={HAS_PILLOW}")
+    log(f"HAS_CERTIFI={HAS_CERTIFI}  HAS_PILLOW={HAS_PILLOW}  HAS_ZSTD={HAS_ZSTD}")
     log(f"MODPACKS_URL={MODPACKS_URL}")
-    try:
-        raw = http_get_bytes(MODPACKS_URL, timeout=15).decode("utf-8")
-        data = json.loads(raw)
-        log(f"SELFTEST OK: categories={len(data)}")
+    report = run_diagnostics(get_mc_dir())
+    text = json.dumps(report, indent=2)
+    log(text)
+    print(text)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    if report["ok"]:
+        log(f"SELFTEST OK: packs={report['catalog']['packs']}")
         return 0
+    log("SELFTEST FAIL: " + report["catalog"]["error"])
+    return 1
+
+
+# --- BACKGROUND UPDATER ---
+DAEMON_INTERVAL_MINUTES = 60
+LAUNCHER_PROCESS_NAMES = (
+    "minecraftlauncher.exe",
+    "minecraft.exe",
+    "minecraft launcher",
+    "minecraft-launcher",
+)
+
+
+def launcher_running():
+    """True if the Minecraft launcher (or a game it started) is running."""
+    try:
+        if platform.system() == "Windows":
+            out = subprocess.run(
+                ["tasklist", "/FO", "CSV", "/NH"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            ).stdout.lower()
+        else:
+            out = subprocess.run(
+                ["ps", "-A", "-o", "args="], capture_output=True, text=True, timeout=10
+            ).stdout.lower()
     except Exception as e:
-        log("SELFTEST FAIL: " + repr(e))
-        log(traceback.format_exc())
-        return 1
+        log(f"DAEMON: could not list processes, assuming launcher is running: {e!r}")
+        return True
+    if any(name in out for name in LAUNCHER_PROCESS_NAMES):
+        return True
+    # A game started by the launcher outlives it as a java process
+    return any("java" in line and "net.minecraft" in line for line in out.splitlines())
+
+
+def parse_quiet_hours(text):
+    """'HH:MM-HH:MM' -> (start, end) minutes after midnight; may wrap midnight."""
+    start, _, end = text.partition("-")
+
+    def minutes(hhmm):
+        hours, _, mins = hhmm.strip().partition(":")
+        return int(hours) * 60 + int(mins or 0)
+
+    return minutes(start), minutes(end)
+
+
+def in_quiet_hours(window, now=None):
+    if not window:
+        return False
+    start, end = window
+    t = time.localtime(now)
+    current = t.tm_hour * 60 + t.tm_min
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+async def async_fetch_catalog_if_changed(validators, timeout=15):
+    """
+    (catalog, validators) for a conditional GET of MODPACKS_URL, or
+    (None, validators) when the origin answers 304 Not Modified.
+    """
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    elif validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    if USE_URLLIB:
+
+        def run():
+            req = urllib.request.Request(
+                MODPACKS_URL, headers={"User-Agent": "Mozilla/5.0", **headers}
+            )
+            try:
+                with urllib.request.urlopen(req, context=SSL_CTX, timeout=timeout) as r:
+                    return 200, {k.lower(): v for k, v in r.headers.items()}, r.read()
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    return 304, {}, b""
+                raise
+
+        status, resp_headers, raw = await asyncio.get_running_loop().run_in_executor(
+            None, run
+        )
+    else:
+        buf = BytesIO()
+        resp = await async_request(
+            "GET", MODPACKS_URL, headers=headers, sink=buf.write, timeout=timeout
+        )
+        status, resp_headers, raw = resp.status, resp.headers, buf.getvalue()
+
+    if status == 304:
+        return None, validators
+    return parse_catalog(raw.decode("utf-8")), response_validators(resp_headers)
+
+
+class _NullVar:
+    def set(self, _value):
+        pass
+
+    def get(self):
+        return 0
+
+
+class HeadlessInstaller(InstallerApp):
+    """
+    The installer without a Tk window, for --daemon: status goes to the
+    log and existing profiles are always updated in place.
+    """
+
+    def __init__(self, mc_dir):
+        self.root = None
+        self.mc_dir = mc_dir
+        self.progress_var = _NullVar()
+        self.init_state()
+        self.modpacks = {}
+        self.catalog = Catalog({})
+        self.catalog_validators = {}
+
+    def get_mc_dir(self):
+        return self.mc_dir
+
+    def update_status(self, text):
+        log(f"DAEMON: {text}")
+
+    def update_plan(self, text):
+        log(f"DAEMON: {text}")
+
+    def update_progress(self, current, total, eta_seconds=0, action="Processing"):
+        pass
+
+    def confirm_update(self, config):
+        return True
+
+    def refresh_catalog(self):
+        data, self.catalog_validators = get_transport().run(
+            async_fetch_catalog_if_changed(self.catalog_validators)
+        )
+        if data is not None:
+            self.modpacks = data
+            self.catalog = Catalog(data)
+        return data is not None
+
+    def run_cycle(self, quiet_hours=None, throttle_minutes=0):
+        """One check-and-update pass. Returns the event it logged."""
+        mc_dir = self.mc_dir
+        changed = self.refresh_catalog()
+        report = check_updates(mc_dir, self.catalog)
+        outdated = [
+            row["folder"]
+            for row in report["profiles"]
+            if row["status"] == "update available"
+        ]
+        log_event(
+            "check",
+            catalog_changed=changed,
+            profiles=len(report["profiles"]),
+            outdated=outdated,
+            elapsed_ms=report["elapsed_ms"],
+        )
+        if not outdated:
+            return "up_to_date"
+
+        reason = None
+        if in_quiet_hours(quiet_hours):
+            reason = "quiet hours"
+        elif time.time() - load_state(mc_dir).setting("last_applied", 0) < throttle_minutes * 60:
+            reason = "throttled"
+        elif launcher_running():
+            reason = "launcher running"
+        if reason:
+            log_event("deferred", reason=reason, outdated=outdated)
+            return "deferred"
+
+        configs = [self.catalog.by_folder[folder] for folder in outdated]
+        plan = plan_install(mc_dir, configs, skip_unchanged=True)
+        started = time.time()
+        try:
+            self.run_plan(mc_dir, plan, keep_going=True)
+        except Exception as e:
+            log(traceback.format_exc())
+            log_event("update_failed", error=repr(e), outdated=outdated)
+            return "update_failed"
+        # Persisted so the throttle survives daemon restarts
+        load_state(mc_dir).set_setting("last_applied", time.time())
+
+        after = check_updates(mc_dir, self.catalog)["profiles"]
+        still = [row["folder"] for row in after if row["status"] == "update available"]
+        log_event(
+            "updated",
+            updated=[folder for folder in outdated if folder not in still],
+            failed=[folder for folder in outdated if folder in still],
+            skipped=[config["folder_name"] for config in plan.unchanged],
+            seconds=round(time.time() - started, 1),
+        )
+        return "updated"
+
+
+def run_daemon(
+    interval_minutes=DAEMON_INTERVAL_MINUTES,
+    quiet_hours=None,
+    throttle_minutes=0,
+    once=False,
+):
+    mc_dir = get_mc_dir()
+    log_event(
+        "daemon_start",
+        mc_dir=mc_dir,
+        interval_minutes=interval_minutes,
+        quiet_hours=quiet_hours,
+        throttle_minutes=throttle_minutes,
+    )
+    window = parse_quiet_hours(quiet_hours) if quiet_hours else None
+    installer = HeadlessInstaller(mc_dir)
+    while True:
+        try:
+            installer.run_cycle(window, throttle_minutes)
+        except Exception as e:
+            log(traceback.format_exc())
+            log_event("cycle_failed", error=repr(e))
+        if once:
+            return 0
+        try:
+            time.sleep(interval_minutes * 60)
+        except KeyboardInterrupt:
+            log_event("daemon_stop")
+            return 0
+
+
+# --- OFFLINE BUNDLES ---
+BUNDLE_FORMAT = 1
+BUNDLE_MANIFEST = "manifest.json"
+
+
+def bundle_member_slice(path, mm, info):
+    """Where a stored member's bytes sit inside the bundle file (mapped as mm)."""
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise zipfile.BadZipFile(f"{info.filename} in {path} is compressed")
+    return ArchiveSlice(path, _member_data_offset(mm, info), info.file_size)
+
+
+class Bundle:
+    """
+    An offline bundle opened for import: a stored zip, so each archive and
+    icon inside is read in place as a byte range.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f, zipfile.ZipFile(f, "r") as z:
+            self.manifest = json.loads(z.read(BUNDLE_MANIFEST).decode("utf-8"))
+            if self.manifest.get("format", 1) > BUNDLE_FORMAT:
+                raise ValueError(f"{path} needs a newer installer")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.slices = {
+                    info.filename: bundle_member_slice(path, mm, info)
+                    for info in z.infolist()
+                    if info.filename != BUNDLE_MANIFEST
+                }
+        self.catalog = parse_catalog(json.dumps(self.manifest["catalog"]))
+
+    def source(self, url):
+        asset = self.manifest["assets"].get(url)
+        return self.slices[asset["path"]] if asset else None
+
+    def info(self, url):
+        asset = self.manifest["assets"][url]
+        return {"validators": dict(asset["validators"]), "sha256": asset["sha256"]}
+
+    def validators(self):
+        return {url: dict(a["validators"]) for url, a in self.manifest["assets"].items()}
+
+    def has_icon(self, icon_url):
+        return icon_url in self.manifest["icons"]
+
+    def icon_png(self, icon_url):
+        icon = self.manifest["icons"].get(icon_url)
+        if icon is None:
+            return None
+        with open_archive(self.slices[icon["path"]]) as f:
+            return f.read()
+
+    def verify(self):
+        """Check every member against the SHA-256 recorded when exporting."""
+        entries = list(self.manifest["assets"].values()) + list(self.manifest["icons"].values())
+        for entry in entries:
+            digest = hashlib.sha256()
+            with open_archive(self.slices[entry["path"]]) as f:
+                for chunk in iter(lambda: f.read(INFLATE_CHUNK), b""):
+                    digest.update(chunk)
+            if digest.hexdigest() != entry["sha256"]:
+                raise ValueError(f"{entry['path']} in {self.path} is corrupt")
+
+
+def select_packs(catalog, names):
+    """Catalog entries matching names (pack name, profile name or folder)."""
+    wanted = {n.lower() for n in names}
+    chosen = [
+        entry
+        for entry in catalog.entries
+        if {entry.name.lower(), entry.config["profile_name"].lower(),
+            entry.config["folder_name"].lower()} & wanted
+    ]
+    found = {
+        n
+        for entry in chosen
+        for n in (entry.name, entry.config["profile_name"], entry.config["folder_name"])
+    }
+    missing = [n for n in names if n.lower() not in {f.lower() for f in found}]
+    if missing:
+        raise ValueError(f"Not in the catalog: {', '.join(missing)}")
+    return chosen
+
+
+def export_bundle(out_path, catalog, names):
+    """
+    Write a bundle with the catalog entries for names, every archive they
+    can download (all OS variants plus loaders) and their icons, rendered.
+    """
+    entries = select_packs(catalog, names)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "catalog": {},
+        "assets": {},
+        "icons": {},
+    }
+    urls = []
+    for entry in entries:
+        # Fold in the lazily loaded details so the bundle is self-contained
+        config = dict(entry.config)
+        config.update(get_transport().run(async_fetch_pack_details(config)))
+        config.pop("detail_url", None)
+        manifest["catalog"].setdefault(entry.category, {})[entry.name] = config
+        for key in ("url", "mac_url", "windows_url", "loader_url"):
+            if config.get(key) and config[key] not in urls:
+                urls.append(config[key])
+
+    # Next to the bundle: assets are staged on the disk that will hold them,
+    # not in a temp dir that may be a small RAM-backed filesystem
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    work_dir = tempfile.mkdtemp(prefix="temp_bundle_", dir=out_dir)
+    try:
+        with zipfile.ZipFile(out_path + ".part", "w", zipfile.ZIP_STORED) as z:
+            for i, url in enumerate(urls):
+                log(f"BUNDLE: fetching {url}")
+                path = os.path.join(work_dir, "asset")
+                validators = {}
+                sha256 = http_download_file(url, path, timeout=120, validators=validators)
+                member = f"assets/{i:03d}-{sha256[:16]}"
+                z.write(path, member)
+                os.remove(path)
+                manifest["assets"][url] = {
+                    "path": member,
+                    "sha256": sha256,
+                    "size": z.getinfo(member).file_size,
+                    "validators": validators,
+                }
+
+            if HAS_PILLOW:
+                for entry in entries:
+                    icon_url = entry.config.get("icon_url")
+                    if not icon_url or icon_url in manifest["icons"]:
+                        continue
+                    try:
+                        png = fetch_icon_png(icon_url, size=128, timeout=20)
+                    except Exception as e:
+                        log(f"BUNDLE: skipping icon {icon_url}: {e!r}")
+                        continue
+                    member = f"icons/{entry.config['folder_name']}.png"
+                    z.writestr(member, png)
+                    manifest["icons"][icon_url] = {
+                        "path": member,
+                        "sha256": hashlib.sha256(png).hexdigest(),
+                    }
+
+            z.writestr(BUNDLE_MANIFEST, json.dumps(manifest, indent=1))
+        os.replace(out_path + ".part", out_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    log(f"BUNDLE: wrote {out_path} ({len(entries)} packs, {len(urls)} archives)")
+    return manifest
+
+
+def import_bundle(path, mc_dir):
+    """Install every pack in the bundle with the normal flow, offline."""
+    bundle = Bundle(path)
+    bundle.verify()
+    installer = HeadlessInstaller(mc_dir)
+    installer.bundle = bundle
+    configs = [entry.config for entry in Catalog(bundle.catalog).entries]
+    plan = plan_install(mc_dir, configs, known_validators=bundle.validators())
+    installer.run_plan(mc_dir, plan)
+    log(f"BUNDLE: installed {len(configs)} packs from {path}")
+    return [config["folder_name"] for config in configs]
 
 
 if __name__ == "__main__":
@@ -1169,10 +5625,102 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("--selftest", action="store_true")
+    parser.add_argument("--report", default=None)  # --selftest: also write the JSON here
+    parser.add_argument("--catalog-url", default=None)  # e.g. a local stand-in server
+    parser.add_argument("--serve-cache", action="store_true")
+    parser.add_argument("--port", type=int, default=CACHE_SERVER_PORT)
+    parser.add_argument("--cache-server", default=None)
+    parser.add_argument("--no-discovery", action="store_true")
+    parser.add_argument("--check-updates", action="store_true")
+    parser.add_argument("--mc-dir", default=None)
+    parser.add_argument("--daemon", action="store_true")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL_MINUTES)
+    parser.add_argument("--quiet-hours", default=None)  # e.g. 08:00-16:00
+    parser.add_argument("--throttle", type=float, default=0)  # minutes between updates
+    parser.add_argument("--once", action="store_true")
+    parser.add_argument("--export-bundle", nargs="+", default=None, metavar="PACK")
+    parser.add_argument("--import-bundle", default=None, metavar="FILE")
+    parser.add_argument("--bundle-file", default="mods-bundle.zip")
+    parser.add_argument("--scan", action="store_true")
+    parser.add_argument("--reclaim", action="store_true")
     args, _unknown = parser.parse_known_args()
 
+    if args.mc_dir:
+        MC_DIR_OVERRIDE = os.path.abspath(args.mc_dir)
+
+    if args.catalog_url:
+        MODPACKS_URL = args.catalog_url
+
     if args.selftest:
-        raise SystemExit(selftest())
+        raise SystemExit(selftest(args.report))
+
+    if args.serve_cache:
+        raise SystemExit(serve_cache(port=args.port))
+
+    # Before cache discovery: importing must not touch the network at all
+    if args.import_bundle:
+        try:
+            installed = import_bundle(args.import_bundle, get_mc_dir())
+        except Exception as e:
+            log("ERROR importing bundle: " + repr(e))
+            log(traceback.format_exc())
+            print(json.dumps({"error": repr(e)}))
+            raise SystemExit(1)
+        print(json.dumps({"installed": installed}))
+        raise SystemExit(0)
+
+    gui = not (
+        args.check_updates or args.scan or args.reclaim or args.export_bundle or args.daemon
+    )
+    configure_cache_server(
+        args.cache_server, discover=not args.no_discovery, wait=not gui
+    )
+
+    if args.check_updates:
+        try:
+            report = check_updates(get_mc_dir(), Catalog(fetch_catalog()))
+        except Exception as e:
+            log("ERROR checking updates: " + repr(e))
+            print(json.dumps({"error": repr(e)}))
+            raise SystemExit(1)
+        print(json.dumps(report, indent=2))
+        raise SystemExit(0)
+
+    if args.scan or args.reclaim:
+        try:
+            catalog = Catalog(fetch_catalog())
+        except Exception as e:
+            log("SCAN: no catalog, skipping the uncataloged check: " + repr(e))
+            catalog = None
+        report = scan_profiles(get_mc_dir(), catalog)
+        if args.reclaim:
+            report["reclaimed_bytes"] = reclaim_space(get_mc_dir(), report)
+            _trash.wait()
+        print(json.dumps(report, indent=2))
+        raise SystemExit(0)
+
+    if args.export_bundle:
+        try:
+            manifest = export_bundle(
+                args.bundle_file, Catalog(fetch_catalog()), args.export_bundle
+            )
+        except Exception as e:
+            log("ERROR exporting bundle: " + repr(e))
+            log(traceback.format_exc())
+            print(json.dumps({"error": repr(e)}))
+            raise SystemExit(1)
+        print(json.dumps({"bundle": args.bundle_file, "archives": len(manifest["assets"])}))
+        raise SystemExit(0)
+
+    if args.daemon:
+        raise SystemExit(
+            run_daemon(
+                interval_minutes=args.interval,
+                quiet_hours=args.quiet_hours,
+                throttle_minutes=args.throttle,
+                once=args.once,
+            )
+        )
 
     root = tk.Tk()
     app = InstallerApp(root)
@@ -0,0 +1,52 @@
+import functools
+import http.server
+import os
+import sys
+import threading
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import installer  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer, "LOG_PATH", str(tmp_path / "installer_debug.log"))
+    monkeypatch.setattr(installer, "EVENT_LOG_PATH", str(tmp_path / "installer_events.jsonl"))
+
+
+@pytest.fixture
+def mc_dir(tmp_path):
+    path = tmp_path / "minecraft"
+    path.mkdir()
+    (path / "launcher_profiles.json").write_text('{"profiles": {}}')
+    return str(path)
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_root(tmp_path):
+    """(directory, base url) of a local http.server serving that directory."""
+    root = tmp_path / "www"
+    root.mkdir()
+    handler = functools.partial(_QuietHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_zip(path, files):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in files.items():
+            z.writestr(name, data)
+    return str(path)
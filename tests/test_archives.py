@@ -0,0 +1,91 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+import installer
+
+pytestmark = pytest.mark.skipif(not installer.HAS_ZSTD, reason="needs zstandard")
+
+
+def make_tar_zst(path, files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    with open(path, "wb") as f:
+        f.write(installer.zstandard.ZstdCompressor().compress(buf.getvalue()))
+    return str(path)
+
+
+@pytest.fixture
+def counted_zstd(monkeypatch):
+    opened = []
+    real = installer.open_zstd
+
+    def open_zstd(fileobj):
+        opened.append(fileobj)
+        return real(fileobj)
+
+    monkeypatch.setattr(installer, "open_zstd", open_zstd)
+    return opened
+
+
+def test_simple_pack_is_decompressed_once(tmp_path, counted_zstd):
+    archive = make_tar_zst(
+        tmp_path / "pack.tar.zst",
+        {
+            "Pack/config/a.cfg": b"cfg",
+            "Pack/mods/a.jar": b"a",
+            "Pack/mods/sub/b.jar": b"b",
+            "Pack/extra/mods/c.jar": b"c",
+        },
+    )
+    dest = tmp_path / "out"
+
+    roots = installer.extract_dirs(archive, str(dest), ("mods",), kind="tar.zst")
+
+    assert roots == {"mods": "Pack/mods/"}
+    assert len(counted_zstd) == 1
+    assert sorted(installer.list_files(str(dest))) == ["mods/a.jar", "mods/sub/b.jar"]
+
+
+def test_pack_without_mods_folder_is_extracted_whole(tmp_path):
+    archive = make_tar_zst(tmp_path / "pack.tar.zst", {"a.jar": b"a", "b.jar": b"b"})
+    dest = tmp_path / "out"
+
+    roots = installer.extract_dirs(
+        archive, str(dest), ("mods",), kind="tar.zst", whole_if_missing=True
+    )
+
+    assert roots == {}
+    assert sorted(os.listdir(dest)) == ["a.jar", "b.jar"]
+
+
+def test_loader_roots(tmp_path):
+    archive = make_tar_zst(
+        tmp_path / "loader.tar.zst",
+        {"versions/x/x.json": b"{}", "libraries/l.jar": b"l", "README": b"r"},
+    )
+    dest = tmp_path / "out"
+
+    roots = installer.extract_dirs(archive, str(dest), ("versions", "libraries"), kind="tar.zst")
+
+    assert set(roots) == {"versions", "libraries"}
+    assert sorted(installer.list_files(str(dest))) == ["libraries/l.jar", "versions/x/x.json"]
+
+
+def test_extract_without_tar_filters(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer, "TAR_HAS_FILTER", False)
+    archive = make_tar_zst(
+        tmp_path / "pack.tar.zst", {"../escape.jar": b"x", "/abs/mods/a.jar": b"a"}
+    )
+    dest = tmp_path / "out"
+
+    installer.extract_archive(archive, str(dest), kind="tar.zst")
+
+    assert not (tmp_path / "escape.jar").exists()
+    assert sorted(installer.list_files(str(dest))) == ["abs/mods/a.jar", "escape.jar"]
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+import installer
+from conftest import make_zip
+
+
+@pytest.fixture
+def catalog(http_root):
+    root, base = http_root
+    make_zip(root / "pack.zip", {"Pack/mods/a.jar": b"a" * 1000})
+    make_zip(root / "plain.zip", {"mods/b.jar": b"b" * 1000})
+    packs = {
+        "Pack": {
+            "url": f"{base}/pack.zip",
+            "profile_name": "Pack",
+            "folder_name": "Pack",
+            "version_id": "1.20.1",
+            "icon_url": f"{base}/pack.png",
+        },
+        "Plain": {
+            "url": f"{base}/plain.zip",
+            "profile_name": "Plain",
+            "folder_name": "Plain",
+            "version_id": "1.20.1",
+            "icon_url": f"{base}/plain.png",
+        },
+    }
+    return installer.Catalog(installer.parse_catalog(json.dumps({"Cat": packs})))
+
+
+def test_slice_file_reads_only_its_range(tmp_path):
+    path = tmp_path / "blob"
+    path.write_bytes(b"0123456789")
+
+    with installer.SliceFile(str(path), 3, 4) as f:
+        assert f.read() == b"3456"
+        f.seek(-2, 2)
+        assert f.read(10) == b"56"
+        f.seek(1)
+        assert f.read(2) == b"45"
+        assert f.fileno() > 0 and f.base == 3
+
+
+def test_export_stages_next_to_the_bundle(tmp_path, catalog, monkeypatch):
+    made = []
+    real_mkdtemp = installer.tempfile.mkdtemp
+
+    def mkdtemp(*args, **kwargs):
+        made.append(kwargs.get("dir"))
+        return real_mkdtemp(*args, **kwargs)
+
+    monkeypatch.setattr(installer.tempfile, "mkdtemp", mkdtemp)
+    out = tmp_path / "out" / "bundle.zip"
+    out.parent.mkdir()
+
+    installer.export_bundle(str(out), catalog, ["Pack"])
+
+    assert made == [str(out.parent)]
+    assert os.listdir(out.parent) == ["bundle.zip"]
+
+
+def test_import_is_offline_and_uses_bundled_icons(tmp_path, mc_dir, catalog, monkeypatch):
+    def fetch_icon_png(url, **kwargs):
+        if url.endswith("plain.png"):
+            raise installer.HttpError(404, url)
+        return b"png"
+
+    monkeypatch.setattr(installer, "HAS_PILLOW", True)
+    monkeypatch.setattr(installer, "fetch_icon_png", fetch_icon_png)
+    out = str(tmp_path / "bundle.zip")
+    manifest = installer.export_bundle(out, catalog, ["Pack", "Plain"])
+    assert len(manifest["icons"]) == 1  # plain.png failed and was left out
+
+    network = []
+
+    def offline(*args, **kwargs):
+        network.append(args)  # icon errors are only logged, so record too
+        raise AssertionError("network used during a bundle import")
+
+    monkeypatch.setattr(installer, "fetch_icon_png", offline)
+    monkeypatch.setattr(installer, "async_request", offline)
+    monkeypatch.setattr(installer, "http_download_file", offline)
+
+    assert sorted(installer.import_bundle(out, mc_dir)) == ["Pack", "Plain"]
+    profiles = os.path.join(mc_dir, "profiles")
+    assert os.path.isfile(os.path.join(profiles, "Pack", "mods", "a.jar"))
+    assert os.path.isfile(os.path.join(profiles, "Pack", "icon.png"))
+    assert not os.path.exists(os.path.join(profiles, "Plain", "icon.png"))
+    assert network == []
@@ -0,0 +1,96 @@
+import http.server
+import os
+import threading
+import urllib.parse
+import urllib.request
+
+import pytest
+
+import installer
+
+BODY = os.urandom(300 * 1024)
+HALF = len(BODY) // 2
+
+
+@pytest.fixture
+def slow_upstream():
+    """Sends the first half of BODY, then waits for release.set()."""
+    release = threading.Event()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(BODY[:HALF])
+            self.wfile.flush()
+            release.wait(10)
+            self.wfile.write(BODY[HALF:])
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/pack.zip", release
+    release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_server(tmp_path):
+    cache = installer.AssetCache(str(tmp_path / "cache"))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), installer.CacheRequestHandler)
+    server.daemon_threads = True
+    server.cache = cache
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield cache, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def asset_url(base, url):
+    return f"{base}/asset?url={urllib.parse.quote(url, safe='')}"
+
+
+def test_clients_are_served_while_the_cache_fills(slow_upstream, cache_server):
+    url, release = slow_upstream
+    cache, base = cache_server
+    cache.allowed.add(url)
+
+    first = urllib.request.urlopen(asset_url(base, url), timeout=5)
+    second = urllib.request.urlopen(asset_url(base, url), timeout=5)
+    assert first.headers["Content-Length"] == str(len(BODY))
+    # Both get the first half before upstream has sent the rest
+    assert first.read(HALF) == BODY[:HALF]
+    assert second.read(HALF) == BODY[:HALF]
+    release.set()
+    assert first.read() == BODY[HALF:]
+    assert second.read() == BODY[HALF:]
+
+    path, validators = cache.ensure_cached(url)
+    with open(path, "rb") as f:
+        assert f.read() == BODY
+    assert validators["etag"] == '"v1"'
+
+
+def test_range_request_during_fill(slow_upstream, cache_server):
+    url, release = slow_upstream
+    cache, base = cache_server
+    cache.allowed.add(url)
+    req = urllib.request.Request(
+        asset_url(base, url), headers={"Range": f"bytes={HALF - 10}-{HALF + 9}"}
+    )
+    threading.Timer(0.2, release.set).start()
+    with urllib.request.urlopen(req, timeout=5) as r:
+        assert r.status == 206
+        assert r.read() == BODY[HALF - 10 : HALF + 10]
+
+
+def test_unknown_url_is_refused(cache_server):
+    _cache, base = cache_server
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(asset_url(base, "http://example.invalid/x.zip"), timeout=5)
+    assert e.value.code == 404
@@ -0,0 +1,135 @@
+import json
+
+import installer
+
+
+FORMAT_2 = {
+    "format": 2,
+    "defaults": {"is_complex": False},
+    "loaders": {"fab": {"version_id": "fabric-loader-1.20.1", "loader_url": "https://x/l.zip"}},
+    "jvm_args": {"big": "-Xmx8G"},
+    "packs": {
+        "Horror": {
+            "Dread": {
+                "url": "https://x/dread.zip",
+                "profile_name": "Dread",
+                "folder_name": "Dread",
+                "loader": "fab",
+                "jvm": "big",
+                "detail": "details/dread.json",
+            },
+            "Broken": {
+                "url": "https://x/broken.zip",
+                "profile_name": "Broken",
+                "folder_name": "Broken",
+                "loader": "missing",
+            },
+        }
+    },
+}
+
+
+def test_parse_catalog_format_2():
+    catalog = installer.parse_catalog(json.dumps(FORMAT_2), "https://host/cat/modpacks.json")
+
+    assert list(catalog["Horror"]) == ["Dread"]
+    config = catalog["Horror"]["Dread"]
+    assert config["version_id"] == "fabric-loader-1.20.1"
+    assert config["loader_url"] == "https://x/l.zip"
+    assert config["jvm_args"] == "-Xmx8G"
+    assert config["is_complex"] is False
+    assert config["detail_url"] == "https://host/cat/details/dread.json"
+
+
+def test_search_covers_detail_records():
+    catalog = installer.Catalog(installer.parse_catalog(json.dumps(FORMAT_2)))
+    assert catalog.search("haunted") == []
+
+    config = catalog.get("Horror", "Dread")
+    catalog.add_details(config, {"description": "A haunted lighthouse"})
+
+    assert [e.name for e in catalog.search("haunted")] == ["Dread"]
+    assert config["description"] == "A haunted lighthouse"
+
+
+def test_fetch_details_many(http_root):
+    root, base = http_root
+    (root / "dread.json").write_text(json.dumps({"description": "d", "rating": "9/10"}))
+    configs = [{"detail_url": f"{base}/dread.json"}, {"detail_url": f"{base}/missing.json"}]
+
+    results = installer.get_transport().run(installer.async_fetch_details_many(configs))
+
+    assert results == {
+        f"{base}/dread.json": {"description": "d", "rating": "9/10"},
+        f"{base}/missing.json": None,
+    }
+
+
+class FakeVar:
+    def __init__(self):
+        self.value = ""
+
+    def get(self):
+        return self.value
+
+
+class FakeWidget:
+    def __init__(self, var=None):
+        self.var = var or FakeVar()
+        self.options = {"values": [], "state": "readonly"}
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def __getitem__(self, key):
+        return self.options[key]
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def set(self, value):
+        self.var.value = value
+
+    def current(self, index):
+        self.var.value = self.options["values"][index]
+
+    def pack(self, **_options):
+        pass
+
+    def pack_forget(self):
+        pass
+
+
+def make_app(data):
+    app = installer.InstallerApp.__new__(installer.InstallerApp)
+    app.modpacks = data
+    app.catalog = installer.Catalog(data)
+    app.search_results = None
+    app._search_job = None
+    app._details_fetched_for = None
+    app.loaded_details = set()
+    app.search_var = FakeVar()
+    app.selected_category = FakeVar()
+    app.selected_pack = FakeVar()
+    app.cat_dropdown = FakeWidget(app.selected_category)
+    app.pack_dropdown = FakeWidget(app.selected_pack)
+    for name in ("icon_label", "pack_state_label", "desc_label", "rating_frame", "btn_commands"):
+        setattr(app, name, FakeWidget())
+    return app
+
+
+def test_no_matches_cannot_be_installed(monkeypatch):
+    data = {"Horror": {"Dread": {"profile_name": "Dread", "description": "spooky"}}}
+    app = make_app(data)
+    app.selected_category.value = "Horror"
+    app.selected_pack.value = "Dread"
+    app.desc_label.config(text="spooky")
+    app.search_var.value = "zzz"
+
+    app.apply_search()
+
+    assert app.cat_dropdown["state"] == "disabled"
+    assert app.selected_category.get() == "No matches"
+    assert app.desc_label["text"] == ""
+    monkeypatch.setattr(installer.threading, "Thread", None)  # must not start
+    app.start_thread()
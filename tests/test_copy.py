@@ -0,0 +1,80 @@
+import errno
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+import installer
+from conftest import make_zip
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+def test_copy_keeps_permission_bits(tmp_path):
+    src = tmp_path / "run.sh"
+    src.write_bytes(b"#!/bin/sh\n")
+    src.chmod(0o755)
+    dst = tmp_path / "out.sh"
+
+    installer.copy_file_fast(str(src), str(dst), src.stat().st_size)
+
+    assert stat.S_IMODE(dst.stat().st_mode) == 0o755
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+    assert not (tmp_path / ("out.sh" + installer.COPY_SUFFIX)).exists()
+
+
+def test_reextracted_archive_is_skipped_by_mtime(tmp_path, monkeypatch):
+    archive = make_zip(tmp_path / "loader.zip", {"libraries/a.jar": b"a" * 100})
+    dst = tmp_path / "libraries"
+    for attempt in range(2):
+        extract = tmp_path / f"extract{attempt}"
+        installer.extract_archive(archive, str(extract))
+        if attempt:
+            # Same size and mtime, so the content never has to be compared
+            monkeypatch.setattr(installer, "same_file_content", None)
+        copied, skipped = installer.copy_tree(str(extract / "libraries"), str(dst))
+    assert (copied, skipped) == (0, 1)
+
+
+def test_scan_reports_interrupted_copies(mc_dir):
+    libs = os.path.join(mc_dir, "libraries", "org")
+    os.makedirs(libs)
+    leftover = os.path.join(libs, "a.jar" + installer.COPY_SUFFIX)
+    fresh = os.path.join(libs, "b.jar" + installer.COPY_SUFFIX)
+    for path in (leftover, fresh):
+        with open(path, "wb") as f:
+            f.write(b"x" * 10)
+    then = time.time() - 2 * installer.ORPHAN_MIN_AGE
+    os.utime(leftover, (then, then))
+
+    report = installer.scan_profiles(mc_dir)
+    assert [o["path"] for o in report["orphans"]] == [leftover]
+
+    assert installer.reclaim_space(mc_dir, report) == 10
+    assert not os.path.exists(leftover)
+    assert os.path.exists(fresh)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="sendfile to a file")
+@pytest.mark.parametrize("code", [errno.ENOSYS, errno.EXDEV, errno.EINVAL])
+def test_sendfile_follows_a_failed_copy_file_range(tmp_path, monkeypatch, code):
+    data = os.urandom(256 * 1024)
+    src = tmp_path / "src"
+    src.write_bytes(data)
+    sent = []
+    real_sendfile = os.sendfile
+
+    def copy_file_range(*args):
+        raise OSError(code, os.strerror(code))
+
+    def sendfile(*args):
+        sent.append(args[3])
+        return real_sendfile(*args)
+
+    monkeypatch.setattr(installer.os, "copy_file_range", copy_file_range, raising=False)
+    monkeypatch.setattr(installer.os, "sendfile", sendfile)
+
+    installer.copy_file_fast(str(src), str(tmp_path / "dst"), len(data))
+
+    assert sent and (tmp_path / "dst").read_bytes() == data
@@ -0,0 +1,23 @@
+import time
+
+import installer
+
+
+def test_throttle_survives_restart(mc_dir, monkeypatch):
+    report = {"profiles": [{"folder": "Pack", "status": "update available"}], "elapsed_ms": 1}
+    monkeypatch.setattr(installer, "check_updates", lambda *a, **k: report)
+    monkeypatch.setattr(installer, "launcher_running", lambda: False)
+    monkeypatch.setattr(installer.HeadlessInstaller, "refresh_catalog", lambda self: False)
+    installer.load_state(mc_dir).set_setting("last_applied", time.time())
+    installer._state_stores.clear()  # a new process reads it back from disk
+
+    daemon = installer.HeadlessInstaller(mc_dir)
+    assert daemon.run_cycle(throttle_minutes=30) == "deferred"
+
+
+def test_headless_installers_do_not_share_run_state(mc_dir):
+    first = installer.HeadlessInstaller(mc_dir)
+    second = installer.HeadlessInstaller(mc_dir)
+    first.bundle = object()
+    assert second.bundle is None
+    assert first.loaded_details is not second.loaded_details
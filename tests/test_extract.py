@@ -0,0 +1,107 @@
+import os
+import zipfile
+
+import pytest
+
+import installer
+from conftest import make_zip
+
+
+def test_member_path_matches_zipfile_on_windows():
+    dest = os.path.join("out")
+    for name, expected in [
+        ("mods/a:b?.jar", ["mods", "a_b_.jar"]),
+        ("mods./config. /x.toml", ["mods", "config", "x.toml"]),
+        ("C:\\..\\mods\\<x>.jar", ["mods", "_x_.jar"]),
+        ("mods/.../a.jar", ["mods", "a.jar"]),
+    ]:
+        path = installer.member_path(dest, name, windows=True)
+        assert path == os.path.join(dest, *expected)
+
+
+def test_member_path_keeps_posix_names():
+    assert installer.member_path("out", "mods/a:b.jar", windows=False) == os.path.join(
+        "out", "mods", "a:b.jar"
+    )
+
+
+def stored_zip(path, data):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as z:
+        z.writestr("mods/big.jar", data)
+    return str(path)
+
+
+def test_big_stored_member_is_copied_and_checked(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer, "ZERO_COPY_MIN_BYTES", 1024)
+    data = os.urandom(64 * 1024)
+    archive = stored_zip(tmp_path / "pack.zip", data)
+
+    installer.extract_archive(archive, str(tmp_path / "out"))
+
+    assert (tmp_path / "out" / "mods" / "big.jar").read_bytes() == data
+
+
+def test_corrupt_stored_member_fails_the_crc(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer, "ZERO_COPY_MIN_BYTES", 1024)
+    data = os.urandom(64 * 1024)
+    archive = stored_zip(tmp_path / "pack.zip", data)
+    raw = bytearray((tmp_path / "pack.zip").read_bytes())
+    at = raw.index(data[:32]) + 1000
+    raw[at] ^= 0xFF
+    (tmp_path / "pack.zip").write_bytes(bytes(raw))
+
+    with pytest.raises(zipfile.BadZipFile, match="CRC"):
+        installer.extract_archive(archive, str(tmp_path / "out"))
+
+
+@pytest.fixture
+def extracted(monkeypatch):
+    names = []
+    real = installer.extract_member
+
+    def extract_member(z, info, *args, **kwargs):
+        names.append(info.filename)
+        return real(z, info, *args, **kwargs)
+
+    monkeypatch.setattr(installer, "extract_member", extract_member)
+    return names
+
+
+def test_only_the_mods_root_is_extracted(tmp_path, extracted):
+    archive = make_zip(
+        tmp_path / "pack.zip",
+        {
+            "Pack/mods/a.jar": b"a" * 10,
+            "Pack/mods/sub/b.jar": b"b" * 20,
+            "Pack/config/a.cfg": b"c" * 1000,
+            "Pack/saves/world/level.dat": b"w" * 1000,
+            "Pack/extra/mods/c.jar": b"x",
+        },
+    )
+    progress = []
+
+    roots = installer.extract_dirs(
+        archive, str(tmp_path / "out"), ("mods",), lambda c, t, e=0: progress.append(t)
+    )
+
+    assert roots == {"mods": "Pack/mods/"}
+    assert sorted(extracted) == ["mods/a.jar", "mods/sub/b.jar"]
+    assert installer.list_files(str(tmp_path / "out")) == ["mods/a.jar", "mods/sub/b.jar"]
+    assert set(progress) == {30}  # totals count the selected bytes only
+
+
+def test_loader_keeps_versions_and_libraries(tmp_path, extracted):
+    archive = make_zip(
+        tmp_path / "loader.zip",
+        {
+            "versions/x/x.json": b"{}",
+            "libraries/l.jar": b"l",
+            "README.txt": b"r",
+            "installer/setup.jar": b"s",
+        },
+    )
+
+    installer.extract_dirs(archive, str(tmp_path / "out"), ("versions", "libraries"))
+
+    assert sorted(extracted) == ["libraries/l.jar", "versions/x/x.json"]
+    assert sorted(os.listdir(tmp_path / "out")) == ["libraries", "versions"]
@@ -0,0 +1,127 @@
+import hashlib
+import http.server
+import threading
+
+import pytest
+
+import installer
+
+BODY = bytes(range(256)) * 64  # 16 KB
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.requests.append(("HEAD", self.path))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+    def do_GET(self):
+        self.requests.append(("GET", self.path, self.headers.get("Range")))
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/file")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            for start in range(0, len(BODY), 5000):
+                chunk = BODY[start : start + 5000]
+                self.wfile.write(b"%x;ext=1\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\nX-Trailer: 1\r\n\r\n")
+        elif self.path == "/file" and self.headers.get("Range"):
+            first, last = self.headers["Range"].split("=")[1].split("-")
+            data = BODY[int(first) : int(last) + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(BODY)}")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            # /file without a Range, and /norange, which advertises ranges
+            # in its HEAD but always answers 200 with the whole body
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(BODY)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(installer, "USE_URLLIB", False)
+    monkeypatch.setattr(installer, "SEGMENTED_MIN_BYTES", 1024)
+    Handler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def run(coro):
+    return installer.get_transport().run(coro, timeout=10)
+
+
+def test_chunked_body(server):
+    assert run(installer.async_get_bytes(f"{server}/chunked")) == BODY
+
+
+def test_redirect_is_followed(server):
+    data = run(installer.async_get_bytes(f"{server}/redirect"))
+    assert data == BODY
+    assert ("GET", "/file", None) in Handler.requests
+
+
+def test_segmented_download(server, tmp_path):
+    path = tmp_path / "out"
+    validators = {}
+    sha = run(
+        installer.async_download_file(f"{server}/file", str(path), validators=validators)
+    )
+
+    assert path.read_bytes() == BODY
+    assert sha == hashlib.sha256(BODY).hexdigest()
+    assert validators["etag"] == '"v1"'
+    ranged = [r for r in Handler.requests if r[0] == "GET" and r[2]]
+    assert len(ranged) == installer.DOWNLOAD_SEGMENTS
+
+
+def test_ranges_advertised_but_answered_200(server, tmp_path):
+    path = tmp_path / "out"
+    sha = run(installer.async_download_file(f"{server}/norange", str(path)))
+
+    assert path.read_bytes() == BODY
+    assert sha == hashlib.sha256(BODY).hexdigest()
+
+
+def test_plan_validators_replace_the_head(server, tmp_path):
+    url = f"{server}/file"
+    plan = installer.InstallPlan()
+    plan.validators[url] = {"etag": '"v1"', "last_modified": None, "content_length": len(BODY)}
+    plan.ranged.add(url)
+
+    known = plan.download_hint(url)
+    run(installer.async_download_file(url, str(tmp_path / "out"), known=known))
+
+    assert (tmp_path / "out").read_bytes() == BODY
+    assert not any(r[0] == "HEAD" for r in Handler.requests)
+
+
+def test_sink_abort_closes_the_request(server):
+    with pytest.raises(ValueError):
+        run(installer.async_get_bytes(f"{server}/file", max_bytes=1000))
+    # The loop and the server are still fine afterwards
+    assert run(installer.async_get_bytes(f"{server}/chunked")) == BODY
@@ -0,0 +1,36 @@
+import io
+
+import pytest
+
+import installer
+
+
+@pytest.fixture(params=[False, True], ids=["asyncio", "urllib"])
+def client(request, monkeypatch):
+    monkeypatch.setattr(installer, "USE_URLLIB", request.param)
+
+
+def test_oversized_icon_is_rejected(http_root, client, monkeypatch):
+    root, base = http_root
+    (root / "huge.png").write_bytes(b"\0" * 5000)
+    monkeypatch.setattr(installer, "MAX_ICON_BYTES", 4096)
+
+    with pytest.raises(ValueError, match="4096"):
+        installer.fetch_icon_png(f"{base}/huge.png")
+
+
+@pytest.mark.skipif(not installer.HAS_PILLOW, reason="needs Pillow")
+def test_animated_icon_uses_its_first_frame(http_root, client):
+    from PIL import Image
+
+    root, base = http_root
+    frames = [Image.new("RGB", (64, 64), color) for color in ("red", "blue")]
+    frames[0].save(root / "anim.gif", save_all=True, append_images=frames[1:], duration=100)
+
+    png = installer.fetch_icon_png(f"{base}/anim.gif", size=128)
+
+    assert png.startswith(b"\x89PNG")
+    image = Image.open(io.BytesIO(png))
+    assert image.size == (128, 128) and image.mode == "RGBA"
+    assert getattr(image, "n_frames", 1) == 1
+    assert image.getpixel((64, 64)) == (255, 0, 0, 255)
@@ -0,0 +1,64 @@
+import os
+import threading
+
+import installer
+from conftest import make_zip
+
+
+def serve_pack(root, base, name, loader):
+    make_zip(root / f"{name}.zip", {f"{name}/mods/{name}.jar": name * 100})
+    make_zip(
+        root / f"{loader}.zip",
+        {f"versions/{loader}/{loader}.json": "{}", f"libraries/{loader}.jar": "lib"},
+    )
+    return {
+        "url": f"{base}/{name}.zip",
+        "profile_name": name,
+        "folder_name": name,
+        "version_id": loader,
+        "loader_url": f"{base}/{loader}.zip",
+    }
+
+
+def test_runs_keep_their_own_progress():
+    reports = []
+    first = installer.InstallRun(lambda *args: reports.append(("first",) + args))
+    second = installer.InstallRun(lambda *args: reports.append(("second",) + args))
+    first.action = "Downloading Loader"
+    first.combined = installer.CombinedProgress(first.progress, {"mods": 10})
+    second.action = "Extracting"
+
+    first.progress_for("mods")(5, 10)
+    second.progress_for("mods_extract")(1, 4)
+
+    assert reports[0][:3] == ("first", 5, 10)
+    assert reports[0][-1] == "Downloading Loader"
+    assert reports[1] == ("second", 1, 4, 0, "Extracting")
+
+
+def test_concurrent_overlapped_installs(mc_dir, http_root):
+    root, base = http_root
+    configs = [serve_pack(root, base, f"Pack{i}", f"loader{i}") for i in range(4)]
+    actions = {}
+
+    def install(config):
+        app = installer.HeadlessInstaller(mc_dir)
+        seen = actions.setdefault(config["folder_name"], set())
+        app.update_progress = lambda c, t, e=0, action="": seen.add(action)
+        app.run_plan(mc_dir, installer.plan_install(mc_dir, [config]))
+
+    threads = [threading.Thread(target=install, args=(c,)) for c in configs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i in range(4):
+        assert installer.loader_installed(mc_dir, f"loader{i}")
+        jar = os.path.join(mc_dir, "profiles", f"Pack{i}", "mods", f"Pack{i}.jar")
+        assert os.path.isfile(jar)
+        # The loader and the pack share one run, so either may name the action
+        assert actions[f"Pack{i}"] & {"Downloading Loader", "Downloading Mods"}
+
+    profiles = installer.read_launcher_profiles(mc_dir)
+    assert sorted(profiles) == [f"Pack{i}" for i in range(4)]
@@ -0,0 +1,92 @@
+import pytest
+
+import installer
+
+MB = 1024 * 1024
+
+
+def pack(**extra):
+    config = {
+        "url": "https://example.invalid/p.zip",
+        "profile_name": "P",
+        "folder_name": "P",
+        "version_id": "x",
+        "jvm_args": "-Xmx5120m -Xms256m -Duser.language=en",
+    }
+    config.update(extra)
+    return config
+
+
+@pytest.mark.parametrize(
+    "ram, expected",
+    [
+        (4096, 1024),  # floor
+        (8192, 4096),  # half of RAM on small machines
+        (16384, 5120),  # the pack's curated -Xmx
+        (32768, 5120),
+    ],
+)
+def test_heap_for_a_large_pack(ram, expected):
+    heap_min, heap_max = installer.heap_bounds(pack())
+    assert installer.recommend_heap_mb(150, 500 * MB, ram, heap_min, heap_max) == expected
+
+
+def test_heap_leaves_room_for_os_and_off_heap():
+    for ram in (6144, 8192, 12288, 16384, 24576, 65536):
+        heap = installer.recommend_heap_mb(400, 2000 * MB, ram, 2048, 65536)
+        assert heap + installer.JVM_OFFHEAP_MB + installer.OS_RESERVE_MB <= ram
+
+
+def test_small_pack_gets_the_minimum():
+    assert installer.recommend_heap_mb(10, 50 * MB, 32768, 2048, 8192) == 2048
+
+
+def test_catalog_bounds_override_curated_xmx():
+    assert installer.heap_bounds(pack(heap_max_mb=12288)) == (2048, 12288)
+    assert installer.heap_bounds(pack(heap_min_mb=3072)) == (3072, 5120)
+    assert installer.heap_bounds(pack(jvm_args="-Xmx8g")) == (2048, 8192)
+    assert installer.heap_bounds(pack(jvm_args="-Dfoo=1")) == (2048, installer.HEAP_MAX_MB)
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        {"heap_min_mb": 12000},  # above the curated -Xmx5120m
+        {"heap_min_mb": 4096, "heap_max_mb": 2048},
+        {"heap_max_mb": 0},
+        {"heap_min_mb": -1},
+    ],
+)
+def test_bad_heap_bounds_are_rejected(extra):
+    assert installer.check_pack(pack(**extra))
+
+
+def test_rounding_never_passes_the_curated_max():
+    assert installer.recommend_heap_mb(200, 0, 32768, 2048, 3000) == 3000
+    assert installer.recommend_heap_mb(400, 2000 * MB, 65536, 2048, 8416) == 8416
+    assert installer.recommend_heap_mb(40, 0, 32768, 2048, 8416) == 2560  # still rounds up
+
+
+def test_pack_without_a_collector_gets_generated_gc_flags(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer, "hardware", lambda: (16384, 8))
+    args = installer.tuned_jvm_args(
+        pack(jvm_args="-Xmx9504m -Xms256m -XX:MaxGCPauseMillis=200 -Dx=y"), str(tmp_path)
+    )
+    assert args == (
+        "-Xmx2048m -Xms1024m -XX:+UseG1GC -XX:+ParallelRefProcEnabled "
+        "-XX:MaxGCPauseMillis=50 -XX:ParallelGCThreads=7 -XX:ConcGCThreads=1 -Dx=y"
+    )
+
+
+def test_curated_collector_keeps_its_tuning(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer, "hardware", lambda: (32768, 8))
+    monkeypatch.setattr(installer, "mods_footprint", lambda _dir: (300, 1500 * MB))
+    curated = (
+        "-Xmx8416m -Xms8416m -XX:+UseZGC -XX:+ZGenerational -XX:ConcGCThreads=2 "
+        "-XX:+AlwaysPreTouch -Dfml.ignorePatchDiscrepancies=true"
+    )
+    args = installer.tuned_jvm_args(pack(jvm_args=curated), str(tmp_path))
+    assert args == (
+        "-Xmx8416m -Xms1024m -XX:+UseZGC -XX:+ZGenerational -XX:ConcGCThreads=2 "
+        "-XX:+AlwaysPreTouch -Dfml.ignorePatchDiscrepancies=true"
+    )
@@ -0,0 +1,72 @@
+import os
+
+import installer
+from conftest import make_zip
+
+
+def shared_catalog(root, base):
+    make_zip(root / "mods.zip", {"mods/shared.jar": b"m" * 1000})
+    make_zip(root / "solo.zip", {"mods/solo.jar": b"s" * 1000})
+    make_zip(
+        root / "loader.zip",
+        {"versions/fabric/fabric.json": "{}", "libraries/fabric.jar": "lib"},
+    )
+
+    def config(name, mods):
+        return {
+            "url": f"{base}/{mods}.zip",
+            "profile_name": name,
+            "folder_name": name,
+            "version_id": "fabric",
+            "loader_url": f"{base}/loader.zip",
+        }
+
+    return [config("A", "mods"), config("B", "mods"), config("C", "solo")]
+
+
+def test_shared_urls_are_planned_once(mc_dir, http_root):
+    root, base = http_root
+    configs = shared_catalog(root, base)
+
+    plan = installer.plan_install(mc_dir, configs)
+
+    assert [c["folder_name"] for c, _url in plan.packs] == ["A", "B", "C"]
+    assert list(plan.loaders) == [f"{base}/loader.zip"]
+    assert [len(c) for c in plan.mods.values()] == [2, 1]
+    sizes = sum((root / n).stat().st_size for n in ("mods.zip", "solo.zip", "loader.zip"))
+    assert plan.total_bytes == sizes
+    assert plan.describe().startswith("3 pack(s), 1 loader(s), 2 mods download(s)")
+
+
+def test_installed_loader_is_left_out(mc_dir, http_root):
+    root, base = http_root
+    version_dir = os.path.join(mc_dir, "versions", "loader")  # named after the zip
+    os.makedirs(version_dir)
+    with open(os.path.join(version_dir, "loader.json"), "w") as f:
+        f.write("{}")
+
+    plan = installer.plan_install(mc_dir, shared_catalog(root, base))
+
+    assert plan.loaders == {}
+
+
+def test_each_unique_url_is_downloaded_once(mc_dir, http_root, monkeypatch):
+    root, base = http_root
+    fetched = []
+    real_download = installer.http_download_file
+
+    def download(url, *args, **kwargs):
+        fetched.append(url)
+        return real_download(url, *args, **kwargs)
+
+    monkeypatch.setattr(installer, "http_download_file", download)
+    app = installer.HeadlessInstaller(mc_dir)
+    shown = []
+    app.update_plan = shown.append
+    plan = installer.plan_install(mc_dir, shared_catalog(root, base))
+
+    app.run_plan(mc_dir, plan)
+
+    assert sorted(fetched) == [f"{base}/{n}.zip" for n in ("loader", "mods", "solo")]
+    assert shown == [f"Plan: {plan.describe()}"]
+    assert sorted(installer.read_launcher_profiles(mc_dir)) == ["A", "B", "C"]
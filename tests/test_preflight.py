@@ -0,0 +1,78 @@
+import os
+import zipfile
+
+import pytest
+
+import installer
+from conftest import make_zip
+
+MB = 1024 * 1024
+
+
+def pack(folder, complex_pack=False):
+    return {
+        "url": f"https://example.invalid/{folder}.zip",
+        "profile_name": folder,
+        "folder_name": folder,
+        "version_id": "x",
+        "is_complex": complex_pack,
+    }
+
+
+def plan_for(config):
+    plan = installer.InstallPlan()
+    plan.packs.append((config, config["url"]))
+    plan.mods[config["url"]] = [config]
+    return plan
+
+
+@pytest.fixture
+def archive(tmp_path):
+    # Stored so the archive is about as big as what it extracts
+    path = str(tmp_path / "pack.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as z:
+        z.writestr("Wrapper/mods/a.jar", os.urandom(2 * MB))
+        z.writestr("Wrapper/mods/b.jar", os.urandom(2 * MB))
+    return path
+
+
+def test_fresh_install_estimate(mc_dir, archive):
+    config = pack("Pack")
+    peak, inodes = installer.estimate_plan_space(plan_for(config), lambda url: archive, mc_dir)
+    assert 8 * MB <= peak < 9 * MB  # download + extraction
+    assert inodes == 3
+
+
+def test_update_gives_back_the_swapped_mods_folder(mc_dir, archive):
+    config = pack("Pack")
+    mods = os.path.join(mc_dir, "profiles", "Pack", "mods")
+    os.makedirs(mods)
+    with open(os.path.join(mods, "old.jar"), "wb") as f:
+        f.write(os.urandom(4 * MB))
+    plan = plan_for(config)
+    plan.mods[config["url"]].append(dict(config))  # installed twice in a row
+    peak, _ = installer.estimate_plan_space(plan, lambda url: archive, mc_dir)
+    # Without the old folder given back the second step would need 12+ MB
+    assert peak < 9 * MB
+
+
+def test_complex_update_counts_only_overwritten_files(mc_dir, tmp_path):
+    config = pack("Pack", complex_pack=True)
+    profile = os.path.join(mc_dir, "profiles", "Pack")
+    os.makedirs(os.path.join(profile, "config"))
+    with open(os.path.join(profile, "config", "a.toml"), "wb") as f:
+        f.write(b"x" * MB)
+    with open(os.path.join(profile, "world.dat"), "wb") as f:
+        f.write(b"x" * 5 * MB)
+    archive = make_zip(tmp_path / "c.zip", {"config/a.toml": b"y" * MB})
+    plan = plan_for(config)
+    plan.mods[config["url"]].append(dict(config))
+    peak, _ = installer.estimate_plan_space(plan, lambda url: archive, mc_dir)
+    assert peak < 2 * MB + 64 * 1024
+
+
+def test_insufficient_space_is_raised(mc_dir, archive, monkeypatch):
+    free = installer.shutil.disk_usage(mc_dir)._replace(free=MB)
+    monkeypatch.setattr(installer.shutil, "disk_usage", lambda path: free)
+    with pytest.raises(installer.InsufficientSpaceError):
+        installer.check_disk_space(mc_dir, plan_for(pack("Pack")), lambda url: archive)
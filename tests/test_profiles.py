@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+
+import installer
+
+
+def entry(name, **overrides):
+    return {
+        "name": name,
+        "game_dir": f"/games/{name}",
+        "version_id": "1.20.1",
+        "icon": "Furnace",
+        "jvm_args": "-Xmx4096m",
+        **overrides,
+    }
+
+
+def write_profiles(mc_dir, profiles):
+    path = os.path.join(mc_dir, "launcher_profiles.json")
+    with open(path, "w") as f:
+        json.dump({"profiles": profiles, "settings": {"keepOpen": True}}, f)
+    return path
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_reconcile_keeps_launcher_and_user_keys():
+    data = {"profiles": {}}
+    installer.reconcile_launcher_profiles(data, [entry("Pack")], "t0")
+    profile = data["profiles"]["Pack"]
+    profile["lastUsed"] = "t1"
+    profile["resolution"] = {"width": 800}
+
+    changes = installer.reconcile_launcher_profiles(
+        data, [entry("Pack", version_id="1.20.4")], "t2"
+    )
+
+    assert changes == [("Pack", "update", ["lastVersionId"])]
+    assert profile["created"] == "t0" and profile["lastUsed"] == "t1"
+    assert profile["resolution"] == {"width": 800}
+    assert profile["lastVersionId"] == "1.20.4"
+
+
+def test_reconcile_leaves_other_profiles_alone():
+    mine = {"name": "Mine", "type": "custom", "lastVersionId": "1.8.9"}
+    data = {"profiles": {"Mine": dict(mine)}}
+
+    changes = installer.reconcile_launcher_profiles(data, [entry("My Pack")], "t0")
+
+    assert changes == [("My_Pack", "add", sorted(changes[0][2]))]
+    assert data["profiles"]["Mine"] == mine
+
+
+def test_unchanged_profiles_are_not_rewritten(mc_dir):
+    app = installer.HeadlessInstaller(mc_dir)
+    path = write_profiles(mc_dir, {})
+    app.update_json_profiles(mc_dir, [entry("Pack")])
+    os.remove(path + ".bak")
+    mtime = os.stat(path).st_mtime_ns
+
+    changes = app.update_json_profiles(mc_dir, [entry("Pack")])
+
+    assert changes == [("Pack", "same", [])]
+    assert os.stat(path).st_mtime_ns == mtime
+    assert not os.path.exists(path + ".bak")
+
+
+def test_dry_run_writes_nothing(mc_dir):
+    app = installer.HeadlessInstaller(mc_dir)
+    path = write_profiles(mc_dir, {})
+    before = load(path)
+
+    changes = app.update_json_profiles(mc_dir, [entry("Pack")], dry_run=True)
+
+    assert changes[0][:2] == ("Pack", "add")
+    assert load(path) == before
+    assert sorted(os.listdir(mc_dir)) == ["launcher_profiles.json"]
+
+
+def test_concurrent_updates_keep_every_profile(mc_dir):
+    app = installer.HeadlessInstaller(mc_dir)
+    path = write_profiles(mc_dir, {})
+    names = [f"Pack{i}" for i in range(8)]
+    threads = [
+        threading.Thread(target=app.update_json_profiles, args=(mc_dir, [entry(n)]))
+        for n in names
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data = load(path)
+    assert sorted(data["profiles"]) == names
+    assert data["settings"] == {"keepOpen": True}
+    assert not [n for n in os.listdir(mc_dir) if n.endswith(".tmp")]
+
+
+def test_refresh_fetches_icons_on_a_bounded_pool(mc_dir, monkeypatch):
+    packs = {}
+    for i in range(8):
+        name = f"Pack{i}"
+        packs[name] = {
+            "url": f"https://example.invalid/{name}.zip",
+            "profile_name": name,
+            "folder_name": name,
+            "version_id": "1.20.1",
+            "icon_url": f"https://example.invalid/{name}.png",
+        }
+        os.makedirs(os.path.join(mc_dir, "profiles", name))
+    app = installer.HeadlessInstaller(mc_dir)
+    app.catalog = installer.Catalog(installer.parse_catalog(json.dumps({"Cat": packs})))
+
+    monkeypatch.setattr(installer, "ICON_WORKERS", 3)
+    lock = threading.Lock()
+    running = []
+    peak = 0
+
+    def profile_icon(mc_dir, config, current_icon=None, fetch=True):
+        nonlocal peak
+        with lock:
+            running.append(config["folder_name"])
+            peak = max(peak, len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(config["folder_name"])
+        return f"icon of {config['folder_name']}"
+
+    writes = []
+    real_update = app.update_json_profiles
+
+    def update_json_profiles(mc_dir, entries, dry_run=False):
+        writes.append(len(entries))
+        return real_update(mc_dir, entries, dry_run)
+
+    monkeypatch.setattr(app, "profile_icon", profile_icon)
+    monkeypatch.setattr(app, "update_json_profiles", update_json_profiles)
+    monkeypatch.setattr(installer.messagebox, "showinfo", lambda *args: None)
+
+    class Window:
+        def destroy(self):
+            pass
+
+    app._debug_update_profiles_thread(Window())
+
+    assert peak == 3
+    assert writes == [8]  # one read/backup/write for every profile
+    profiles = installer.read_launcher_profiles(mc_dir)
+    assert {p["icon"] for p in profiles.values()} == {f"icon of Pack{i}" for i in range(8)}
@@ -0,0 +1,81 @@
+import os
+import time
+
+import installer
+
+
+def make_profile(mc_dir, folder, files):
+    mods = os.path.join(mc_dir, "profiles", folder, "mods")
+    os.makedirs(mods)
+    for name, data in files.items():
+        with open(os.path.join(mods, name), "wb") as f:
+            f.write(data)
+    return mods
+
+
+def age(path, seconds=2 * installer.ORPHAN_MIN_AGE):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_duplicates_and_orphans(mc_dir):
+    make_profile(mc_dir, "A", {"lib.jar": b"x" * 100, "a.jar": b"a" * 50})
+    make_profile(mc_dir, "B", {"lib.jar": b"x" * 100, "b.jar": b"b" * 50})
+    leftover = os.path.join(mc_dir, "temp_update.zip")
+    with open(leftover, "wb") as f:
+        f.write(b"z" * 10)
+    age(leftover)
+
+    report = installer.scan_profiles(mc_dir)
+
+    assert [d["wasted"] for d in report["duplicates"]] == [100]
+    assert [o["path"] for o in report["orphans"]] == [leftover]
+    assert report["reclaimable_bytes"] == 10
+
+
+def test_rewrite_in_place_is_seen(mc_dir):
+    mods = make_profile(mc_dir, "A", {"a.jar": b"a" * 10})
+    assert installer.scan_profiles(mc_dir)["total_bytes"] == 10
+    dir_mtime = os.stat(mods).st_mtime_ns
+
+    with open(os.path.join(mods, "a.jar"), "ab") as f:
+        f.write(b"a" * 90)
+    os.utime(mods, ns=(dir_mtime, dir_mtime))
+
+    assert installer.scan_profiles(mc_dir)["total_bytes"] == 100
+
+
+def test_trash_emptied_during_scan(mc_dir, monkeypatch):
+    trash = installer.get_trash_dir(mc_dir)
+    os.makedirs(os.path.join(trash, "trash_1"))
+    with open(os.path.join(trash, "gone.bin"), "wb") as f:
+        f.write(b"x")
+    real_lstat = os.lstat
+
+    def vanishing_lstat(path, *args, **kwargs):
+        if os.path.basename(path) == "gone.bin":
+            raise FileNotFoundError(path)
+        return real_lstat(path, *args, **kwargs)
+
+    monkeypatch.setattr(installer.os, "lstat", vanishing_lstat)
+    report = installer.scan_profiles(mc_dir)
+
+    assert [os.path.basename(o["path"]) for o in report["orphans"]] == ["trash_1"]
+
+
+def test_work_dir_in_use_is_not_reclaimed(mc_dir):
+    busy, lock = installer.make_work_dir("temp_shared_", mc_dir)
+    idle, idle_lock = installer.make_work_dir("temp_loader_", mc_dir)
+    installer.release_lock_file(idle_lock)  # its installer died
+    age(busy)
+    age(idle)
+    try:
+        report = installer.scan_profiles(mc_dir)
+        assert [o["path"] for o in report["orphans"]] == [idle]
+
+        report["orphans"].append({"path": busy, "owner": "mc_dir", "bytes": 0})
+        installer.reclaim_space(mc_dir, report)
+        assert os.path.isdir(busy)
+        assert not os.path.exists(idle)
+    finally:
+        installer.discard_work_dir(busy, lock, mc_dir)
@@ -0,0 +1,62 @@
+import json
+import os
+
+import installer
+from conftest import make_zip
+
+
+def test_diagnostics_leave_installer_state_alone(mc_dir, http_root, monkeypatch):
+    root, base = http_root
+    make_zip(root / "loader.zip", {"versions/x/x.json": "{}"})
+    make_zip(root / "pack.zip", {"mods/a.jar": b"a" * 1000})
+    catalog = {
+        "Cat": {
+            "Pack": {
+                "url": f"{base}/pack.zip",
+                "loader_url": f"{base}/loader.zip",
+                "profile_name": "Pack",
+                "folder_name": "Pack",
+                "version_id": "x",
+            }
+        }
+    }
+    (root / "modpacks.json").write_text(json.dumps(catalog))
+    monkeypatch.setattr(installer, "MODPACKS_URL", f"{base}/modpacks.json")
+
+    # Another process's install, still staging
+    tx = installer.InstallTransaction(mc_dir, os.path.join(mc_dir, "profiles", "Pack"))
+    before = sorted(os.listdir(mc_dir))
+
+    report = installer.run_diagnostics(mc_dir)
+
+    assert report["ok"]
+    assert report["catalog"]["packs"] == 1
+    assert [h["host"] for h in report["hosts"]] == ["127.0.0.1"]
+    assert "error" not in report["hosts"][0]
+    assert report["hosts"][0]["family"] == "IPv4"
+    assert report["throughput"]["url"] == f"{base}/loader.zip"
+    assert report["throughput"]["family"] == "IPv4"
+    assert "error" not in report["disk"] and "error" not in report["extract"]
+    assert os.path.isdir(tx.root)
+    assert sorted(os.listdir(mc_dir)) == before
+    tx.discard()
+
+
+def test_throughput_is_timed_after_the_first_chunk(monkeypatch):
+    clock = iter([0.0, 5.0, 6.0, 6.0])  # start, first chunk, end
+    monkeypatch.setattr(installer.time, "perf_counter", lambda: next(clock))
+    monkeypatch.setattr(installer, "USE_URLLIB", False)
+
+    async def request(method, url, sink=None, timeout=None):
+        for _ in range(3):
+            sink(b"x" * 125_000)
+
+    monkeypatch.setattr(installer, "async_request", request)
+    sample = installer.get_transport().run(
+        installer.async_sample_throughput("http://example.invalid/x", limit=10**6)
+    )
+
+    assert sample["bytes"] == 375_000
+    assert sample["first_byte_ms"] == 5000.0
+    # Two chunks after the first, over the one second since it arrived
+    assert sample["mbit_per_s"] == 2.0
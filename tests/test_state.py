@@ -0,0 +1,112 @@
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+import installer
+from conftest import make_zip
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    files = {}  # path -> (body, etag or None)
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        body, etag = self.files[self.path]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", "Mon, 05 Oct 2026 10:00:00 GMT")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self.send_head()
+
+    def do_GET(self):
+        self.wfile.write(self.send_head())
+
+
+@pytest.fixture
+def server():
+    Handler.files = {}
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def pack_bytes(tmp_path, text):
+    return open(make_zip(tmp_path / "pack.zip", {"Pack/mods/a.jar": text}), "rb").read()
+
+
+def installed_pack(mc_dir, server, tmp_path, etag):
+    Handler.files["/pack.zip"] = (pack_bytes(tmp_path, "v1"), etag)
+    config = {
+        "url": f"{server}/pack.zip",
+        "profile_name": "Pack",
+        "folder_name": "Pack",
+        "version_id": "1.20.1",
+    }
+    installer.HeadlessInstaller(mc_dir).run_plan(mc_dir, installer.plan_install(mc_dir, [config]))
+    return config
+
+
+def test_state_round_trip(tmp_path):
+    store = installer.StateStore(str(tmp_path))
+    store.record_profile("Pack", {"url": "u", "validators": {"etag": '"a"'}})
+    store.set_setting("throttle", 3)
+    installed_at = store.profile("Pack")["installed_at"]
+
+    again = installer.StateStore(str(tmp_path))
+    assert again.profile("Pack")["validators"] == {"etag": '"a"'}
+    assert again.setting("throttle") == 3
+    again.record_profile("Pack", {"url": "u2"})
+    assert installer.StateStore(str(tmp_path)).profile("Pack")["installed_at"] == installed_at
+
+
+def test_corrupt_state_starts_empty(tmp_path):
+    path = tmp_path / "installer_state.json"
+    path.write_text('{"profiles": {"Pack": ')
+
+    store = installer.StateStore(str(tmp_path))
+    assert store.profile("Pack") is None
+    store.record_profile("Pack", {"url": "u"})
+    assert json.loads(path.read_text())["profiles"]["Pack"]["url"] == "u"
+
+
+def test_unchanged_pack_is_skipped(mc_dir, server, tmp_path):
+    config = installed_pack(mc_dir, server, tmp_path, '"v1"')
+
+    plan = installer.plan_install(mc_dir, [config], skip_unchanged=True)
+
+    assert plan.unchanged == [config]
+    assert plan.mods == {} and plan.packs == []
+
+
+def test_new_etag_is_fetched_again(mc_dir, server, tmp_path):
+    config = installed_pack(mc_dir, server, tmp_path, '"v1"')
+    Handler.files["/pack.zip"] = (Handler.files["/pack.zip"][0], '"v2"')
+
+    plan = installer.plan_install(mc_dir, [config], skip_unchanged=True)
+
+    assert plan.unchanged == [] and list(plan.mods) == [config["url"]]
+
+
+def test_new_size_is_fetched_again_without_etags(mc_dir, server, tmp_path):
+    config = installed_pack(mc_dir, server, tmp_path, None)
+    assert installer.plan_install(mc_dir, [config], skip_unchanged=True).unchanged
+    Handler.files["/pack.zip"] = (pack_bytes(tmp_path, "v2 is longer"), None)
+
+    plan = installer.plan_install(mc_dir, [config], skip_unchanged=True)
+
+    assert plan.unchanged == [] and list(plan.mods) == [config["url"]]
+    assert os.path.isdir(os.path.join(mc_dir, "profiles", "Pack"))
@@ -0,0 +1,139 @@
+import json
+import os
+
+import pytest
+
+import installer
+
+
+def write(path, text="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def read_journal(tx):
+    with open(tx.path("journal.json")) as f:
+        return json.load(f)
+
+
+def staged_swap(mc_dir, old_files):
+    """A mods-folder swap staged in a transaction, journal at "committing"."""
+    profile = os.path.join(mc_dir, "profiles", "Pack")
+    for name in old_files:
+        write(os.path.join(profile, "mods", name), "old")
+    os.makedirs(os.path.join(profile, "mods"), exist_ok=True)
+    tx = installer.InstallTransaction(mc_dir, profile)
+    write(tx.path("extract", "mods", "new.jar"), "new")
+    tx.rename(os.path.join(profile, "mods"), tx.path("old", "mods"))
+    tx.rename(tx.path("extract", "mods"), os.path.join(profile, "mods"))
+    tx.journal["state"] = "committing"
+    tx._write_journal()
+    return tx, profile
+
+
+def crash_after(tx, applied):
+    """Apply the first `applied` ops, then 'crash' before the next save."""
+    ops = tx.journal["ops"]
+
+    class Crash(Exception):
+        pass
+
+    count = 0
+
+    def save():
+        nonlocal count
+        count += 1
+        if count > applied:
+            raise Crash()
+        tx._write_journal()
+
+    with pytest.raises(Crash):
+        installer.apply_journal_ops(ops, save)
+    die(tx)
+
+
+def die(tx):
+    """What the OS does to the tx lock when its process exits."""
+    installer.release_lock_file(tx._owner)
+
+
+@pytest.mark.parametrize("old_files", [[], ["old.jar"]])
+@pytest.mark.parametrize("applied", [0, 1])
+def test_recovery_after_crash_mid_commit(mc_dir, old_files, applied):
+    tx, profile = staged_swap(mc_dir, old_files)
+    crash_after(tx, applied)
+    installer.recover_transactions(mc_dir)
+    installer._trash.wait()
+    assert os.listdir(os.path.join(profile, "mods")) == ["new.jar"]
+    assert os.listdir(installer.get_staging_dir(mc_dir)) == []
+
+
+def test_recovery_after_all_renames_before_committed(mc_dir):
+    # Both renames done and marked; crash before state="committed"
+    tx, profile = staged_swap(mc_dir, ["old.jar"])
+    installer.apply_journal_ops(tx.journal["ops"], tx._write_journal)
+    assert all(op["done"] for op in read_journal(tx)["ops"])
+    die(tx)
+    installer.recover_transactions(mc_dir)
+    installer._trash.wait()
+    assert os.listdir(os.path.join(profile, "mods")) == ["new.jar"]
+
+
+def test_recovery_is_repeatable(mc_dir):
+    tx, profile = staged_swap(mc_dir, [])
+    crash_after(tx, 1)
+    journal = read_journal(tx)
+    installer.apply_journal_ops(journal["ops"], lambda: None)
+    installer.apply_journal_ops(journal["ops"], lambda: None)
+    assert os.listdir(os.path.join(profile, "mods")) == ["new.jar"]
+
+
+def test_unfinished_staging_is_discarded(mc_dir):
+    profile = os.path.join(mc_dir, "profiles", "Pack")
+    tx = installer.InstallTransaction(mc_dir, profile)
+    write(tx.path("extract", "a.jar"))
+    die(tx)
+    installer.recover_transactions(mc_dir)
+    installer._trash.wait()
+    assert not os.path.exists(tx.root)
+    assert not os.path.exists(profile)
+
+
+def test_merge_keeps_files_not_in_update(mc_dir):
+    profile = os.path.join(mc_dir, "profiles", "Pack")
+    write(os.path.join(profile, "saves", "world.dat"), "world")
+    write(os.path.join(profile, "config", "a.toml"), "old")
+    with installer.InstallTransaction(mc_dir, profile) as tx:
+        write(tx.path("extract", "config", "a.toml"), "new")
+        tx.merge(tx.path("extract"), profile)
+        tx.commit()
+    with open(os.path.join(profile, "config", "a.toml")) as f:
+        assert f.read() == "new"
+    assert os.path.exists(os.path.join(profile, "saves", "world.dat"))
+
+
+def test_transaction_of_a_live_installer_is_left_alone(mc_dir):
+    profile = os.path.join(mc_dir, "profiles", "Pack")
+    tx = installer.InstallTransaction(mc_dir, profile)
+    write(tx.path("extract", "a.jar"))
+    installer.recover_transactions(mc_dir)
+    assert os.path.exists(tx.path("extract", "a.jar"))
+    tx.discard()
+
+
+def test_committing_transaction_of_a_live_installer_is_not_replayed(mc_dir):
+    tx, profile = staged_swap(mc_dir, ["old.jar"])
+    installer.recover_transactions(mc_dir)
+    assert os.listdir(os.path.join(profile, "mods")) == ["old.jar"]
+    die(tx)
+    installer.recover_transactions(mc_dir)
+    installer._trash.wait()
+    assert os.listdir(os.path.join(profile, "mods")) == ["new.jar"]
+
+
+def test_transaction_still_starting_up_is_left_alone(mc_dir):
+    tx_root = os.path.join(installer.get_staging_dir(mc_dir), "tx_new")
+    os.makedirs(tx_root)
+    installer.recover_transactions(mc_dir)
+    assert os.path.isdir(tx_root)
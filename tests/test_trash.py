@@ -0,0 +1,56 @@
+import os
+import sys
+import threading
+
+import pytest
+
+import installer
+
+
+def in_thread(func):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=func()))
+    thread.start()
+    thread.join()
+    return result.get("value")
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="per-thread nice")
+def test_only_the_calling_thread_is_lowered():
+    before = os.getpriority(os.PRIO_PROCESS, 0)
+
+    def lower():
+        installer.lower_thread_priority()
+        return os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+
+    assert in_thread(lower) == 19
+    assert os.getpriority(os.PRIO_PROCESS, 0) == before
+
+
+def test_macos_uses_the_darwin_thread_background_band(monkeypatch):
+    calls = []
+    monkeypatch.setattr(installer.sys, "platform", "darwin")
+    monkeypatch.setattr(installer.os, "setpriority", lambda *args: calls.append(args))
+
+    installer.lower_thread_priority()
+
+    background = getattr(os, "PRIO_DARWIN_BG", 0x1000)
+    assert calls == [(getattr(os, "PRIO_DARWIN_THREAD", 3), 0, background)]
+
+
+def test_failure_is_logged_not_raised(monkeypatch):
+    def refuse(*args):
+        raise PermissionError("no")
+
+    monkeypatch.setattr(installer.sys, "platform", "darwin")
+    monkeypatch.setattr(installer.os, "setpriority", refuse)
+    installer.lower_thread_priority()
+
+
+def test_collector_deletes_queued_trees(mc_dir):
+    doomed = os.path.join(mc_dir, "temp_loader_x")
+    os.makedirs(os.path.join(doomed, "sub"))
+    installer.discard_tree(doomed, mc_dir)
+    installer._trash.wait()
+    assert not os.path.exists(doomed)
+    assert os.listdir(installer.get_trash_dir(mc_dir)) == []
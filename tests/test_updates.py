@@ -0,0 +1,107 @@
+import collections
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+import installer
+
+DATED = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # path -> (etag, last_modified); anything else is a 404
+    files = {
+        "/a.zip": ('"a1"', DATED),
+        "/b.zip": ('"b2"', DATED),
+        "/c.zip": (None, DATED),
+        "/loader.zip": ('"l1"', DATED),
+    }
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        conditions = (self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since"))
+        self.requests.append((self.path, conditions))
+        if self.path not in self.files:
+            self.send_response(404)
+        else:
+            etag, modified = self.files[self.path]
+            if (etag and conditions[0] == etag) or (not etag and conditions[1] == modified):
+                self.send_response(304)
+            else:
+                self.send_response(200)
+                self.send_header("Content-Length", "100")
+                self.send_header("Last-Modified", modified)
+                if etag:
+                    self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture(params=[False, True], ids=["asyncio", "urllib"])
+def server(request, monkeypatch):
+    monkeypatch.setattr(installer, "USE_URLLIB", request.param)
+    Handler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sweep_statuses(mc_dir, server):
+    packs = {}
+    records = {
+        "Fresh": ("a.zip", {"etag": '"a1"'}),
+        "Shared": ("a.zip", {"etag": '"a1"'}),
+        "Stale": ("b.zip", {"etag": '"b1"'}),
+        "Dated": ("c.zip", {"last_modified": DATED, "content_length": 100}),
+        "Gone": ("gone.zip", {"etag": '"g1"'}),
+        "Untracked": ("a.zip", None),
+        "NeedsLoader": ("a.zip", {"etag": '"a1"'}),
+    }
+    state = installer.load_state(mc_dir)
+    for folder, (name, validators) in records.items():
+        url = f"{server}/{name}"
+        packs[folder] = {
+            "url": url,
+            "profile_name": folder,
+            "folder_name": folder,
+            "version_id": "1.20.1",
+        }
+        os.makedirs(os.path.join(mc_dir, "profiles", folder))
+        if validators is not None:
+            state.record_profile(folder, {"url": url, "validators": validators})
+    packs["NeedsLoader"]["loader_url"] = f"{server}/loader.zip"
+    os.makedirs(os.path.join(mc_dir, "profiles", "Removed"))
+    catalog = installer.Catalog(installer.parse_catalog(json.dumps({"Cat": packs})))
+
+    report = installer.check_updates(mc_dir, catalog)
+
+    statuses = {row["folder"]: row["status"] for row in report["profiles"]}
+    assert statuses == {
+        "Dated": "up to date",
+        "Fresh": "up to date",
+        "Gone": "error",
+        "NeedsLoader": "update available",  # its loader isn't installed
+        "Removed": "not in catalog",
+        "Shared": "up to date",
+        "Stale": "update available",
+        "Untracked": "unknown",
+    }
+    assert collections.Counter(Handler.requests) == collections.Counter(
+        [
+            ("/a.zip", ('"a1"', None)),  # Fresh, Shared and NeedsLoader share one HEAD
+            ("/a.zip", (None, None)),  # Untracked has nothing to send
+            ("/b.zip", ('"b1"', None)),
+            ("/c.zip", (None, DATED)),
+            ("/gone.zip", ('"g1"', None)),
+        ]
+    )